@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+from services import storage
+
+# Timings for the data paths that scale with history size, on synthetic
+# histories (benchmarks.synthetic) in a throwaway database. Results are plain
+# JSON so runs can be diffed against a stored baseline. Timings only compare
+# on the machine that recorded them, so the baseline is not committed; record
+# one locally first:
+#
+#   python -m benchmarks.bench --sizes 1k,10k --save-baseline
+#   python -m benchmarks.bench --sizes 1k,10k --baseline benchmarks/baseline.json
+
+BENCHMARKS = (
+    "import_dataframe",
+    "get_all_entries_df",
+    "export_db_to_json",
+    "import_json_to_db",
+    "compute_streaks",
+    "add_derived_fields",
+    "weekly_minutes",
+    "backup",
+)
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_BASELINE = os.path.join("benchmarks", "baseline.json")
+# A benchmark regresses when it is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.5
+# ...and takes at least this long (shorter timings are mostly noise)
+MIN_SECONDS = 0.01
+
+
+@contextmanager
+def _db_at(path: str):
+    """Point storage at another database file for the duration."""
+    previous = storage.DB_PATH
+    storage.DB_PATH = path
+    try:
+        yield
+    finally:
+        storage.DB_PATH = previous
+
+
+def _timed(fn: Callable, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+def _meta(seed: int) -> dict:
+    import numpy as np
+    import pandas as pd
+
+    return {
+        "created": dt.datetime.now().isoformat(timespec="seconds"),
+        "seed": seed,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "sqlite": sqlite3.sqlite_version,
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def run_size(rows: int, *, seed: int = 0, only: Optional[Iterable[str]] = None, workdir: Optional[str] = None, **history) -> dict:
+    """Time each benchmark once on a `rows`-entry history (extra keyword
+    arguments go to generate_history). Returns {name: seconds}; names not in
+    `only` are skipped (their setup still runs when a later benchmark needs
+    it)."""
+    import pandas as pd
+
+    from benchmarks.synthetic import generate_history
+    from services.filesync import export_db_to_json, import_json_to_db
+    from services.metrics import add_derived_fields, compute_streaks, weekly_minutes
+
+    wanted = set(only or BENCHMARKS)
+    out: dict[str, float] = {}
+
+    def record(name: str, seconds: float) -> None:
+        if name in wanted:
+            out[name] = round(seconds, 6)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        frame = pd.DataFrame(generate_history(rows, seed=seed, **history))
+        json_path = os.path.join(tmp, "entries.json")
+        with _db_at(os.path.join(tmp, "a", "tracker.db")):
+            record("import_dataframe", _timed(storage.import_dataframe, frame)[0])
+            seconds, df = _timed(storage.get_all_entries_df)
+            record("get_all_entries_df", seconds)
+            if wanted & {"export_db_to_json", "import_json_to_db"}:
+                record("export_db_to_json", _timed(export_db_to_json, json_path)[0])
+            if "backup" in wanted:
+                record("backup", _timed(storage.backup_db_daily)[0])
+        if "import_json_to_db" in wanted:
+            with _db_at(os.path.join(tmp, "b", "tracker.db")):
+                storage.init_db()
+                record("import_json_to_db", _timed(import_json_to_db, json_path)[0])
+        if "compute_streaks" in wanted:
+            dates = [dt.date.fromisoformat(str(d)) for d in df["date"]]
+            record("compute_streaks", _timed(compute_streaks, dates)[0])
+        if "add_derived_fields" in wanted:
+            record("add_derived_fields", _timed(add_derived_fields, df)[0])
+        if "weekly_minutes" in wanted:
+            last = dt.date.fromisoformat(str(df["date"].iloc[-1])) if len(df) else None
+            record("weekly_minutes", _timed(weekly_minutes, df, last)[0])
+    return out
+
+
+def run(
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    *,
+    seed: int = 0,
+    only: Optional[Iterable[str]] = None,
+    progress: Optional[Callable[[str], None]] = None,
+    **history,
+) -> dict:
+    """Run the suite for each size. Returns {"meta": {...}, "results":
+    {benchmark: {size: seconds}}} with sizes as strings (JSON keys)."""
+    results: dict[str, dict[str, float]] = {}
+    for rows in sizes:
+        if progress:
+            progress(f"{rows} rows")
+        for name, seconds in run_size(rows, seed=seed, only=only, **history).items():
+            results.setdefault(name, {})[str(rows)] = seconds
+    meta = _meta(seed)
+    meta["history"] = history
+    return {"meta": meta, "results": results}
+
+
+def compare(
+    current: dict,
+    baseline: dict,
+    tolerance: float = DEFAULT_TOLERANCE,
+    min_seconds: float = MIN_SECONDS,
+) -> list[str]:
+    """Regressions of `current` against `baseline` (both as returned by
+    run), one message each. Benchmarks or sizes missing from either side are
+    ignored."""
+    problems = []
+    base = baseline.get("results", {})
+    for name, timings in current.get("results", {}).items():
+        for size, seconds in timings.items():
+            ref = base.get(name, {}).get(size)
+            if ref is None or seconds < min_seconds:
+                continue
+            if seconds > ref * (1 + tolerance):
+                change = (seconds / ref - 1) * 100 if ref else float("inf")
+                problems.append(f"{name} @ {size} rows: {seconds:.4f}s vs baseline {ref:.4f}s (+{change:.0f}%)")
+    return problems
+
+
+def parse_size(text: str) -> int:
+    """'500', '10k' or '1M' -> rows."""
+    text = text.strip().lower()
+    scale = {"k": 1_000, "m": 1_000_000}.get(text[-1:], 1)
+    if scale != 1:
+        text = text[:-1]
+    return int(float(text) * scale)
+
+
+def _table(report: dict) -> str:
+    results = report["results"]
+    sizes = sorted({int(s) for timings in results.values() for s in timings})
+    lines = ["benchmark".ljust(20) + "".join(f"{s:>12}" for s in sizes)]
+    for name in BENCHMARKS:
+        if name in results:
+            cells = (results[name].get(str(s)) for s in sizes)
+            lines.append(name.ljust(20) + "".join(f"{c:>12.4f}" if c is not None else f"{'-':>12}" for c in cells))
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench", description="Time storage and metrics paths on synthetic histories.")
+    parser.add_argument("--sizes", default="1k,10k,100k,1M", help="comma-separated row counts, e.g. 1k,10k (default: %(default)s)")
+    parser.add_argument("--only", help="comma-separated benchmark names (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--note-length", type=int, default=120, help="characters per note field (default: %(default)s)")
+    parser.add_argument("--tag-cardinality", type=int, default=12, help="distinct tag names (default: %(default)s)")
+    parser.add_argument("--out", help="write the results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed slowdown vs the baseline (default: %(default)s = +50%%)")
+    parser.add_argument("--save-baseline", action="store_true", help=f"write the results to --baseline (default {DEFAULT_BASELINE})")
+    args = parser.parse_args(argv)
+
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    only = [s.strip() for s in args.only.split(",")] if args.only else None
+    unknown = set(only or ()) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    report = run(
+        sizes, seed=args.seed, only=only, progress=lambda m: print(f"running {m}…", file=sys.stderr),
+        note_length=args.note_length, tag_cardinality=args.tag_cardinality,
+    )
+    print(_table(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.save_baseline:
+        path = args.baseline or DEFAULT_BASELINE
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {path}", file=sys.stderr)
+        return 0
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"no baseline at {args.baseline}; record one on this machine with --save-baseline", file=sys.stderr)
+            return 2
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            problems = compare(report, json.load(f), args.tolerance)
+        for p in problems:
+            print(f"REGRESSION {p}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import datetime as dt
+import math
+from typing import Optional
+
+import numpy as np
+
+# Deterministic synthetic histories for benchmarks and tests. The same
+# arguments always give the same records, on any machine.
+
+TOPICS = (
+    "Python", "SQL", "Statistics", "Linear algebra", "Spanish", "Guitar", "Drawing", "Rust",
+    "Algorithms", "Networking", "Writing", "Chess", "Calculus", "Docker", "Git", "Typing",
+)
+WORDS = (
+    "reviewed", "practiced", "notes", "exercise", "chapter", "problem", "solved", "read", "built",
+    "tested", "refactored", "flashcards", "scales", "sketch", "proof", "query", "index", "loop",
+    "function", "vocabulary", "grammar", "tempo", "shading", "recursion", "deploy", "branch",
+)
+# Distinct note texts per field; notes are drawn from this pool
+NOTE_POOL = 64
+
+
+def _notes(rng: np.random.Generator, length: int) -> list[str]:
+    if length <= 0:
+        return [""]
+    out = []
+    for _ in range(NOTE_POOL):
+        words = rng.choice(WORDS, size=length // 4 + 1)
+        out.append(" ".join(words)[:length])
+    return out
+
+
+def generate_history(
+    rows: int,
+    *,
+    years: Optional[float] = None,
+    start: dt.date = dt.date(2000, 1, 1),
+    study_rate: float = 0.8,
+    note_length: int = 120,
+    tag_cardinality: int = 12,
+    seed: int = 0,
+) -> list[dict]:
+    """`rows` entries (one per day, ascending) in the JSON export shape.
+
+    Days are drawn from `years` years after `start`, or by default from a
+    span sized so about `study_rate` of the days are studied. Notes are about
+    `note_length` characters; tags (0-3 per entry) come from
+    `tag_cardinality` distinct names.
+    """
+    rng = np.random.default_rng(seed)
+    span = int(round(years * 365.25)) if years is not None else int(math.ceil(rows / study_rate))
+    if rows > span:
+        raise ValueError(f"{rows} entries do not fit in {span} days")
+    offsets = np.sort(rng.choice(span, size=rows, replace=False)) if rows else np.zeros(0, dtype=np.int64)
+    first = (start - dt.date(1970, 1, 1)).days
+    dates = (offsets + first).astype("datetime64[D]").astype(str)
+    minutes = rng.integers(1, 37, size=rows) * 5
+    confidence = rng.integers(1, 6, size=rows)
+    topics = rng.integers(0, len(TOPICS), size=rows)
+    note_idx = rng.integers(0, NOTE_POOL, size=(rows, 3))
+    tag_names = [f"tag{i}" for i in range(max(1, tag_cardinality))]
+    tag_count = rng.integers(0, 4, size=rows) if tag_cardinality else np.zeros(rows, dtype=np.int64)
+    tag_idx = rng.integers(0, len(tag_names), size=(rows, 3))
+    notes = _notes(rng, note_length)
+    pool = len(notes)
+    # Plain lists: indexing NumPy scalars per row is several times slower
+    dates, minutes, confidence = dates.tolist(), minutes.tolist(), confidence.tolist()
+    topics, note_idx = topics.tolist(), (note_idx % pool).tolist()
+    tag_count, tag_idx = tag_count.tolist(), tag_idx.tolist()
+    out = []
+    for i in range(rows):
+        practiced, challenges, wins = note_idx[i]
+        tags = dict.fromkeys(tag_names[j] for j in tag_idx[i][: tag_count[i]])
+        out.append({
+            "date": dates[i],
+            "topic": TOPICS[topics[i]],
+            "minutes": minutes[i],
+            "practiced": notes[practiced],
+            "challenges": notes[challenges],
+            "wins": notes[wins],
+            "confidence": confidence[i],
+            "tags": ", ".join(tags),
+        })
+    return out
+
+
+def generate_team(learners: int, rows: int, *, seed: int = 0, **kwargs) -> dict[str, list[dict]]:
+    """One history per learner ("learner01", ...), each seeded separately."""
+    return {
+        f"learner{i + 1:02d}": generate_history(rows, seed=seed + i, **kwargs)
+        for i in range(learners)
+    }
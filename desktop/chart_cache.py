@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from PySide6 import QtGui
+
+from services import storage
+
+
+def default_directory() -> str:
+    """Chart images live next to the database (data/cache/charts)."""
+    return os.path.join(os.path.dirname(storage.DB_PATH), "cache", "charts")
+
+
+class ChartImageCache:
+    """Rendered chart images, in memory (LRU) and as PNGs under `directory`.
+
+    Keys are tuples of plain values (data version, chart name, pixel size,
+    theme colors, ...); anything that changes the picture must be part of
+    the key, so entries never need invalidating. Safe to use from the
+    render worker and the GUI thread at once.
+    """
+
+    def __init__(self, directory: str, max_images: int = 24, max_files: int = 300):
+        self.directory = directory
+        self.max_images = max_images
+        self.max_files = max_files
+        self._images: OrderedDict[tuple, QtGui.QImage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: tuple) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.png")
+
+    def get(self, key: tuple) -> Optional[QtGui.QImage]:
+        """Memory lookup only; cheap enough for the GUI thread."""
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+            return image
+
+    def load(self, key: tuple, dpr: float = 1.0) -> Optional[QtGui.QImage]:
+        """Memory, then disk. Disk hits are promoted to memory."""
+        image = self.get(key)
+        if image is not None:
+            return image
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        image = QtGui.QImage(path)
+        if image.isNull():
+            return None
+        try:
+            os.utime(path)  # pruning drops the least recently used files
+        except OSError:
+            pass
+        image.setDevicePixelRatio(dpr)
+        self._remember(key, image)
+        return image
+
+    def put(self, key: tuple, image: QtGui.QImage) -> None:
+        self._remember(key, image)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write then rename so a crash never leaves a truncated PNG behind
+            path = self._path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            if image.save(tmp, "PNG"):
+                os.replace(tmp, path)
+            self._prune()
+        except OSError:
+            # The disk copy is only an optimisation
+            pass
+
+    def _remember(self, key: tuple, image: QtGui.QImage) -> None:
+        with self._lock:
+            self._images[key] = image
+            self._images.move_to_end(key)
+            while len(self._images) > self.max_images:
+                self._images.popitem(last=False)
+
+    def _prune(self) -> None:
+        entries = [e for e in os.scandir(self.directory) if e.name.endswith(".png")]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for e in entries[: len(entries) - self.max_files]:
+            try:
+                os.remove(e.path)
+            except OSError:
+                pass
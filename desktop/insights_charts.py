@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PySide6 import QtGui
+
+from services.analytics import DailySeries
+from services.charts import BIN_DAYS, CHARTS, bin_sums, downsample, lttb_indices, pick_bin, window_slice
+
+# Insights chart drawing. Imported on first use (matplotlib is heavy) by the
+# render worker; it draws with the Agg backend into images and never touches
+# widgets.
+
+
+BIN_LABELS = {"day": "Minutes", "week": "Minutes per week", "month": "Minutes per month"}
+# Show markers only when points are far enough apart to see them
+MARKER_MAX_POINTS = 60
+
+
+def _date_axis(ax, lo: int, hi: int) -> None:
+    # Day ordinals are matplotlib date numbers (both count days from 1970-01-01)
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+    ax.set_xlim(lo - 0.5, hi + 0.5)
+
+
+def _line(ax, x, y, width_px: int, **kw):
+    x, y = downsample(x, y, width_px)
+    if x.size <= MARKER_MAX_POINTS:
+        kw.setdefault("marker", "o")
+    ax.plot(x, y, **kw)
+
+
+def draw_insights(
+    figs,
+    series: DailySeries,
+    overlay: str = "None",
+    view: Optional[tuple[int, int]] = None,
+    width_px: int = 600,
+) -> str:
+    """Draw minutes/confidence/progress for the days in `view` (inclusive
+    ordinals; None = everything). Only that window is read; bars are
+    binned by day, week or month to fit `width_px` and lines are LTTB
+    downsampled to about one point per pixel. Returns the bin unit used.
+    """
+    fig1, fig2, fig3 = figs
+    for fig in figs:
+        fig.clear()
+    if not len(series):
+        for fig in figs:
+            ax = fig.add_subplot(111)
+            ax.text(0.5, 0.5, "No data yet", ha="center", va="center")
+            ax.axis("off")
+        return "day"
+    start, n = series.start, len(series)
+    lo, hi = view or (start, start + n - 1)
+    sl = window_slice(start, n, lo, hi)
+    x = np.arange(sl.start, sl.stop) + start
+    studied = series.studied[sl]
+    width_px = max(50, int(width_px))
+    unit = pick_bin(hi - lo + 1, width_px)
+
+    # Minutes: bars per studied day, or summed per week/month
+    ax1 = fig1.add_subplot(111)
+    if unit == "day":
+        ax1.bar(x[studied], series.minutes[sl][studied], width=0.8, color="#4C78A8")
+    else:
+        starts, lengths, sums = bin_sums(x, series.minutes[sl], unit)
+        ax1.bar(starts, sums, width=lengths * 0.9, align="edge", color="#4C78A8")
+    ax1.set_ylabel(BIN_LABELS[unit])
+    # Confidence and progress: studied days only
+    ax2 = fig2.add_subplot(111)
+    _line(ax2, x, series.confidence[sl], width_px, color="#F58518")
+    ax2.set_ylim(0.8, 5.2)
+    ax2.set_ylabel("Confidence")
+    ax3 = fig3.add_subplot(111)
+    _line(ax3, x, series.progress[sl], width_px, color="#54A24B")
+    ax3.set_ylabel("Progress")
+
+    _draw_overlay(series, overlay, sl, x, unit, width_px, ax1, ax2, ax3)
+    for ax in (ax1, ax2, ax3):
+        _date_axis(ax, lo, hi)
+        if ax.get_legend_handles_labels()[0]:
+            ax.legend(loc="upper left", fontsize=8)
+    return unit
+
+
+def _draw_overlay(series: DailySeries, overlay: str, sl: slice, x, unit: str, width_px: int, ax1, ax2, ax3) -> None:
+    if overlay == "None":
+        return
+    # Daily averages become per-bin totals when the minutes bars are binned
+    scale = BIN_DAYS[unit] if unit != "month" else 30.44
+    if overlay.endswith("-day average"):
+        w = int(overlay.split("-")[0])
+        _line(ax1, x, series.moving_average(w)[sl] * scale, width_px, color="#E45756", linewidth=2, label=overlay, marker=None)
+        _line(ax2, x, series.moving_average(w, "confidence")[sl], width_px, color="#72B7B2", linewidth=2, label=overlay, marker=None)
+        _line(ax3, x, series.moving_average(w, "progress")[sl], width_px, color="#B279A2", linewidth=2, label=overlay, marker=None)
+    elif overlay.startswith("Confidence trend"):
+        _line(ax2, x, series.ewma(14)[sl], width_px, color="#72B7B2", linewidth=2, label="EWMA (14)", marker=None)
+    else:
+        lo = series.rolling_percentile(25, 30)[sl] * scale
+        hi = series.rolling_percentile(75, 30)[sl] * scale
+        keep = ~(np.isnan(lo) | np.isnan(hi))
+        xs, lo, hi = x[keep], lo[keep], hi[keep]
+        # Thin both edges with the indices picked for the band's midline
+        idx = lttb_indices(xs, (lo + hi) / 2, width_px)
+        ax1.fill_between(xs[idx], lo[idx], hi[idx], color="#E45756", alpha=0.2, label="p25–p75 (30d)")
+
+
+def _apply_colors(fig, bg: str, fg: str) -> None:
+    fig.set_facecolor(bg)
+    for ax in fig.axes:
+        ax.set_facecolor(bg)
+        ax.tick_params(colors=fg)
+        ax.xaxis.get_offset_text().set_color(fg)
+        ax.yaxis.label.set_color(fg)
+        for spine in ax.spines.values():
+            spine.set_color(fg)
+        for text in ax.texts:
+            text.set_color(fg)
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.get_frame().set_facecolor(bg)
+            legend.get_frame().set_edgecolor(fg)
+            for text in legend.get_texts():
+                text.set_color(fg)
+
+
+def render_images(
+    series: DailySeries,
+    overlay: str,
+    view: Optional[tuple[int, int]],
+    size: tuple[int, int],
+    dpr: float = 1.0,
+    colors: tuple[str, str] = ("#FFFFFF", "#000000"),
+) -> list[QtGui.QImage]:
+    """Render the CHARTS into QImages of `size` logical pixels at device
+    pixel ratio `dpr`, in the (background, foreground) `colors`. Safe to call
+    off the GUI thread as long as calls are not concurrent."""
+    w, h = max(50, int(size[0])), max(50, int(size[1]))
+    figs = [Figure(figsize=(w / 100, h / 100), dpi=100 * dpr, tight_layout=True) for _ in CHARTS]
+    draw_insights(figs, series, overlay, view, w)
+    images = []
+    for fig in figs:
+        _apply_colors(fig, *colors)
+        canvas = FigureCanvasAgg(fig)
+        canvas.draw()
+        rgba = np.asarray(canvas.buffer_rgba())
+        image = QtGui.QImage(rgba.data, rgba.shape[1], rgba.shape[0], rgba.strides[0], QtGui.QImage.Format_RGBA8888).copy()
+        image.setDevicePixelRatio(dpr)
+        images.append(image)
+    return images
@@ -3,36 +3,51 @@ import os
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
+import bisect
 import datetime as dt
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Optional
 
+import numpy as np
 from PySide6 import QtWidgets, QtCore, QtGui
 from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex, QPropertyAnimation
 from PySide6.QtGui import QShortcut, QKeySequence
 from PySide6.QtWidgets import QGraphicsOpacityEffect, QGraphicsDropShadowEffect
 
-import pandas as pd
-
+# Heavy modules (pandas, matplotlib, openpyxl) are imported where they are
+# first needed so the window can appear quickly; see tests/test_startup.py.
 from services.storage import (
     init_db,
-    get_all_entries_df,
-    upsert_entry,
-    get_entry_by_date,
-    delete_entry,
+    backup_db_daily,
     get_setting,
-    set_setting,
+    get_streak_state,
+    fetch_entries_for_dates,
+    fetch_dates_ordered_by,
+    fetch_sorted_page,
+    fetch_day_summaries,
+    get_data_version,
+    archive_cutoff,
+    format_maintenance,
+    maintenance_status,
+    run_maintenance,
 )
-from services.metrics import compute_streaks, weekly_minutes
+from services import instrumentation
+from services.charts import CHARTS
+from services.metrics import weekly_summary_db
 from services.validation import validate_entry_fields, MAX_TOPIC_LEN, MAX_TEXT_LEN, MAX_TAGS, MAX_TAG_LEN
+from desktop.store import EntryStore, NOTE_FIELDS, entry_record
+from desktop.workers import BackgroundRefresher, CancelToken, ProgressReporter, make_busy_label
+from services.entry_index import EntryIndex
 from services.filesync import (
+    SYNC_FORMAT_KEY,
     create_or_sync_on_launch,
+    get_sync_format,
     register_atexit_export,
     export_db_to_json,
-    import_json_to_db,
+    save_journal,
 )
-import matplotlib
-matplotlib.use("QtAgg")
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 
 
 def _build_stylesheet(theme: str = "dark", accent: str = "#2F6FEB") -> str:
@@ -170,9 +185,24 @@ def add_card_shadow(widget: QtWidgets.QWidget):
         pass
 
 
+def warn_if_archived(parent: QtWidgets.QWidget, date: dt.date) -> bool:
+    """Archived years are read-only; say so (and return True) for their dates."""
+    cutoff = archive_cutoff()
+    if cutoff is None or date >= cutoff:
+        return False
+    QtWidgets.QMessageBox.warning(
+        parent,
+        "Archived",
+        f"{date.year} is archived, so its entries cannot be changed.\n"
+        f"Run `python -m services archive --unarchive-from {date.year}` to make it editable again.",
+    )
+    return True
+
+
 class LogEntryTab(QtWidgets.QWidget):
-    def __init__(self):
+    def __init__(self, store: EntryStore):
         super().__init__()
+        self._store = store
         self._build_ui()
 
     def _build_ui(self):
@@ -258,19 +288,12 @@ class LogEntryTab(QtWidgets.QWidget):
         if errors:
             QtWidgets.QMessageBox.critical(self, "Validation Error", "\n".join(errors))
             return
+        if warn_if_archived(self, date_py):
+            return
         if warnings:
             QtWidgets.QMessageBox.information(self, "Note", "\n".join(warnings))
 
-        upsert_entry(
-            date=date_py,
-            topic=sanitized["topic"],
-            minutes=sanitized["minutes"],
-            practiced=sanitized["practiced"],
-            challenges=sanitized["challenges"],
-            wins=sanitized["wins"],
-            confidence=sanitized["confidence"],
-            tags=sanitized["tags"],
-        )
+        self._store.upsert(date=date_py, **sanitized)
         QtWidgets.QMessageBox.information(self, "Saved", "Entry saved.")
 
     def new_entry(self):
@@ -284,70 +307,216 @@ class LogEntryTab(QtWidgets.QWidget):
         self.tags_edit.clear()
 
 
+def _month_page_range(year: int, month: int) -> tuple[dt.date, dt.date]:
+    """Dates a calendar page for (year, month) can show, including the
+    trailing/leading days of the neighbouring months (6 weeks at most)."""
+    first = dt.date(year, month, 1)
+    last = (first.replace(day=28) + dt.timedelta(days=4)).replace(day=1) - dt.timedelta(days=1)
+    return first - dt.timedelta(days=7), last + dt.timedelta(days=14)
+
+
+def _load_month_pages(cancel, months) -> dict:
+    pages = {}
+    for ym in months:
+        if cancel.cancelled:
+            break
+        pages[ym] = {d: (_badge_snippet(topic), conf) for d, topic, conf in fetch_day_summaries(*_month_page_range(*ym))}
+    return pages
+
+
+# Shared by every calendar: static badge colors and prerendered badges
+_BADGE_FILL = QtGui.QColor(47, 111, 235, 34)
+_BADGE_PEN = QtGui.QPen(QtGui.QColor(47, 111, 235))
+_CONFIDENCE_COLORS = {
+    1: QtGui.QColor(220, 76, 70),
+    2: QtGui.QColor(244, 154, 52),
+    3: QtGui.QColor(255, 204, 0),
+    4: QtGui.QColor(76, 175, 80),
+    5: QtGui.QColor(67, 160, 71),
+}
+_BADGE_CACHE: OrderedDict[tuple, QtGui.QPixmap] = OrderedDict()
+_BADGE_CACHE_SIZE = 512
+
+
+def _badge_snippet(topic: str) -> str:
+    topic = topic.strip()
+    return topic[:22] + ("…" if len(topic) > 22 else "")
+
+
 class EntryCalendarWidget(QtWidgets.QCalendarWidget):
+    """Calendar with a topic/confidence badge per logged day.
+
+    Only the shown page's date range is read (one range query on
+    currentPageChanged); each page holds a compact (badge snippet,
+    confidence) per day, and neighbouring months are prefetched in the
+    background. A few recent pages are kept so paging back and forth does
+    not re-query. Badges are drawn from a shared pixmap cache.
+    """
+
+    MAX_PAGES = 12
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self._entries: dict[dt.date, dict] = {}
+        # (year, month) -> {date: (snippet, confidence)}, least recently used first
+        self._pages: OrderedDict[tuple, dict] = OrderedDict()
+        self._days: dict[dt.date, tuple] = {}
+        self._writes = 0
+        self._prefetch_writes = 0
+        self._style_key = None
+        self._prefetcher = BackgroundRefresher(_load_month_pages, self._store_prefetched, self)
         self.setGridVisible(True)
         self.setVerticalHeaderFormat(QtWidgets.QCalendarWidget.NoVerticalHeader)
+        self.currentPageChanged.connect(self._show_page)
+        self._show_page(self.yearShown(), self.monthShown())
 
-    def set_entries(self, entries: dict[dt.date, dict]):
-        self._entries = entries or {}
+    def _show_page(self, year: int, month: int):
+        ym = (year, month)
+        if ym not in self._pages:
+            try:
+                self._put_page(ym, _load_month_pages(CancelToken(), [ym])[ym])
+            except Exception:
+                self._put_page(ym, {})
+        self._pages.move_to_end(ym)
+        self._days = self._pages[ym]
+        self._repaint()
+        self._prefetch(ym)
+
+    def _put_page(self, ym: tuple, days: dict):
+        self._pages[ym] = days
+        while len(self._pages) > self.MAX_PAGES:
+            self._pages.popitem(last=False)
+
+    def _prefetch(self, ym: tuple):
+        y, m = ym
+        around = [(y - 1, 12) if m == 1 else (y, m - 1), (y + 1, 1) if m == 12 else (y, m + 1)]
+        missing = [p for p in around if p not in self._pages]
+        if missing:
+            self._prefetch_writes = self._writes
+            self._prefetcher.request(missing)
+
+    def _store_prefetched(self, pages: dict):
+        if self._writes != self._prefetch_writes:
+            return  # a day changed while reading; pages load on demand instead
+        for ym, days in pages.items():
+            if ym not in self._pages:
+                self._put_page(ym, days)
+                self._pages.move_to_end((self.yearShown(), self.monthShown()))
+
+    def _repaint(self):
         # QCalendarWidget does not expose viewport(); request a repaint of cells
         try:
             self.updateCells()
         except Exception:
             self.update()
 
+    def reload(self):
+        """Drop cached pages (after imports/sync) and re-read the shown one."""
+        self._writes += 1
+        self._pages.clear()
+        self._show_page(self.yearShown(), self.monthShown())
+
+    def refresh_date(self, d: dt.date):
+        """Re-read one day after its entry changed and repaint it."""
+        self._writes += 1
+        try:
+            rows = fetch_day_summaries(d, d)
+        except Exception:
+            rows = []
+        for ym, days in self._pages.items():
+            lo, hi = _month_page_range(*ym)
+            if lo <= d <= hi:
+                days.pop(d, None)
+                for _, topic, conf in rows:
+                    days[d] = (_badge_snippet(topic), conf)
+        self.updateCell(QtCore.QDate(d.year, d.month, d.day))
+
+    def changeEvent(self, event: QtCore.QEvent):
+        super().changeEvent(event)
+        if event.type() in (QtCore.QEvent.PaletteChange, QtCore.QEvent.FontChange, QtCore.QEvent.StyleChange):
+            self._style_key = None
+            _BADGE_CACHE.clear()
+
+    def _badge_style_key(self) -> tuple:
+        if self._style_key is None:
+            pal = self.palette()
+            self._style_key = (pal.color(QtGui.QPalette.Base).rgba(), pal.color(QtGui.QPalette.Text).rgba(), self.font().key())
+        return self._style_key
+
+    def _badge(self, rec: tuple, size: QtCore.QSize, dpr: float) -> QtGui.QPixmap:
+        key = (rec[0], rec[1], size.width(), size.height(), self._badge_style_key(), dpr)
+        pix = _BADGE_CACHE.get(key)
+        if pix is not None:
+            _BADGE_CACHE.move_to_end(key)
+            return pix
+        pix = QtGui.QPixmap(max(1, round(size.width() * dpr)), max(1, round(size.height() * dpr)))
+        pix.setDevicePixelRatio(dpr)
+        pix.fill(Qt.transparent)
+        painter = QtGui.QPainter(pix)
+        painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
+        painter.setFont(self.font())
+        # Draw a rounded badge and topic snippet
+        rounded = QtCore.QRect(QtCore.QPoint(0, 0), size).adjusted(3, 20, -3, -3)
+        path = QtGui.QPainterPath()
+        path.addRoundedRect(rounded, 8, 8)
+        painter.fillPath(path, _BADGE_FILL)
+        painter.setPen(_BADGE_PEN)
+        painter.drawText(rounded.adjusted(6, 4, -6, -4), Qt.TextWordWrap, rec[0])
+        # Confidence dot
+        if rec[1]:
+            dot = QtCore.QRect(rounded.right() - 12, rounded.top() - 12, 10, 10)
+            painter.setBrush(_CONFIDENCE_COLORS.get(rec[1], _BADGE_PEN.color()))
+            painter.setPen(QtCore.Qt.NoPen)
+            painter.drawEllipse(dot)
+        painter.end()
+        _BADGE_CACHE[key] = pix
+        while len(_BADGE_CACHE) > _BADGE_CACHE_SIZE:
+            _BADGE_CACHE.popitem(last=False)
+        return pix
+
     def paintCell(self, painter: QtGui.QPainter, rect: QtCore.QRect, date: QtCore.QDate):
         super().paintCell(painter, rect, date)
-        d = dt.date(date.year(), date.month(), date.day())
-        if d in self._entries:
-            # Draw a rounded badge and topic snippet
-            painter.save()
-            painter.setRenderHint(QtGui.QPainter.Antialiasing, True)
-            bg = QtGui.QColor(47, 111, 235, 34)
-            rounded = rect.adjusted(3, 20, -3, -3)
-            path = QtGui.QPainterPath()
-            path.addRoundedRect(rounded, 8, 8)
-            painter.fillPath(path, bg)
-            painter.setPen(QtGui.QPen(QtGui.QColor(47, 111, 235)))
-            topic = str(self._entries[d].get("topic", "")).strip()
-            snippet = topic[:22] + ("…" if len(topic) > 22 else "")
-            painter.drawText(rounded.adjusted(6, 4, -6, -4), Qt.TextWordWrap, snippet)
-            # Confidence dot
-            try:
-                conf = int(self._entries[d].get("confidence", 0))
-            except Exception:
-                conf = 0
-            if conf:
-                colors = {1: QtGui.QColor(220, 76, 70), 2: QtGui.QColor(244, 154, 52), 3: QtGui.QColor(255, 204, 0), 4: QtGui.QColor(76, 175, 80), 5: QtGui.QColor(67, 160, 71)}
-                dot = QtCore.QRect(rounded.right()-12, rounded.top()-12, 10, 10)
-                painter.setBrush(colors.get(conf, QtGui.QColor(47,111,235)))
-                painter.setPen(QtCore.Qt.NoPen)
-                painter.drawEllipse(dot)
-            painter.restore()
+        rec = self._days.get(dt.date(date.year(), date.month(), date.day()))
+        if rec is not None:
+            # Prerendered per (snippet, confidence, size, style, dpr): a blit per cell
+            painter.drawPixmap(rect.topLeft(), self._badge(rec, rect.size(), painter.device().devicePixelRatioF()))
 
 
 class HistoryTab(QtWidgets.QWidget):
-    def __init__(self):
+    SORT_MODES = {
+        "Date": "date",
+        "Minutes (desc)": "minutes",
+        "Confidence (desc)": "confidence",
+        "Progress (desc)": "progress",
+    }
+
+    def __init__(self, store: EntryStore):
         super().__init__()
+        self._store = store
         self._build_ui()
-        self.refresh()
+        store.entriesReset.connect(self.rebuild)
+        store.entryAdded.connect(self.calendar.refresh_date)
+        store.entryChanged.connect(self.calendar.refresh_date)
+        store.entryRemoved.connect(self.calendar.refresh_date)
+        # Calendar and sorted list query SQLite themselves; no full load needed
 
     def _build_ui(self):
         root = QtWidgets.QVBoxLayout(self)
         root.setContentsMargins(16, 16, 16, 16)
         root.setSpacing(12)
+        head = QtWidgets.QHBoxLayout()
         heading = QtWidgets.QLabel("History", self); heading.setProperty("heading", True)
-        root.addWidget(heading)
+        head.addWidget(heading)
+        head.addStretch(1)
+        self.busy_label = make_busy_label(self, self._store)
+        head.addWidget(self.busy_label)
+        root.addLayout(head)
 
         # Controls
         ctrl = QtWidgets.QHBoxLayout()
         ctrl.setSpacing(8)
         self.sort_combo = QtWidgets.QComboBox(self)
-        self.sort_combo.addItems(["Date", "Minutes (desc)", "Confidence (desc)", "Progress (desc)"])
-        self.sort_combo.currentIndexChanged.connect(self._rebuild_sorted)
+        self.sort_combo.addItems(list(self.SORT_MODES))
+        self.sort_combo.currentIndexChanged.connect(self._on_sort_mode)
         ctrl.addWidget(QtWidgets.QLabel("Sort"))
         ctrl.addWidget(self.sort_combo)
         ctrl.addStretch(1)
@@ -374,8 +543,11 @@ class HistoryTab(QtWidgets.QWidget):
         btnrow = QtWidgets.QHBoxLayout(); btnrow.addWidget(self.details_btn); btnrow.addWidget(self.edit_btn); btnrow.addWidget(self.delete_btn)
         rlayout.addLayout(btnrow)
         rlayout.addWidget(QtWidgets.QLabel("Sorted Dates", right))
-        self.sorted_list = QtWidgets.QListWidget(right)
-        self.sorted_list.itemClicked.connect(self._on_sorted_item)
+        self.sorted_list = QtWidgets.QListView(right)
+        self.sorted_list.setUniformItemSizes(True)
+        self.sorted_model = SortedEntryListModel(self._store, self.sorted_list)
+        self.sorted_list.setModel(self.sorted_model)
+        self.sorted_list.clicked.connect(self._on_sorted_item)
         rlayout.addWidget(self.sorted_list, 1)
         split.addWidget(right)
         split.setStretchFactor(0, 2)
@@ -383,21 +555,15 @@ class HistoryTab(QtWidgets.QWidget):
         root.addWidget(split, 1)
 
     def refresh(self):
-        df = get_all_entries_df()
-        self._hist_df = pd.DataFrame(columns=["date","topic","minutes","confidence","progress","tags","practiced","challenges","wins"]) if df.empty else df.copy()
-        if not self._hist_df.empty:
-            self._hist_df["date"] = pd.to_datetime(self._hist_df["date"]).dt.date
-            for c in ["practiced","challenges","wins","tags","topic"]:
-                if c not in self._hist_df.columns:
-                    self._hist_df[c] = ""
-            self._hist_df["minutes"] = self._hist_df["minutes"].astype(int)
-            self._hist_df["confidence"] = self._hist_df["confidence"].astype(int)
-            self._hist_df["progress"] = self._hist_df["minutes"].astype(int) * self._hist_df["confidence"].astype(int)
-
-        # Feed calendar entries
-        entries = {row["date"]: row for _, row in self._hist_df.iterrows()} if not self._hist_df.empty else {}
-        self.calendar.set_entries(entries)
-        self._rebuild_sorted()
+        # Full reload (F5); the store emits entriesReset when done
+        self._store.reload()
+
+    def rebuild(self):
+        # The sorted list re-queries itself on entriesReset
+        self.calendar.reload()
+
+    def _on_sort_mode(self):
+        self.sorted_model.set_mode(self.SORT_MODES[self.sort_combo.currentText()])
 
     def _selected_date(self) -> dt.date | None:
         qd = self.calendar.selectedDate()
@@ -406,42 +572,18 @@ class HistoryTab(QtWidgets.QWidget):
         return dt.date(qd.year(), qd.month(), qd.day())
 
     def _selected_row_dict(self) -> dict | None:
-        if self._hist_df is None or self._hist_df.empty:
-            return None
         d = self._selected_date()
         if not d:
             return None
-        row = self._hist_df[self._hist_df["date"] == d]
-        if row.empty:
-            return None
-        row = row.iloc[0]
-        return {k: ("" if pd.isna(v) else v) for k, v in row.to_dict().items()}
+        rec = self._store.get(d)
+        return dict(rec) if rec else None
 
     def _on_day_selected(self):
         # No-op for now; selection used by buttons
         pass
 
-    def _rebuild_sorted(self):
-        self.sorted_list.clear()
-        if self._hist_df is None or self._hist_df.empty:
-            return
-        mode = self.sort_combo.currentText()
-        df = self._hist_df.copy()
-        if mode == "Minutes (desc)":
-            df = df.sort_values(["minutes","date"], ascending=[False, False])
-        elif mode == "Confidence (desc)":
-            df = df.sort_values(["confidence","date"], ascending=[False, False])
-        elif mode == "Progress (desc)":
-            df = df.sort_values(["progress","date"], ascending=[False, False])
-        else:
-            df = df.sort_values("date", ascending=False)
-        for _, r in df.iterrows():
-            item = QtWidgets.QListWidgetItem(f"{r['date']} — {str(r.get('topic',''))[:40]}")
-            item.setData(Qt.UserRole, r["date"])
-            self.sorted_list.addItem(item)
-
-    def _on_sorted_item(self, item: QtWidgets.QListWidgetItem):
-        d = item.data(Qt.UserRole)
+    def _on_sorted_item(self, index: QModelIndex):
+        d = index.data(Qt.UserRole)
         if isinstance(d, dt.date):
             self.calendar.setSelectedDate(QtCore.QDate(d.year, d.month, d.day))
 
@@ -457,35 +599,36 @@ class HistoryTab(QtWidgets.QWidget):
         if not d:
             QtWidgets.QMessageBox.information(self, "Edit", "Select a row to edit.")
             return
-        row = get_entry_by_date(d)
+        row = self._store.get(d)
         if not row:
             QtWidgets.QMessageBox.warning(self, "Edit", "Entry not found.")
             return
-        dlg = EditDialog(row)
-        if dlg.exec() == QtWidgets.QDialog.Accepted:
-            self.refresh()
+        dlg = EditDialog(row, self._store)
+        dlg.exec()
 
     def delete_selected(self):
         d = self._selected_date()
         if not d:
             QtWidgets.QMessageBox.information(self, "Delete", "Select a row to delete.")
             return
+        if warn_if_archived(self, d):
+            return
         resp = QtWidgets.QMessageBox.question(self, "Confirm Delete", f"Delete entry for {d}?")
         if resp == QtWidgets.QMessageBox.Yes:
-            delete_entry(d)
-            self.refresh()
+            self._store.delete(d)
 
 
 class EditDialog(QtWidgets.QDialog):
-    def __init__(self, row):
+    def __init__(self, row, store: EntryStore):
         super().__init__()
         self.setWindowTitle("Edit Entry")
         self.row = row
+        self._store = store
         self._build_ui()
 
     def _build_ui(self):
         layout = QtWidgets.QFormLayout(self)
-        d = pd.to_datetime(self.row["date"]).date()
+        d = dt.date.fromisoformat(str(self.row["date"])[:10])
         self.date_label = QtWidgets.QLabel(str(d), self)
         self.topic_edit = QtWidgets.QLineEdit(self.row["topic"] or "", self)
         self.topic_edit.setMaxLength(MAX_TOPIC_LEN)
@@ -513,7 +656,7 @@ class EditDialog(QtWidgets.QDialog):
         layout.addRow(btns)
 
     def save(self):
-        d = pd.to_datetime(self.row["date"]).date()
+        d = dt.date.fromisoformat(str(self.row["date"])[:10])
         sanitized, messages = validate_entry_fields(
             topic=self.topic_edit.text(),
             minutes=int(self.minutes.value()),
@@ -528,19 +671,12 @@ class EditDialog(QtWidgets.QDialog):
         if errors:
             QtWidgets.QMessageBox.critical(self, "Validation Error", "\n".join(errors))
             return
+        if warn_if_archived(self, d):
+            return
         if warnings:
             QtWidgets.QMessageBox.information(self, "Note", "\n".join(warnings))
 
-        upsert_entry(
-            date=d,
-            topic=sanitized["topic"],
-            minutes=sanitized["minutes"],
-            practiced=sanitized["practiced"],
-            challenges=sanitized["challenges"],
-            wins=sanitized["wins"],
-            confidence=sanitized["confidence"],
-            tags=sanitized["tags"],
-        )
+        self._store.upsert(date=d, **sanitized)
         self.accept()
 
 
@@ -626,24 +762,156 @@ class EntryDetailsDialog(QtWidgets.QDialog):
             QtWidgets.QMessageBox.warning(self, "Copy Failed", str(ex))
 
 
+def export_json_with_feedback(parent: QtWidgets.QWidget) -> None:
+    try:
+        export_db_to_json()
+        QtWidgets.QMessageBox.information(parent, "Export", "JSON exported successfully.")
+    except Exception as ex:
+        QtWidgets.QMessageBox.critical(parent, "Export Failed", str(ex))
+
+
+class JsonImport(QtCore.QObject):
+    """One JSON import on the thread pool behind a modal progress dialog.
+    The file is parsed and validated once (services.importer.import_file);
+    Cancel rolls the transaction back. While the launch sync holds the
+    store's writes the import waits for it; once entries were saved the
+    store reloads (its entriesReset reaches every page) and `imported` is
+    emitted.
+    """
+
+    imported = QtCore.Signal()
+
+    def __init__(self, parent: QtWidgets.QWidget, path: str, store: EntryStore):
+        super().__init__(parent)
+        self._parent = parent
+        self._path = path
+        self._store = store
+        self._cancel = CancelToken()
+        self._progress = ProgressReporter(self)
+        self._progress.changed.connect(self._on_progress)
+        self._dialog = QtWidgets.QProgressDialog("Reading file…", "Cancel", 0, 0, parent)
+        self._dialog.setWindowTitle("Import")
+        self._dialog.setWindowModality(Qt.WindowModal)
+        self._dialog.setMinimumDuration(0)
+        self._dialog.setAutoClose(False)
+        self._dialog.setAutoReset(False)
+        self._dialog.canceled.connect(self._on_cancel)
+        # The job gets its own token: a cancelled import still reports back,
+        # so the message reflects whether the rollback or the commit won
+        self._runner = BackgroundRefresher(self._run, self._finish, self)
+        self._runner.failed.connect(self._fail)
+
+    def start(self) -> None:
+        self._dialog.show()
+        if self._store.is_holding():
+            self._dialog.setLabelText("Waiting for sync to finish…")
+        self._store.after_release(self._begin)
+
+    def _begin(self) -> None:
+        # A cancel while waiting still goes through the job: import_file
+        # returns a cancelled plan without writing anything
+        self._runner.request(self._path, self._cancel, self._progress)
+
+    @staticmethod
+    def _run(_, path, cancel, progress):
+        from services.importer import import_file
+
+        return import_file(path, cancel=cancel, progress=progress)
+
+    def _on_progress(self, stage: str, done: int, total: int):
+        if not total:
+            self._dialog.setRange(0, 0)
+            self._dialog.setLabelText(f"{stage} file…")
+            return
+        self._dialog.setRange(0, total)
+        self._dialog.setValue(done)
+        self._dialog.setLabelText(f"{stage} entries… {done:,} of {total:,}")
+
+    def _on_cancel(self):
+        self._cancel.cancelled = True
+
+    def _finish(self, plan):
+        self._dialog.close()
+        if plan["cancelled"]:
+            QtWidgets.QMessageBox.information(self._parent, "Import", "Import cancelled. Nothing was saved.")
+        elif plan["fatal"]:
+            QtWidgets.QMessageBox.critical(
+                self._parent, "Import Failed", "\n".join(plan["fatal"][:20]) + "\n\nNothing was saved."
+            )
+        else:
+            text = f"Import completed: {plan['inserted']} new, {plan['updated']} updated."
+            if plan["messages"]:
+                text += f"\n\n{len(plan['messages'])} note(s):\n" + "\n".join(plan["messages"][:10])
+            QtWidgets.QMessageBox.information(self._parent, "Import", text)
+            self._store.reload()
+            self.imported.emit()
+        self.deleteLater()
+
+    def _fail(self, message: str):
+        self._dialog.close()
+        QtWidgets.QMessageBox.critical(self._parent, "Import Failed", message)
+        self.deleteLater()
+
+
+def prompt_json_import(parent: QtWidgets.QWidget, store: EntryStore) -> Optional[JsonImport]:
+    """Ask for a JSON file and import it in the background through `store`
+    (see JsonImport). Needs no page to exist, so the Ctrl+I shortcut works
+    before the Data page is built.
+    """
+    dlg = QtWidgets.QFileDialog(parent)
+    dlg.setFileMode(QtWidgets.QFileDialog.ExistingFile)
+    dlg.setNameFilter("JSON Files (*.json)")
+    if not dlg.exec():
+        return None
+    job = JsonImport(parent, dlg.selectedFiles()[0], store)
+    job.start()
+    return job
+
+
 class DataTab(QtWidgets.QWidget):
-    def __init__(self):
+    SIZE_SAMPLE_ROWS = 50
+    MAX_COLUMN_WIDTH = 320
+    # Shown as "Any" in the date filters
+    NO_DATE = QtCore.QDate(100, 1, 1)
+
+    def __init__(self, store: EntryStore):
         super().__init__()
+        self._store = store
         self._build_ui()
-        self.refresh()
+        store.ensure_loaded()
 
     def _build_ui(self):
         v = QtWidgets.QVBoxLayout(self)
         v.setContentsMargins(16, 16, 16, 16)
         v.setSpacing(12)
+        head = QtWidgets.QHBoxLayout()
         heading = QtWidgets.QLabel("Data", self); heading.setProperty("heading", True)
-        v.addWidget(heading)
+        head.addWidget(heading)
+        head.addStretch(1)
+        self.busy_label = make_busy_label(self, self._store)
+        head.addWidget(self.busy_label)
+        v.addLayout(head)
         card = QtWidgets.QFrame(self); card.setObjectName("Card"); add_card_shadow(card)
         card_layout = QtWidgets.QVBoxLayout(card)
+        card_layout.addLayout(self._build_filter_bar(card))
         self.table = QtWidgets.QTableView(card)
+        # The model follows the store's row-level signals, so it is set once
+        self.model = EntryTableModel(self._store, self.table)
+        self.table.setModel(self.model)
         header = self.table.horizontalHeader()
         header.setStretchLastSection(True)
-        header.setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        # Size columns from a sample of rows, not a pass over every row
+        header.setSectionResizeMode(QtWidgets.QHeaderView.Interactive)
+        header.setResizeContentsPrecision(self.SIZE_SAMPLE_ROWS)
+        self._store.entriesReset.connect(self._fit_columns)
+        self._fit_columns()
+        for sig in (self.model.modelReset, self.model.rowsInserted, self.model.rowsRemoved):
+            sig.connect(self._update_count)
+        self._store.entriesReset.connect(self._update_tags)
+        for sig in (self._store.entryAdded, self._store.entryChanged, self._store.entryRemoved):
+            sig.connect(self._update_tags)
+        self._update_tags()
+        self._update_count()
         self.table.setSortingEnabled(True)
         self.table.setAlternatingRowColors(True)
         self.table.verticalHeader().setVisible(False)
@@ -661,55 +929,125 @@ class DataTab(QtWidgets.QWidget):
         self.import_btn.clicked.connect(self.import_csv)
         self.import_btn.setProperty("accent", True)
 
-    def refresh(self):
-        df = get_all_entries_df()
-        if df.empty:
-            self.table.setModel(None)
+    def _build_filter_bar(self, parent: QtWidgets.QWidget) -> QtWidgets.QLayout:
+        bar = QtWidgets.QHBoxLayout()
+        bar.setSpacing(8)
+
+        def date_edit():
+            edit = QtWidgets.QDateEdit(parent)
+            edit.setCalendarPopup(True)
+            edit.setMinimumDate(self.NO_DATE)
+            edit.setSpecialValueText("Any")
+            edit.setDate(self.NO_DATE)
+            edit.dateChanged.connect(self._apply_filters)
+            return edit
+
+        self.from_edit = date_edit()
+        self.to_edit = date_edit()
+        self.tag_combo = QtWidgets.QComboBox(parent)
+        self.tag_combo.addItem("All tags")
+        self.tag_combo.currentIndexChanged.connect(self._apply_filters)
+        self.topic_filter = QtWidgets.QLineEdit(parent)
+        self.topic_filter.setPlaceholderText("Topic contains…")
+        self.topic_filter.setClearButtonEnabled(True)
+        self.topic_filter.textChanged.connect(self._apply_filters)
+        self.min_minutes = QtWidgets.QSpinBox(parent)
+        self.min_minutes.setRange(0, 1440)
+        self.min_minutes.setSingleStep(15)
+        self.min_minutes.setSpecialValueText("Any")
+        self.min_minutes.valueChanged.connect(self._apply_filters)
+        clear_btn = QtWidgets.QPushButton("Clear", parent)
+        clear_btn.clicked.connect(self.clear_filters)
+        self.count_label = QtWidgets.QLabel(parent)
+
+        bar.addWidget(QtWidgets.QLabel("From"))
+        bar.addWidget(self.from_edit)
+        bar.addWidget(QtWidgets.QLabel("To"))
+        bar.addWidget(self.to_edit)
+        bar.addWidget(self.tag_combo)
+        bar.addWidget(self.topic_filter, 1)
+        bar.addWidget(QtWidgets.QLabel("Min minutes"))
+        bar.addWidget(self.min_minutes)
+        bar.addWidget(clear_btn)
+        bar.addWidget(self.count_label)
+        return bar
+
+    def _filter_date(self, edit: QtWidgets.QDateEdit) -> dt.date | None:
+        qd = edit.date()
+        if qd == self.NO_DATE:
+            return None
+        return dt.date(qd.year(), qd.month(), qd.day())
+
+    def _apply_filters(self, *_):
+        self.model.set_filters(
+            start=self._filter_date(self.from_edit),
+            end=self._filter_date(self.to_edit),
+            tag=self.tag_combo.currentText() if self.tag_combo.currentIndex() > 0 else None,
+            topic=self.topic_filter.text().strip(),
+            min_minutes=self.min_minutes.value(),
+        )
+
+    def clear_filters(self):
+        for w in (self.from_edit, self.to_edit, self.tag_combo, self.topic_filter, self.min_minutes):
+            w.blockSignals(True)
+        self.from_edit.setDate(self.NO_DATE)
+        self.to_edit.setDate(self.NO_DATE)
+        self.tag_combo.setCurrentIndex(0)
+        self.topic_filter.clear()
+        self.min_minutes.setValue(0)
+        for w in (self.from_edit, self.to_edit, self.tag_combo, self.topic_filter, self.min_minutes):
+            w.blockSignals(False)
+        self._apply_filters()
+
+    def _update_tags(self, *_):
+        tags = self.model.tags()
+        current = [self.tag_combo.itemText(i) for i in range(1, self.tag_combo.count())]
+        if tags == current:
             return
-        df = df.sort_values("date", ascending=False).reset_index(drop=True)
-        df["progress"] = df["minutes"].astype(int) * df["confidence"].astype(int)
-        for c in ["practiced", "challenges", "wins"]:
-            if c not in df.columns:
-                df[c] = ""
-        self._data_df = df[["date", "topic", "minutes", "confidence", "progress", "tags", "practiced", "challenges", "wins"]].copy()
-        self.table.setModel(DataFrameModel(self._data_df))
+        selected = self.tag_combo.currentText()
+        self.tag_combo.blockSignals(True)
+        self.tag_combo.clear()
+        self.tag_combo.addItem("All tags")
+        self.tag_combo.addItems(tags)
+        self.tag_combo.setCurrentIndex(max(0, self.tag_combo.findText(selected)))
+        self.tag_combo.blockSignals(False)
+        if self.tag_combo.currentText() != selected:
+            # The filtered tag no longer exists
+            self._apply_filters()
+
+    def _update_count(self, *_):
+        total, shown = self.model.total_count(), self.model.match_count()
+        self.count_label.setText(f"{shown} entries" if shown == total else f"{shown} of {total} entries")
+
+    def _fit_columns(self):
+        self.table.resizeColumnsToContents()
+        header = self.table.horizontalHeader()
+        for col in range(self.model.columnCount()):
+            if header.sectionSize(col) > self.MAX_COLUMN_WIDTH:
+                header.resizeSection(col, self.MAX_COLUMN_WIDTH)
+
+    def refresh(self):
+        self._store.reload()
 
     def export_csv(self):
-        try:
-            path = export_db_to_json()
-            QtWidgets.QMessageBox.information(self, "Export", "JSON exported successfully.")
-        except Exception as ex:
-            QtWidgets.QMessageBox.critical(self, "Export Failed", str(ex))
+        export_json_with_feedback(self)
 
     def import_csv(self):
-        dlg = QtWidgets.QFileDialog(self)
-        dlg.setFileMode(QtWidgets.QFileDialog.ExistingFile)
-        dlg.setNameFilter("JSON Files (*.json)")
-        if dlg.exec():
-            path = dlg.selectedFiles()[0]
-            # Background validation via dry-run
-            try:
-                import json
-                with open(path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                if not isinstance(data, list):
-                    raise ValueError("Invalid JSON format: expected a list of entries")
-                df = pd.DataFrame(data)
-                from services.storage import import_dataframe
-                ins, upd, msgs = import_dataframe(df, dry_run=True)
-                fatals = [m for m in msgs if ("required" in m.lower() or "must be" in m.lower() or "missing date" in m.lower())]
-                if fatals:
-                    QtWidgets.QMessageBox.critical(self, "Import Failed", "\n".join(fatals[:20]))
-                    return
-                # Commit
-                import_json_to_db(path)
-                self.refresh()
-                QtWidgets.QMessageBox.information(self, "Import", "Import completed.")
-            except Exception as ex:
-                QtWidgets.QMessageBox.critical(self, "Import Failed", str(ex))
+        prompt_json_import(self, self._store)
+
+
+# Idle maintenance: check this often, once there has been no input for this long
+_MAINTENANCE_POLL_MS = 5 * 60 * 1000
+_MAINTENANCE_IDLE_S = 120
+_INPUT_EVENTS = (QtCore.QEvent.KeyPress, QtCore.QEvent.MouseButtonPress, QtCore.QEvent.Wheel)
+# Journal sync: append entry writes this long after the last one
+_JOURNAL_SAVE_DELAY_MS = 2000
 
 
 class MainWindow(QtWidgets.QMainWindow):
+    # Stack index -> attribute of the page built on demand
+    _LAZY_PAGES = {1: "hist_tab", 2: "insights_tab", 3: "data_tab"}
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Learning Progress Tracker")
@@ -732,12 +1070,18 @@ class MainWindow(QtWidgets.QMainWindow):
         for name, icon in zip(names, icons):
             item = QtWidgets.QListWidgetItem(icon, name)
             self.nav.addItem(item)
+        # Shared dataset; all writes go through it and pages follow its signals
+        self.store = EntryStore(self)
         self.pages = QtWidgets.QStackedWidget(self)
-        self.log_tab = LogEntryTab(); self.pages.addWidget(self.log_tab)
-        self.hist_tab = HistoryTab(); self.pages.addWidget(self.hist_tab)
-        self.insights_tab = InsightsTab(); self.pages.addWidget(self.insights_tab)
-        self.data_tab = DataTab(); self.pages.addWidget(self.data_tab)
-        self.settings_tab = SettingsTab(self); self.pages.addWidget(self.settings_tab)
+        self.log_tab = LogEntryTab(self.store); self.pages.addWidget(self.log_tab)
+        # Data-heavy pages are built on first navigation; until then the stack
+        # holds an empty placeholder so indices stay stable.
+        self.hist_tab = None
+        self.insights_tab = None
+        self.data_tab = None
+        for _ in self._LAZY_PAGES:
+            self.pages.addWidget(QtWidgets.QWidget())
+        self.settings_tab = SettingsTab(self, self.store); self.pages.addWidget(self.settings_tab)
         self.nav.currentRowChanged.connect(self._navigate_to)
         self.nav.setCurrentRow(0)
         splitter = QtWidgets.QSplitter(self)
@@ -757,8 +1101,8 @@ class MainWindow(QtWidgets.QMainWindow):
         self.setCentralWidget(splitter)
         # Keyboard shortcuts (no visible toolbar)
         QShortcut(QKeySequence("Ctrl+N"), self, activated=self._focus_new_entry)
-        QShortcut(QKeySequence("Ctrl+E"), self, activated=self.data_tab.export_csv)
-        QShortcut(QKeySequence("Ctrl+I"), self, activated=self.data_tab.import_csv)
+        QShortcut(QKeySequence("Ctrl+E"), self, activated=lambda: export_json_with_feedback(self))
+        QShortcut(QKeySequence("Ctrl+I"), self, activated=self._import_json)
         QShortcut(QKeySequence("F5"), self, activated=self._refresh_current)
         # Load and apply compact sidebar preference
         try:
@@ -772,6 +1116,106 @@ class MainWindow(QtWidgets.QMainWindow):
         self.status.showMessage("Ready")
         # Mark window state not yet loaded; main() decides default size vs saved
         self._state_loaded = False
+        # Launch jobs (backup, then JSON sync) share a one-thread pool so they
+        # run in order without contending for the database
+        self._launch_pool = QtCore.QThreadPool(self)
+        self._launch_pool.setMaxThreadCount(1)
+        self._backup_job = BackgroundRefresher(lambda cancel: backup_db_daily(), lambda _: None, self, self._launch_pool)
+        self._sync_job = BackgroundRefresher(lambda cancel: create_or_sync_on_launch(), self._sync_done, self, self._launch_pool)
+        self._sync_job.failed.connect(self._sync_failed)
+        # Database maintenance (see storage.run_maintenance) runs on the same
+        # pool while the user is idle; any input cancels the remaining tasks
+        self._maintenance_job = BackgroundRefresher(
+            lambda cancel, force=False: run_maintenance(force=force, cancel=cancel, background=not force),
+            self._maintenance_done, self, self._launch_pool,
+        )
+        self._maintenance_job.failed.connect(self._maintenance_failed)
+        self._last_input = time.monotonic()
+        self._maintenance_timer = QtCore.QTimer(self)
+        self._maintenance_timer.setInterval(_MAINTENANCE_POLL_MS)
+        self._maintenance_timer.timeout.connect(self._maintain_if_idle)
+        # With the journal sync format, writes are appended to the journal
+        # shortly after they happen (O(changes)); entries.json is only
+        # rewritten on launch and exit
+        self._sync_format = get_sync_format()
+        self._journal_job = BackgroundRefresher(lambda cancel: save_journal(), lambda _: None, self, self._launch_pool)
+        self._journal_job.failed.connect(self._journal_failed)
+        self._journal_timer = QtCore.QTimer(self)
+        self._journal_timer.setSingleShot(True)
+        self._journal_timer.setInterval(_JOURNAL_SAVE_DELAY_MS)
+        self._journal_timer.timeout.connect(self._journal_job.request)
+        for signal in (self.store.entryAdded, self.store.entryChanged, self.store.entryRemoved, self.store.entriesReset):
+            signal.connect(self._entries_written)
+        self.store.settingsChanged.connect(self._setting_changed)
+
+    def start_launch_jobs(self):
+        """Daily backup and JSON sync, after the window is up. Entry writes
+        made meanwhile are held by the store and applied once the sync has
+        imported the file, so they win over it."""
+        self.store.hold_writes()
+        self.status.showMessage("Syncing entries…")
+        self._backup_job.request()
+        self._sync_job.request()
+        # Input reaches the window's QWindow before its child widgets, so a
+        # filter there sees every key press and click without running for
+        # each paint and timer event in the application
+        if self.windowHandle() is not None:
+            self.windowHandle().installEventFilter(self)
+        self._maintenance_timer.start()
+
+    def eventFilter(self, obj, event):
+        if event.type() in _INPUT_EVENTS:
+            self._last_input = time.monotonic()
+            if self._maintenance_job.is_busy():
+                self._maintenance_job.cancel()
+        return super().eventFilter(obj, event)
+
+    def _maintain_if_idle(self):
+        if time.monotonic() - self._last_input < _MAINTENANCE_IDLE_S:
+            return
+        if self.store.is_holding() or self._maintenance_job.is_busy():
+            return
+        self._maintenance_job.request()
+
+    def run_maintenance_now(self):
+        """Settings → Diagnostics button: every task, due or not."""
+        if not self._maintenance_job.is_busy():
+            self.status.showMessage("Running database maintenance…")
+            self._maintenance_job.request(True)
+
+    def _maintenance_done(self, ran):
+        if not ran:
+            return
+        failed = [task for task, record in ran.items() if not record["result"].get("ok")]
+        if failed:
+            self.status.showMessage(f"Database maintenance found problems ({', '.join(failed)}); see Settings → Diagnostics")
+        else:
+            self.status.showMessage("Database maintenance done", 5000)
+        self.settings_tab.refresh_maintenance()
+
+    def _maintenance_failed(self, message: str):
+        self.status.showMessage(f"Database maintenance failed: {message}", 8000)
+
+    def _entries_written(self, *_):
+        if self._sync_format == "journal" and not self.store.is_holding():
+            self._journal_timer.start()
+
+    def _setting_changed(self, key: str):
+        if key == SYNC_FORMAT_KEY:
+            self._sync_format = get_sync_format()
+
+    def _journal_failed(self, message: str):
+        self.status.showMessage(f"Saving the sync journal failed: {message}", 8000)
+
+    def _sync_done(self, result):
+        path, msgs = result
+        self.store.release_writes()
+        note = f" ({len(msgs)} note(s))" if msgs else ""
+        self.status.showMessage(f"Synced with {path}{note}", 8000)
+
+    def _sync_failed(self, message: str):
+        self.store.release_writes()
+        self.status.showMessage(f"Sync failed: {message}")
 
     def _focus_new_entry(self):
         self.nav.setCurrentRow(0)
@@ -786,16 +1230,35 @@ class MainWindow(QtWidgets.QMainWindow):
     def _refresh_current(self):
         idx = self.pages.currentIndex()
         try:
-            if idx == 1:
-                self.hist_tab.refresh()
-            elif idx == 2:
-                self.insights_tab.refresh()
-            elif idx == 3:
-                self.data_tab.refresh()
+            page = self._page(idx)
+            if page is not None:
+                page.refresh()
         except Exception:
             pass
 
+    def _page(self, idx: int):
+        """The built page at idx, or None if it is still a placeholder."""
+        if idx in self._LAZY_PAGES:
+            return getattr(self, self._LAZY_PAGES[idx])
+        return None
+
+    def _ensure_page(self, idx: int) -> QtWidgets.QWidget:
+        if idx not in self._LAZY_PAGES or self._page(idx) is not None:
+            return self.pages.widget(idx)
+        factory = {1: HistoryTab, 2: InsightsTab, 3: DataTab}[idx]
+        page = factory(self.store)  # reads the store, loading it on first use
+        placeholder = self.pages.widget(idx)
+        self.pages.insertWidget(idx, page)
+        self.pages.removeWidget(placeholder)
+        placeholder.deleteLater()
+        setattr(self, self._LAZY_PAGES[idx], page)
+        return page
+
+    def _import_json(self):
+        prompt_json_import(self, self.store)
+
     def _navigate_to(self, idx: int):
+        self._ensure_page(idx)
         # Animate fade-in transition on page change
         try:
             widget = self.pages.widget(idx)
@@ -855,6 +1318,12 @@ class MainWindow(QtWidgets.QMainWindow):
             return False
 
     def closeEvent(self, event):
+        # Let a running sync finish, then commit writes queued behind it
+        self._maintenance_timer.stop()
+        self._maintenance_job.cancel()
+        self._journal_timer.stop()  # the exit save picks pending writes up
+        self._launch_pool.waitForDone()
+        self.store.release_writes()
         try:
             s = QtCore.QSettings("LPT", "LearningProgressTracker")
             s.setValue("win/geometry", self.saveGeometry())
@@ -864,88 +1333,287 @@ class MainWindow(QtWidgets.QMainWindow):
         super().closeEvent(event)
 
 
+class ChartImage(QtWidgets.QWidget):
+    """Shows a chart rendered offscreen. Until a render for the new size
+    arrives, the previous image is stretched to fit."""
+
+    resized = QtCore.Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._image = None
+        self.setMinimumSize(200, 160)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
+
+    def sizeHint(self):
+        return QtCore.QSize(600, 300)
+
+    def set_image(self, image: QtGui.QImage) -> None:
+        self._image = image
+        self.update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.resized.emit()
+
+    def paintEvent(self, event):
+        if self._image is None:
+            return
+        p = QtGui.QPainter(self)
+        size = self._image.deviceIndependentSize().toSize()
+        if abs(size.width() - self.width()) <= 2 and abs(size.height() - self.height()) <= 2:
+            p.drawImage(0, 0, self._image)
+        else:
+            p.setRenderHint(QtGui.QPainter.SmoothPixmapTransform)
+            p.drawImage(self.rect(), self._image)
+        p.end()
+
+
 class InsightsTab(QtWidgets.QWidget):
-    def __init__(self):
+    OVERLAYS = [
+        "None",
+        "7-day average",
+        "30-day average",
+        "90-day average",
+        "Confidence trend (EWMA)",
+        "Minutes p25–p75 band (30 days)",
+    ]
+    # Visible window in days, anchored at the latest entry (None = everything)
+    RANGES = {"All": None, "1 year": 365, "6 months": 182, "3 months": 91, "30 days": 30}
+
+    def __init__(self, store: EntryStore):
         super().__init__()
+        from services.analytics import DailySeries
+        from desktop.chart_cache import ChartImageCache, default_directory
+
+        self._store = store
+        # Dense daily series kept across refreshes; extended incrementally
+        self._series = DailySeries()
+        self._df = None
+        self._state = None
+        self._dirty = False
+        self._version = get_data_version()
+        self._refresher = BackgroundRefresher(self._load, self._apply, self)
+        # Charts are rendered with Agg on a single worker thread (matplotlib is
+        # imported there on the first cache miss) and cached as images keyed
+        # by data version, size, theme colors, overlay and range
+        self._images = ChartImageCache(default_directory())
+        self._render_pool = QtCore.QThreadPool(self)
+        self._render_pool.setMaxThreadCount(1)
+        self._renderer = BackgroundRefresher(self._render, self._show_images, self, self._render_pool)
+        # Coalesces bursts of row-level changes into one recompute
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(150)
+        self._debounce.timeout.connect(self._recompute)
+        # Panning redraws only the visible window, once the scrollbar settles
+        self._pan_timer = QtCore.QTimer(self)
+        self._pan_timer.setSingleShot(True)
+        self._pan_timer.setInterval(60)
+        self._pan_timer.timeout.connect(self._draw)
         self._build_ui()
-        self.refresh()
+        store.entriesReset.connect(self._recompute)
+        for sig in (store.entryAdded, store.entryChanged, store.entryRemoved):
+            sig.connect(self._on_store_changed)
+        store.settingsChanged.connect(self._on_store_changed)
+        if store.is_loaded():
+            self._recompute()
+        else:
+            store.ensure_loaded()
 
     def _build_ui(self):
         v = QtWidgets.QVBoxLayout(self)
         v.setContentsMargins(16, 16, 16, 16)
         v.setSpacing(12)
         # Metrics row
+        head = QtWidgets.QHBoxLayout()
         self.metrics_label = QtWidgets.QLabel("", self)
-        v.addWidget(self.metrics_label)
-        # Three figures stacked
-        self.fig1 = Figure(figsize=(6, 3), tight_layout=True)
-        self.canvas1 = FigureCanvas(self.fig1)
-        self.fig2 = Figure(figsize=(6, 3), tight_layout=True)
-        self.canvas2 = FigureCanvas(self.fig2)
-        self.fig3 = Figure(figsize=(6, 3), tight_layout=True)
-        self.canvas3 = FigureCanvas(self.fig3)
-        v.addWidget(QtWidgets.QLabel("Minutes per Day"))
-        v.addWidget(self.canvas1)
-        v.addWidget(QtWidgets.QLabel("Confidence Over Time"))
-        v.addWidget(self.canvas2)
-        v.addWidget(QtWidgets.QLabel("Progress Score Over Time"))
-        v.addWidget(self.canvas3)
+        head.addWidget(self.metrics_label, 1)
+        self.busy_label = make_busy_label(self, self._refresher)
+        head.addWidget(self.busy_label)
+        v.addLayout(head)
+        ctrl = QtWidgets.QHBoxLayout()
+        self.overlay_combo = QtWidgets.QComboBox(self)
+        self.overlay_combo.addItems(self.OVERLAYS)
+        self.overlay_combo.setToolTip("Smoothed series drawn over the raw daily values")
+        self.overlay_combo.currentIndexChanged.connect(self._draw)
+        ctrl.addWidget(QtWidgets.QLabel("Overlay"))
+        ctrl.addWidget(self.overlay_combo)
+        self.range_combo = QtWidgets.QComboBox(self)
+        self.range_combo.addItems(list(self.RANGES))
+        self.range_combo.setToolTip("Days shown; drag the scrollbar below to pan back in time")
+        self.range_combo.currentIndexChanged.connect(self._on_range_changed)
+        ctrl.addWidget(QtWidgets.QLabel("Range"))
+        ctrl.addWidget(self.range_combo)
+        ctrl.addStretch(1)
+        v.addLayout(ctrl)
+        # Pans the range window; value = first day shown (ordinal)
+        self.pan_bar = QtWidgets.QScrollBar(QtCore.Qt.Horizontal, self)
+        self.pan_bar.setVisible(False)
+        self.pan_bar.valueChanged.connect(lambda _: self._pan_timer.start())
+        v.addWidget(self.pan_bar)
+        # Three charts stacked, one per name in CHARTS
+        self.charts = [ChartImage(self) for _ in CHARTS]
+        # All three share one size; the first one's resizes trigger a redraw
+        self.charts[0].resized.connect(self._pan_timer.start)
+        for title, chart in zip(("Minutes", "Confidence Over Time", "Progress Score Over Time"), self.charts):
+            v.addWidget(QtWidgets.QLabel(title))
+            v.addWidget(chart)
+        v.addWidget(QtWidgets.QLabel("Weekly Summary (last 12 weeks)"))
+        self.weekly_table = QtWidgets.QTableView(self)
+        self.weekly_table.verticalHeader().setVisible(False)
+        self.weekly_table.horizontalHeader().setStretchLastSection(True)
+        self.weekly_table.setMaximumHeight(180)
+        v.addWidget(self.weekly_table)
 
         refresh_btn = QtWidgets.QPushButton("Refresh")
         refresh_btn.clicked.connect(self.refresh)
         v.addWidget(refresh_btn)
 
     def refresh(self):
-        df = get_all_entries_df()
-        self.fig1.clear(); self.fig2.clear(); self.fig3.clear()
-        if df.empty:
-            # Metrics (no data)
-            goal_str = get_setting("weekly_goal_minutes", None) or "0"
-            try:
-                goal = int(goal_str)
-            except Exception:
-                goal = 0
-            self.metrics_label.setText(f"This week: 0/{goal} min · Current streak: 0 · Longest streak: 0")
-            for fig in (self.fig1, self.fig2, self.fig3):
-                ax = fig.add_subplot(111)
-                ax.text(0.5, 0.5, "No data yet", ha='center', va='center')
-                ax.axis('off')
-            self.canvas1.draw(); self.canvas2.draw(); self.canvas3.draw()
-            return
-        # Prep
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-        df = df.sort_values("date")
-        # Metrics
-        goal_str = get_setting("weekly_goal_minutes", None) or "0"
+        self._store.reload()
+
+    def _on_store_changed(self, *_):
+        # Charts depend on the whole history: recompute only while visible
+        if self.isVisible():
+            self._debounce.start()
+        else:
+            self._dirty = True
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._dirty:
+            self._recompute()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QtCore.QEvent.PaletteChange:
+            self._pan_timer.start()
+
+    def _recompute(self):
+        self._dirty = False
+        # Snapshot on the GUI thread; the worker builds frames from it. The
+        # store writes through to SQLite, so the version matches the snapshot.
+        # It becomes the chart key only in _apply, with the new series: until
+        # then redraws still show (and cache) the old series under the old key.
+        self._refresher.request(list(self._store.entries().values()), get_data_version())
+
+    @staticmethod
+    def _load(cancel, records, version):
+        import pandas as pd
+
+        df = pd.DataFrame.from_records(records, columns=["date", "topic", "minutes", "confidence", "tags"])
+        if not df.empty:
+            df = df.sort_values("date")
+        if cancel.cancelled:
+            return None
+        # Weekly totals are grouped in SQLite; only ~12 rows come back
+        weekly = weekly_summary_db(12).sort_values("week", ascending=False)
+        weekly["avg_confidence"] = weekly["avg_confidence"].round(2)
         try:
-            goal = int(goal_str)
+            goal = int(get_setting("weekly_goal_minutes", None) or "0")
         except Exception:
             goal = 0
-        this_week = weekly_minutes(df)
-        dates = df["date"].tolist()
-        cur_streak, longest = compute_streaks(dates)
-        self.metrics_label.setText(f"This week: {this_week}/{goal} min · Current streak: {cur_streak} · Longest streak: {longest}")
-        # Minutes per day (bar)
-        ax1 = self.fig1.add_subplot(111)
-        ax1.bar(df["date"].astype(str), df["minutes"].astype(int), color="#4C78A8")
-        ax1.set_xticks(ax1.get_xticks()[::max(1, int(len(df)/10))])
-        ax1.set_ylabel("Minutes")
-        ax1.tick_params(axis='x', rotation=45)
-        # Confidence over time (line)
-        ax2 = self.fig2.add_subplot(111)
-        ax2.plot(df["date"].astype(str), df["confidence"].astype(int), marker='o', color="#F58518")
-        ax2.set_ylim(1, 5)
-        ax2.set_ylabel("Confidence")
-        ax2.tick_params(axis='x', rotation=45)
-        # Progress score (line)
-        if "progress_score" not in df.columns:
-            df["progress_score"] = df["minutes"].astype(int) * df["confidence"].astype(int)
-        ax3 = self.fig3.add_subplot(111)
-        ax3.plot(df["date"].astype(str), df["progress_score"].astype(int), marker='o', color="#54A24B")
-        ax3.set_ylabel("Progress")
-        ax3.tick_params(axis='x', rotation=45)
-        # Draw
-        self.canvas1.draw(); self.canvas2.draw(); self.canvas3.draw()
+        state = dict(get_streak_state(), goal=goal)
+        return df, weekly, state, version
+
+    def _apply(self, result):
+        df, weekly, self._state, self._version = result
+        self._series.update(df)
+        self._df = df
+        self.weekly_table.setModel(DataFrameModel(weekly[["week", "minutes", "sessions", "avg_minutes_per_day", "avg_confidence"]]))
+        state = self._state
+        # Metrics (from incrementally maintained state, no history scan)
+        if df.empty:
+            self.metrics_label.setText(f"This week: 0/{state['goal']} min · Current streak: 0 · Longest streak: 0")
+        else:
+            self.metrics_label.setText(
+                f"This week: {state['week_minutes']}/{state['goal']} min · Current streak: {state['current_streak']} · Longest streak: {state['longest_streak']}"
+            )
+        self._update_pan_range()
+        self._draw()
+
+    def _on_range_changed(self):
+        self._update_pan_range(follow_latest=True)
+        self._draw()
+
+    def _update_pan_range(self, follow_latest: bool = False):
+        days = self.RANGES[self.range_combo.currentText()]
+        s = self._series
+        bar = self.pan_bar
+        if days is None or len(s) <= days:
+            bar.setVisible(False)
+            return
+        at_end = follow_latest or not bar.isVisible() or bar.value() >= bar.maximum()
+        bar.blockSignals(True)
+        bar.setRange(s.start, s.start + len(s) - days)
+        bar.setPageStep(days)
+        bar.setSingleStep(max(1, days // 10))
+        if at_end:
+            # Stay pinned to the newest days as entries are added
+            bar.setValue(bar.maximum())
+        bar.blockSignals(False)
+        bar.setVisible(True)
+
+    def _view_key(self):
+        """The shown window in terms that stay valid across reloads: None
+        (everything), ("latest", days) or ("from", first_day, days)."""
+        days = self.RANGES[self.range_combo.currentText()]
+        if days is None:
+            return None
+        bar = self.pan_bar
+        if bar.isVisible() and bar.value() < bar.maximum():
+            return ("from", bar.value(), days)
+        return ("latest", days)
+
+    @staticmethod
+    def _resolve_view(series, view_key):
+        if view_key is None or not len(series):
+            return None
+        if view_key[0] == "from":
+            return view_key[1], view_key[1] + view_key[2] - 1
+        days, end = view_key[1], series.start + len(series) - 1
+        return None if len(series) <= days else (end - days + 1, end)
+
+    def _chart_key(self) -> tuple:
+        pal = self.palette()
+        colors = (pal.color(QtGui.QPalette.Window).name(), pal.color(QtGui.QPalette.WindowText).name())
+        size = (self.charts[0].width(), self.charts[0].height())
+        return (self._version, self.overlay_combo.currentText(), self._view_key(), size, self.devicePixelRatioF(), colors)
+
+    def _draw(self):
+        key = self._chart_key()
+        images = [self._images.get((name,) + key) for name in CHARTS]
+        if all(image is not None for image in images):
+            # Known version/size/theme: swap the cached images in, no render
+            self._renderer.cancel()
+            self._show_images((key, images, None))
+            return
+        # Before the first load the worker can still serve images from disk
+        series = self._series.snapshot() if self._df is not None else None
+        self._renderer.request(key, series)
+
+    def _render(self, cancel, key, series):
+        version, overlay, view_key, size, dpr, colors = key
+        images = [self._images.load((name,) + key, dpr) for name in CHARTS]
+        if all(image is not None for image in images) or series is None or cancel.cancelled:
+            return key, images, None
+        from desktop.insights_charts import render_images
+
+        images = render_images(series, overlay, self._resolve_view(series, view_key), size, dpr, colors)
+        for name, image in zip(CHARTS, images):
+            self._images.put((name,) + key, image)
+        return key, images, series
+
+    def _show_images(self, result):
+        _key, images, series = result
+        if series is not None:
+            # Overlays computed on the snapshot are kept, so the next pan or
+            # resize does not recompute them over the whole history
+            self._series.adopt_cache(series)
+        for chart, image in zip(self.charts, images):
+            if image is not None:
+                chart.set_image(image)
 
     # Helper to allow MainWindow to call refresh
     def do_refresh(self):
@@ -953,9 +1621,10 @@ class InsightsTab(QtWidgets.QWidget):
 
 
 class SettingsTab(QtWidgets.QWidget):
-    def __init__(self, main_window: QtWidgets.QMainWindow):
+    def __init__(self, main_window: QtWidgets.QMainWindow, store: EntryStore):
         super().__init__()
         self._main = main_window
+        self._store = store
         self._build_ui()
 
     def _build_ui(self):
@@ -988,18 +1657,124 @@ class SettingsTab(QtWidgets.QWidget):
             self.theme_combo.setCurrentIndex(1 if current == "light" else 0)
         except Exception:
             pass
+        # Sync file format (services.filesync.SYNC_FORMATS)
+        self.sync_combo = QtWidgets.QComboBox(self)
+        self.sync_combo.addItem("JSON file (entries.json)", "json")
+        self.sync_combo.addItem("Journal (entries.ndjson, appends changes)", "journal")
+        self.sync_combo.setToolTip("The journal only appends what changed, so cloud folders upload less.")
+        try:
+            self.sync_combo.setCurrentIndex(max(0, self.sync_combo.findData(get_sync_format())))
+        except Exception:
+            pass
         save_btn = QtWidgets.QPushButton("Save", self)
         save_btn.clicked.connect(self.save)
         layout.addRow("Weekly goal (minutes)", self.goal_spin)
         layout.addRow(self.compact_chk)
         layout.addRow("Theme", self.theme_combo)
+        layout.addRow("Sync file", self.sync_combo)
         layout.addRow(save_btn)
+        layout.addRow(self._build_diagnostics())
+
+    def _build_diagnostics(self) -> QtWidgets.QGroupBox:
+        box = QtWidgets.QGroupBox("Diagnostics", self)
+        form = QtWidgets.QFormLayout(box)
+        self.diag_chk = QtWidgets.QCheckBox("Record storage statistics", box)
+        self.diag_chk.setChecked(instrumentation.enabled)
+        self.diag_chk.setToolTip("Counts connections, queries, rows and time per storage call. Off by default.")
+        self.slow_spin = QtWidgets.QSpinBox(box)
+        self.slow_spin.setRange(0, 60000)
+        self.slow_spin.setSuffix(" ms")
+        self.slow_spin.setSpecialValueText("Off")
+        self.slow_spin.setValue(int(instrumentation.slow_query_ms or 0))
+        self.slow_spin.setToolTip("Statements at least this slow are logged with their EXPLAIN QUERY PLAN.")
+        self.diag_view = QtWidgets.QPlainTextEdit(box)
+        self.diag_view.setReadOnly(True)
+        self.diag_view.setLineWrapMode(QtWidgets.QPlainTextEdit.NoWrap)
+        self.diag_view.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.diag_view.setMinimumHeight(180)
+        buttons = QtWidgets.QHBoxLayout()
+        for text, slot in (("Refresh", self._refresh_diagnostics), ("Reset", self._reset_diagnostics), ("Export snapshot…", self._export_diagnostics)):
+            btn = QtWidgets.QPushButton(text, box)
+            btn.clicked.connect(slot)
+            buttons.addWidget(btn)
+        buttons.addStretch(1)
+        form.addRow(self.diag_chk)
+        form.addRow("Log queries slower than", self.slow_spin)
+        form.addRow(self.diag_view)
+        form.addRow(buttons)
+        self.maint_label = QtWidgets.QLabel(box)
+        self.maint_label.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.maint_label.setToolTip("PRAGMA optimize, incremental vacuum, ANALYZE and quick_check run automatically while the app is idle.")
+        maint_btn = QtWidgets.QPushButton("Run maintenance now", box)
+        maint_btn.clicked.connect(self._main.run_maintenance_now)
+        form.addRow("Maintenance", self.maint_label)
+        form.addRow(maint_btn)
+        self.diag_chk.toggled.connect(self._toggle_diagnostics)
+        self.slow_spin.valueChanged.connect(self._slow_query_changed)
+        # Live view while the tab is showing and recording
+        self._diag_timer = QtCore.QTimer(self)
+        self._diag_timer.setInterval(2000)
+        self._diag_timer.timeout.connect(self._refresh_diagnostics)
+        self._refresh_diagnostics()
+        return box
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._refresh_diagnostics()
+        self.refresh_maintenance()
+        if instrumentation.enabled:
+            self._diag_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._diag_timer.stop()
+
+    def _toggle_diagnostics(self, on: bool):
+        if on:
+            instrumentation.enable(self.slow_spin.value() or None)
+            self._diag_timer.start()
+        else:
+            instrumentation.disable()
+            self._diag_timer.stop()
+        self._store.set_setting("diagnostics_enabled", "1" if on else "0")
+        self._refresh_diagnostics()
+
+    def _slow_query_changed(self, value: int):
+        instrumentation.set_slow_query_ms(value or None)
+        self._store.set_setting("slow_query_ms", str(int(value)))
+
+    def _refresh_diagnostics(self):
+        text = instrumentation.format_snapshot()
+        if text != self.diag_view.toPlainText():
+            self.diag_view.setPlainText(text)
+
+    def refresh_maintenance(self):
+        try:
+            self.maint_label.setText(format_maintenance(maintenance_status()))
+        except Exception as ex:
+            self.maint_label.setText(f"Unavailable: {ex}")
+
+    def _reset_diagnostics(self):
+        instrumentation.reset()
+        self._refresh_diagnostics()
+
+    def _export_diagnostics(self):
+        name = f"lpt-diagnostics-{dt.datetime.now():%Y%m%d-%H%M%S}.json"
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export diagnostics snapshot", name, "JSON Files (*.json)")
+        if not path:
+            return
+        try:
+            instrumentation.export_snapshot(path)
+            QtWidgets.QMessageBox.information(self, "Diagnostics", f"Snapshot saved to {path}.")
+        except Exception as ex:
+            QtWidgets.QMessageBox.critical(self, "Export Failed", str(ex))
 
     def save(self):
-        set_setting("weekly_goal_minutes", str(int(self.goal_spin.value())))
+        self._store.set_setting("weekly_goal_minutes", str(int(self.goal_spin.value())))
         # Save theme and apply immediately
         theme = "light" if self.theme_combo.currentIndex() == 1 else "dark"
-        set_setting("theme", theme)
+        self._store.set_setting("theme", theme)
+        self._store.set_setting(SYNC_FORMAT_KEY, self.sync_combo.currentData())
         app = QtWidgets.QApplication.instance()
         if app is not None:
             apply_theme(app)
@@ -1007,9 +1782,12 @@ class SettingsTab(QtWidgets.QWidget):
 
 
 class DataFrameModel(QAbstractTableModel):
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df):
+        import pandas as pd
+
         super().__init__()
         self._df = df.reset_index(drop=True)
+        self._isna = pd.isna
 
     def rowCount(self, parent=QModelIndex()):
         return 0 if parent.isValid() else len(self._df)
@@ -1022,7 +1800,7 @@ class DataFrameModel(QAbstractTableModel):
             return None
         if role in (Qt.DisplayRole, Qt.EditRole):
             val = self._df.iat[index.row(), index.column()]
-            return "" if pd.isna(val) else str(val)
+            return "" if self._isna(val) else str(val)
         return None
 
     def headerData(self, section, orientation, role=Qt.DisplayRole):
@@ -1042,6 +1820,313 @@ class DataFrameModel(QAbstractTableModel):
             pass
 
 
+class EntryTableModel(QAbstractTableModel):
+    """Virtual table over the EntryStore.
+
+    Row order and filtering come from an EntryIndex over the store's
+    summaries (cached sort permutations, boolean filter masks); matching
+    rows are exposed a page at a time through canFetchMore/fetchMore.
+    Display strings, including the long note columns, are read from SQLite
+    in small blocks only when a row is painted and kept in a bounded LRU.
+    Store signals insert, move or remove single rows instead of resetting.
+    """
+
+    COLUMNS = ["date", "topic", "minutes", "confidence", "progress", "tags", "practiced", "challenges", "wins"]
+    PAGE_SIZE = 256
+    BLOCK_SIZE = 64
+    CACHE_ROWS = 4096
+    NOTE_PREVIEW = 120
+
+    def __init__(self, store: EntryStore, parent=None):
+        super().__init__(parent)
+        self._store = store
+        self._column = 0
+        self._descending = True
+        self._filters: dict = {}
+        self._index = EntryIndex(store.entries().values(), external_order=fetch_dates_ordered_by)
+        self._exposed = 0
+        self._select()
+        # date -> tuple of display strings, least recently used first
+        self._cache: OrderedDict[dt.date, tuple] = OrderedDict()
+        self._read_failed = False
+        store.entriesReset.connect(self._reset)
+        store.entryAdded.connect(self._on_added)
+        store.entryChanged.connect(self._on_changed)
+        store.entryRemoved.connect(self._on_removed)
+
+    def _select(self, keep_exposed: bool = False):
+        mask = self._index.mask(**self._filters) if self._filters else None
+        self._rows = self._index.order(self.COLUMNS[self._column], self._descending, mask)
+        exposed = max(self._exposed, self.PAGE_SIZE) if keep_exposed else self.PAGE_SIZE
+        self._exposed = min(exposed, len(self._rows))
+
+    def _reset(self):
+        self.beginResetModel()
+        self._index.reset(self._store.entries().values())
+        self._select()
+        self._cache.clear()
+        self.endResetModel()
+
+    def _on_added(self, d: dt.date):
+        rec = self._store.entries().get(d)
+        if rec is None:
+            return
+        rid = self._index.set(rec)
+        if not self._index.matches(rid, **self._filters):
+            return
+        pos = self._index.insert_position(self._rows, rid, self.COLUMNS[self._column], self._descending)
+        if pos is None:
+            # Sorted by a column only SQLite can order; re-select
+            self.beginResetModel()
+            self._select(keep_exposed=True)
+            self.endResetModel()
+            return
+        if pos > self._exposed:
+            # Lands beyond the fetched pages; fetchMore will reach it
+            self._rows = np.insert(self._rows, pos, rid)
+            return
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows = np.insert(self._rows, pos, rid)
+        self._exposed += 1
+        self.endInsertRows()
+
+    def _on_changed(self, d: dt.date):
+        self._on_removed(d)
+        self._on_added(d)
+
+    def _on_removed(self, d: dt.date):
+        self._cache.pop(d, None)
+        rid = self._index.discard(d)
+        hits = np.flatnonzero(self._rows == rid) if rid is not None else ()
+        if not len(hits):
+            return
+        row = int(hits[0])
+        if row >= self._exposed:
+            self._rows = np.delete(self._rows, row)
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self._rows = np.delete(self._rows, row)
+        self._exposed -= 1
+        self.endRemoveRows()
+
+    def set_filters(self, **filters):
+        """Filter rows; see EntryIndex.mask for the accepted keys."""
+        self.beginResetModel()
+        self._filters = {k: v for k, v in filters.items() if v not in (None, "", 0)}
+        self._select()
+        self.endResetModel()
+
+    def match_count(self) -> int:
+        return len(self._rows)
+
+    def total_count(self) -> int:
+        return len(self._index)
+
+    def tags(self) -> list[str]:
+        return self._index.tags()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._exposed
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._exposed < len(self._rows)
+
+    def fetchMore(self, parent=QModelIndex()):
+        n = min(self.PAGE_SIZE, len(self._rows) - self._exposed)
+        if parent.isValid() or n <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._exposed, self._exposed + n - 1)
+        self._exposed += n
+        self.endInsertRows()
+
+    def date_at(self, row: int) -> dt.date:
+        return self._index.date_of(int(self._rows[row]))
+
+    def _format(self, rec: dict) -> tuple:
+        out = []
+        for col in self.COLUMNS:
+            text = str(rec.get(col, ""))
+            if col in NOTE_FIELDS:
+                first = text.strip().split("\n", 1)[0]
+                text = first[:self.NOTE_PREVIEW] + ("…" if len(first) > self.NOTE_PREVIEW or first != text.strip() else "")
+            out.append(text)
+        return tuple(out)
+
+    def _display(self, row: int) -> tuple:
+        d = self.date_at(row)
+        hit = self._cache.get(d)
+        if hit is not None:
+            self._cache.move_to_end(d)
+            return hit
+        self._load_block(row)
+        hit = self._cache.get(d)
+        return hit if hit is not None else self._format(self._store.entries()[d])
+
+    def _load_block(self, row: int):
+        # One indexed query for the aligned block around the painted row
+        lo = row - row % self.BLOCK_SIZE
+        hi = min(lo + self.BLOCK_SIZE, self._exposed)
+        wanted = [d for d in map(self.date_at, range(lo, hi)) if d not in self._cache]
+        try:
+            found = {rec["date"]: rec for rec in map(entry_record, fetch_entries_for_dates(wanted))}
+        except sqlite3.Error as ex:
+            # Show the summary columns uncached, so the notes are read again
+            # on the next paint; report once, not per painted row
+            if not self._read_failed:
+                self._read_failed = True
+                self._store.failed.emit(f"Couldn't read entry notes: {ex}")
+            return
+        self._read_failed = False
+        for d in wanted:
+            # Fall back to the summary if the row vanished mid-read
+            self._cache[d] = self._format(found.get(d) or self._store.entries()[d])
+        while len(self._cache) > self.CACHE_ROWS:
+            self._cache.popitem(last=False)
+
+    # Plain ints: views ask for many roles per cell and enum compares are slow
+    _TEXT_ROLES = frozenset((int(Qt.DisplayRole.value), int(Qt.EditRole.value)))
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if role not in self._TEXT_ROLES or not index.isValid():
+            return None
+        return self._display(index.row())[index.column()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.COLUMNS[section].title()
+        return str(section + 1)
+
+    def sort(self, column, order):
+        # Permutations are cached per column, so re-clicking a header is a gather
+        self.layoutAboutToBeChanged.emit()
+        self._column = column
+        self._descending = order == Qt.DescendingOrder
+        self._select(keep_exposed=True)
+        self.layoutChanged.emit()
+
+
+class SortedEntryListModel(QtCore.QAbstractListModel):
+    """History's "Sorted Dates" list, read from SQLite one page at a time
+    (storage.fetch_sorted_page, an index range scan per sort mode). Only the
+    fetched prefix is held; store signals insert or remove rows inside it,
+    and rows that sort past it are picked up by the next fetchMore.
+    """
+
+    PAGE_SIZE = 200
+
+    def __init__(self, store: EntryStore, parent=None, mode: str = "date"):
+        super().__init__(parent)
+        self._store = store
+        self._mode = mode
+        # (sort key, date, topic) ascending by sort key = display order, and
+        # each listed date's sort key so _find is a bisect
+        self._rows: list[tuple] = []
+        self._keys: dict[dt.date, tuple] = {}
+        self._done = False
+        self._load_first_page()
+        store.entriesReset.connect(self.reload)
+        store.entryAdded.connect(self._on_added)
+        store.entryChanged.connect(self._on_changed)
+        store.entryRemoved.connect(self._on_removed)
+
+    def _value(self, rec) -> int:
+        return rec["date"].toordinal() if self._mode == "date" else int(rec[self._mode])
+
+    def _sort_key(self, value: int, d: dt.date) -> tuple:
+        # Descending by value, newest first on ties
+        return (-value, -d.toordinal())
+
+    def _page(self, after=None) -> list[tuple]:
+        rows = []
+        for r in fetch_sorted_page(self._mode, after, self.PAGE_SIZE):
+            d = dt.date.fromisoformat(str(r["date"])[:10])
+            value = d.toordinal() if self._mode == "date" else int(r["key"] or 0)
+            rows.append((self._sort_key(value, d), d, str(r["topic"] or "")))
+        self._done = len(rows) < self.PAGE_SIZE
+        return rows
+
+    def _load_first_page(self):
+        try:
+            self._rows = self._page()
+        except Exception:
+            self._rows, self._done = [], True
+        self._keys = {d: key for key, d, _ in self._rows}
+
+    def set_mode(self, mode: str):
+        if mode == self._mode:
+            return
+        self._mode = mode
+        self.reload()
+
+    def reload(self):
+        self.beginResetModel()
+        self._load_first_page()
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._done
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._done or not self._rows:
+            return
+        key, d, _ = self._rows[-1]
+        value = d.toordinal() if self._mode == "date" else -key[0]
+        rows = self._page((value, d))
+        if rows:
+            self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows.extend(rows)
+            self._keys.update((d, key) for key, d, _ in rows)
+            self.endInsertRows()
+
+    def data(self, index: QModelIndex, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        _, d, topic = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{d} — {topic[:40]}"
+        if role == Qt.UserRole:
+            return d
+        return None
+
+    def _find(self, d: dt.date):
+        key = self._keys.get(d)
+        return None if key is None else bisect.bisect_left(self._rows, (key, d))
+
+    def _on_added(self, d: dt.date):
+        rec = self._store.entries().get(d) or self._store.get(d)
+        if rec is None:
+            return
+        row = (self._sort_key(self._value(rec), d), d, rec["topic"])
+        if not self._done and (not self._rows or row > self._rows[-1]):
+            return  # past the fetched prefix; a later page includes it
+        pos = bisect.bisect_left(self._rows, row)
+        self.beginInsertRows(QModelIndex(), pos, pos)
+        self._rows.insert(pos, row)
+        self._keys[d] = row[0]
+        self.endInsertRows()
+
+    def _on_changed(self, d: dt.date):
+        self._on_removed(d)
+        self._on_added(d)
+
+    def _on_removed(self, d: dt.date):
+        pos = self._find(d)
+        if pos is None:
+            return
+        self.beginRemoveRows(QModelIndex(), pos, pos)
+        del self._rows[pos]
+        del self._keys[d]
+        self.endRemoveRows()
+
+
 def apply_theme(app: QtWidgets.QApplication):
     app.setStyle("Fusion")
     # Determine theme from settings
@@ -1091,9 +2176,21 @@ def setup_highdpi():
     # Avoid deprecated AA_UseHighDpiPixmaps attribute to prevent warnings
 
 
+def apply_diagnostics_settings() -> None:
+    """Turn storage instrumentation on at launch if Settings left it on
+    (LPT_DIAGNOSTICS=1 enables it regardless)."""
+    try:
+        if get_setting("diagnostics_enabled", "0") == "1":
+            instrumentation.enable(float(get_setting("slow_query_ms", "0") or 0) or None)
+    except Exception:
+        pass
+
+
 def main():
+    # Schema only (cheap and idempotent); backup and sync start once the
+    # window is showing
     init_db()
-    create_or_sync_on_launch()
+    apply_diagnostics_settings()
     register_atexit_export()
     setup_highdpi()
     app = QtWidgets.QApplication(sys.argv)
@@ -1105,6 +2202,7 @@ def main():
     if not loaded:
         win.resize(1920, 1080)
     win.showNormal()
+    win.start_launch_jobs()
     sys.exit(app.exec())
 
 
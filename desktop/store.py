@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Callable, Optional
+
+from PySide6 import QtCore
+
+from desktop.workers import BackgroundRefresher
+from services import storage
+
+
+ENTRY_FIELDS = ("date", "topic", "minutes", "practiced", "challenges", "wins", "confidence", "tags")
+NOTE_FIELDS = ("practiced", "challenges", "wins")
+# What the store keeps in memory; notes are read from the DB when shown
+SUMMARY_FIELDS = tuple(k for k in ENTRY_FIELDS if k not in NOTE_FIELDS)
+
+
+def entry_record(row, fields: tuple = ENTRY_FIELDS) -> dict:
+    """Normalize a sessions row (sqlite3.Row or mapping) into the record
+    shape pages consume: date as dt.date, ints for minutes/confidence, str
+    text fields and a derived progress score.
+    """
+    keys = set(row.keys())
+    rec = {k: (row[k] if k in keys else None) for k in fields}
+    rec["date"] = dt.date.fromisoformat(str(rec["date"])[:10])
+    rec["minutes"] = int(rec["minutes"] or 0)
+    rec["confidence"] = int(rec["confidence"] or 0)
+    for k in fields:
+        if k not in ("date", "minutes", "confidence"):
+            rec[k] = "" if rec[k] is None else str(rec[k])
+    rec["progress"] = rec["minutes"] * rec["confidence"]
+    return rec
+
+
+class EntryStore(QtCore.QObject):
+    """Shared in-memory view of all entries that mediates every write.
+
+    Pages read from the store and subscribe to its row-level signals instead
+    of re-reading the DB after each edit. Only SUMMARY_FIELDS are held in
+    memory; get() returns the full record including notes. Bulk changes (imports, sync, F5)
+    go through reload(), which emits entriesReset once the new snapshot is in.
+
+    While a background job owns the entries table (the launch-time JSON
+    sync), hold_writes() queues entry writes: the store and its signals
+    update at once, and release_writes() commits the queue afterwards so
+    the user's edits win over the synced file. Bulk writers (file imports)
+    wait for the release through after_release().
+    """
+
+    entryAdded = QtCore.Signal(object)    # dt.date
+    entryChanged = QtCore.Signal(object)  # dt.date
+    entryRemoved = QtCore.Signal(object)  # dt.date
+    entriesReset = QtCore.Signal()
+    settingsChanged = QtCore.Signal(str)  # key
+    busyChanged = QtCore.Signal(bool)
+    failed = QtCore.Signal(str)
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        self._entries: dict[dt.date, dict] = {}
+        self._loaded = False
+        self._writes = 0
+        self._load_started_at = 0
+        # date -> fields to upsert, or None to delete; only while holding
+        self._holding = False
+        self._pending: dict[dt.date, Optional[dict]] = {}
+        # Started once the held writes are committed (see after_release)
+        self._after_release: list[Callable[[], None]] = []
+        self._loader = BackgroundRefresher(self._load, self._apply_load, self)
+        self._loader.busyChanged.connect(self.busyChanged)
+        self._loader.failed.connect(self.failed)
+
+    # Loading --------------------------------------------------------------
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def ensure_loaded(self) -> None:
+        if not self._loaded and not self._loader.is_busy():
+            self.reload()
+
+    def reload(self) -> None:
+        self._load_started_at = self._writes
+        self._loader.request()
+
+    @staticmethod
+    def _load(cancel):
+        return {
+            rec["date"]: rec
+            for rec in (entry_record(r, SUMMARY_FIELDS) for r in storage.fetch_entry_summaries())
+        }
+
+    def _apply_load(self, entries: dict) -> None:
+        if self._writes != self._load_started_at:
+            # A write landed while the snapshot was being read; take a fresh one
+            self.reload()
+            return
+        # Queued writes are not in the DB yet; lay them over the snapshot
+        for date, fields in self._pending.items():
+            if fields is None:
+                entries.pop(date, None)
+            else:
+                entries[date] = entry_record(dict(fields, date=date), SUMMARY_FIELDS)
+        self._entries = entries
+        self._loaded = True
+        self.entriesReset.emit()
+
+    # Reads ----------------------------------------------------------------
+    def entries(self) -> dict[dt.date, dict]:
+        """Live mapping of date -> summary record. Treat as read-only."""
+        return self._entries
+
+    def get(self, date: dt.date) -> Optional[dict]:
+        """Full record (with notes) read from the DB."""
+        if date in self._pending:
+            fields = self._pending[date]
+            return None if fields is None else entry_record(dict(fields, date=date))
+        if self._loaded and date not in self._entries:
+            return None
+        row = storage.get_entry_by_date(date)
+        return entry_record(row) if row else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # Writes ---------------------------------------------------------------
+    def _exists(self, date: dt.date) -> bool:
+        if self._loaded:
+            return date in self._entries
+        if date in self._pending:
+            return self._pending[date] is not None
+        return storage.get_entry_by_date(date) is not None
+
+    def upsert(self, *, date: dt.date, **fields) -> None:
+        """Validated fields as accepted by storage.upsert_entry."""
+        existed = self._exists(date)
+        if self._holding:
+            self._pending[date] = dict(fields)
+        else:
+            storage.upsert_entry(date=date, **fields)
+        self._writes += 1
+        rec = entry_record(dict(fields, date=date), SUMMARY_FIELDS)
+        if self._loaded:
+            self._entries[date] = rec
+        (self.entryChanged if existed else self.entryAdded).emit(date)
+
+    def delete(self, date: dt.date) -> None:
+        if self._holding:
+            self._pending[date] = None
+        else:
+            storage.delete_entry(date)
+        self._writes += 1
+        if self._loaded:
+            self._entries.pop(date, None)
+        self.entryRemoved.emit(date)
+
+    def set_setting(self, key: str, value: str) -> None:
+        storage.set_setting(key, value)
+        self.settingsChanged.emit(key)
+
+    # Background jobs ------------------------------------------------------
+    def is_holding(self) -> bool:
+        return self._holding
+
+    def hold_writes(self) -> None:
+        self._holding = True
+
+    def after_release(self, callback: Callable[[], None]) -> None:
+        """Run `callback` now, or once release_writes() has committed the
+        queue if writes are held (a job that writes to SQLite itself must
+        not race the background job that owns the table)."""
+        if self._holding:
+            self._after_release.append(callback)
+        else:
+            callback()
+
+    def release_writes(self) -> None:
+        """Commit queued writes (last one per date wins) and, if the store
+        was in use, reload it to pick up what the job changed."""
+        if not self._holding:
+            return
+        self._holding = False
+        pending, self._pending = self._pending, {}
+        for date, fields in pending.items():
+            if fields is None:
+                storage.delete_entry(date)
+            else:
+                storage.upsert_entry(date=date, **fields)
+        if self._loaded or self._loader.is_busy():
+            self.reload()
+        waiting, self._after_release = self._after_release, []
+        for callback in waiting:
+            callback()
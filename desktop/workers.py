@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Optional
+
+from PySide6 import QtCore, QtWidgets
+
+
+class CancelToken:
+    """Flag a running job can poll to stop early once it has been superseded."""
+
+    def __init__(self):
+        self.cancelled = False
+
+
+class _JobSignals(QtCore.QObject):
+    # QRunnable is not a QObject, so results travel through this helper.
+    finished = QtCore.Signal(int, object)
+    failed = QtCore.Signal(int, str)
+
+
+class _Job(QtCore.QRunnable):
+    def __init__(self, fn: Callable[..., Any], token: int, cancel: CancelToken, args: tuple = ()):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.signals = _JobSignals()
+        self._fn = fn
+        self._token = token
+        self._cancel = cancel
+        self._args = args
+
+    def run(self):
+        # Always report back so the owner can release the job; results of
+        # superseded tokens are dropped on the GUI thread.
+        if self._cancel.cancelled:
+            self._emit(self.signals.finished, None)
+            return
+        try:
+            result = self._fn(self._cancel, *self._args)
+        except Exception as ex:
+            self._emit(self.signals.failed, str(ex))
+            return
+        self._emit(self.signals.finished, result)
+
+    def _emit(self, signal, payload):
+        try:
+            signal.emit(self._token, payload)
+        except RuntimeError:
+            # Owner was destroyed (e.g. app shutting down) while we ran
+            pass
+
+
+class BackgroundRefresher(QtCore.QObject):
+    """Runs a page's data-loading half on a QThreadPool and hands the newest
+    result to `apply` on the GUI thread.
+
+    `load(cancel, *args)` must not touch widgets; it may check
+    `cancel.cancelled` between steps. `args` are whatever request() was given,
+    typically a snapshot taken on the GUI thread. A new request() supersedes any pending one: a queued job is
+    taken back from the pool, a running one is flagged and its result dropped.
+    """
+
+    busyChanged = QtCore.Signal(bool)
+    failed = QtCore.Signal(str)
+
+    def __init__(
+        self,
+        load: Callable[..., Any],
+        apply: Callable[[Any], None],
+        parent: Optional[QtCore.QObject] = None,
+        pool: Optional[QtCore.QThreadPool] = None,
+    ):
+        super().__init__(parent)
+        self._load = load
+        self._apply = apply
+        self._pool = pool or QtCore.QThreadPool.globalInstance()
+        self._token = 0
+        self._job: Optional[_Job] = None
+        self._cancel: Optional[CancelToken] = None
+        # Jobs stay referenced until they report back so their signal helper
+        # is not garbage-collected mid-flight.
+        self._inflight: dict[int, _Job] = {}
+
+    def is_busy(self) -> bool:
+        return self._job is not None
+
+    def request(self, *args) -> None:
+        self.cancel()
+        self._token += 1
+        self._cancel = CancelToken()
+        job = _Job(self._load, self._token, self._cancel, args)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        self._job = job
+        self._inflight[self._token] = job
+        self.busyChanged.emit(True)
+        self._pool.start(job)
+
+    def cancel(self) -> None:
+        if self._job is None:
+            return
+        self._cancel.cancelled = True
+        if self._pool.tryTake(self._job):
+            self._inflight.pop(self._token, None)
+        self._job = None
+        self.busyChanged.emit(False)
+
+    def _on_finished(self, token: int, result: Any) -> None:
+        self._inflight.pop(token, None)
+        if token != self._token or self._job is None:
+            return  # superseded
+        self._job = None
+        self.busyChanged.emit(False)
+        self._apply(result)
+
+    def _on_failed(self, token: int, message: str) -> None:
+        self._inflight.pop(token, None)
+        if token != self._token or self._job is None:
+            return
+        self._job = None
+        self.busyChanged.emit(False)
+        self.failed.emit(message)
+
+
+class ProgressReporter(QtCore.QObject):
+    """Callable handed to a worker job as its progress callback; each
+    `reporter(stage, done, total)` call reaches the GUI thread as the
+    `changed` signal (queued, since the reporter lives on the GUI thread).
+    """
+
+    changed = QtCore.Signal(str, int, int)
+
+    def __call__(self, stage: str, done: int, total: int) -> None:
+        try:
+            self.changed.emit(stage, done, total)
+        except RuntimeError:
+            pass  # receiver gone (app shutting down)
+
+
+def make_busy_label(parent: QtWidgets.QWidget, refresher: QtCore.QObject) -> QtWidgets.QLabel:
+    """Small 'Loading…' hint shown while `refresher` works; shows the error
+    text if a load fails. Accepts anything with busyChanged/failed signals
+    (a BackgroundRefresher or the EntryStore).
+    """
+    label = QtWidgets.QLabel("Loading…", parent)
+    label.setObjectName("Busy")
+    label.setVisible(False)
+
+    def on_busy(busy: bool):
+        if busy:
+            label.setText("Loading…")
+            label.setToolTip("")
+        label.setVisible(busy)
+
+    def on_failed(message: str):
+        label.setText("Couldn't load data")
+        label.setToolTip(message)
+        label.setVisible(True)
+
+    refresher.busyChanged.connect(on_busy)
+    refresher.failed.connect(on_failed)
+    return label
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from services.metrics import date_ordinals
+
+
+MOVING_AVERAGE_WINDOWS = (7, 30, 90)
+_PERCENTILE_CHUNK = 8192
+
+
+def rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over the last `window` slots, ignoring NaN.
+    Early slots use the days available so far; slots whose window holds no
+    values are NaN.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    present = ~np.isnan(x)
+    sums = np.concatenate(([0.0], np.cumsum(np.where(present, x, 0.0))))
+    counts = np.concatenate(([0], np.cumsum(present)))
+    hi = np.arange(1, x.size + 1)
+    lo = np.maximum(0, hi - window)
+    n = counts[hi] - counts[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(n > 0, (sums[hi] - sums[lo]) / n, np.nan)
+
+
+def rolling_percentile(values: np.ndarray, window: int, q: float) -> np.ndarray:
+    """Trailing q-th percentile (0-100) over `window` slots, ignoring NaN."""
+    x = np.asarray(values, dtype=np.float64)
+    if x.size == 0:
+        return x.copy()
+    padded = np.concatenate((np.full(window - 1, np.nan), x))
+    views = np.lib.stride_tricks.sliding_window_view(padded, window)
+    out = np.empty(x.size, dtype=np.float64)
+    # Chunk to bound the temporary (rows x window) buffer nanpercentile makes
+    for i in range(0, x.size, _PERCENTILE_CHUNK):
+        block = views[i:i + _PERCENTILE_CHUNK]
+        empty = np.isnan(block).all(axis=1)
+        res = np.full(block.shape[0], np.nan)
+        if not empty.all():
+            res[~empty] = np.nanpercentile(block[~empty], q, axis=1)
+        out[i:i + _PERCENTILE_CHUNK] = res
+    return out
+
+
+def ewma(values: np.ndarray, span: int, initial: float | None = None) -> np.ndarray:
+    """Exponentially weighted mean that carries the last value across NaN
+    (rest days) instead of decaying toward zero. `initial` continues a
+    previous run, which is how DailySeries extends incrementally.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    out = np.full(x.size, np.nan)
+    present = np.flatnonzero(~np.isnan(x))
+    if present.size:
+        seq = x[present]
+        if initial is not None and not np.isnan(initial):
+            seq = np.concatenate(([initial], seq))
+        smoothed = pd.Series(seq).ewm(span=span, adjust=False).mean().to_numpy()
+        if initial is not None and not np.isnan(initial):
+            smoothed = smoothed[1:]
+        out[present] = smoothed
+    elif initial is not None:
+        out[:] = initial
+    # Forward-fill rest days from the previous study day
+    idx = np.where(~np.isnan(out), np.arange(x.size), -1)
+    np.maximum.accumulate(idx, out=idx)
+    filled = np.where(idx >= 0, out[np.maximum(idx, 0)], np.nan)
+    if initial is not None:
+        filled = np.where(idx >= 0, filled, initial)
+    return filled
+
+
+class DailySeries:
+    """Dense per-day arrays from the first entry to the last.
+
+    Rest days hold 0 minutes and NaN confidence/progress. Derived series are
+    cached by name and extended in place when later days are appended, so a
+    refresh only computes the new tail.
+    """
+
+    def __init__(self):
+        self.start: int | None = None
+        self.minutes = np.zeros(0, dtype=np.float64)
+        self.confidence = np.zeros(0, dtype=np.float64)
+        self._cache: dict[tuple, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return int(self.minutes.size)
+
+    @property
+    def studied(self) -> np.ndarray:
+        return ~np.isnan(self.confidence)
+
+    @property
+    def progress(self) -> np.ndarray:
+        return np.where(self.studied, self.minutes * self.confidence, np.nan)
+
+    def snapshot(self) -> DailySeries:
+        """Copy for use on another thread. Arrays are shared (this class
+        replaces them rather than writing into them); the derived-series cache
+        is copied so the two never mutate a shared dict."""
+        other = DailySeries.__new__(DailySeries)
+        other.start, other.minutes, other.confidence = self.start, self.minutes, self.confidence
+        other._cache = dict(self._cache)
+        return other
+
+    def adopt_cache(self, other: DailySeries) -> None:
+        """Keep the derived series computed on `other`, a snapshot of this
+        series, if this one still has the same days (updates replace the
+        arrays, so identity tells)."""
+        if other.start == self.start and other.minutes is self.minutes and other.confidence is self.confidence:
+            for key, values in other._cache.items():
+                self._cache.setdefault(key, values)
+
+    def days(self) -> np.ndarray:
+        """Calendar as datetime64[D]."""
+        if self.start is None:
+            return np.zeros(0, dtype="datetime64[D]")
+        return (self.start + np.arange(len(self))).astype("datetime64[D]")
+
+    @staticmethod
+    def _dense(df: pd.DataFrame, start: int, length: int) -> tuple[np.ndarray, np.ndarray]:
+        days = date_ordinals(df["date"].to_numpy()) - start
+        minutes = np.zeros(length, dtype=np.float64)
+        confidence = np.full(length, np.nan)
+        minutes[days] = df["minutes"].to_numpy(dtype=np.float64)
+        confidence[days] = df["confidence"].to_numpy(dtype=np.float64)
+        return minutes, confidence
+
+    def update(self, df: pd.DataFrame) -> bool:
+        """Sync with a full entries frame. Extends incrementally when the known
+        history is unchanged and only later days were added; otherwise
+        rebuilds. Returns True if the update was incremental.
+        """
+        if df is None or df.empty:
+            self.__init__()
+            return False
+        days = date_ordinals(df["date"].to_numpy())
+        first, last = int(days.min()), int(days.max())
+        n = len(self)
+        if self.start == first and last >= self.start + n - 1 and n:
+            minutes, confidence = self._dense(df, first, last - first + 1)
+            same_prefix = np.array_equal(minutes[:n], self.minutes) and np.array_equal(
+                confidence[:n], self.confidence, equal_nan=True
+            )
+            if same_prefix:
+                if last - first + 1 > n:
+                    self._append(minutes[n:], confidence[n:])
+                return True
+        self.start = first
+        self.minutes, self.confidence = self._dense(df, first, last - first + 1)
+        self._cache.clear()
+        return False
+
+    def extend(self, df: pd.DataFrame) -> None:
+        """Append entries dated after the current last day."""
+        if df is None or df.empty:
+            return
+        if self.start is None:
+            self.update(df)
+            return
+        end = self.start + len(self)
+        days = date_ordinals(df["date"].to_numpy())
+        if int(days.min()) < end:
+            raise ValueError("extend() only accepts days after the current series end")
+        minutes, confidence = self._dense(df, end, int(days.max()) - end + 1)
+        self._append(minutes, confidence)
+
+    def _append(self, minutes: np.ndarray, confidence: np.ndarray) -> None:
+        old_n = len(self)
+        self.minutes = np.concatenate((self.minutes, minutes))
+        self.confidence = np.concatenate((self.confidence, confidence))
+        for key, cached in list(self._cache.items()):
+            self._cache[key] = np.concatenate((cached, self._compute(key, old_n)))
+
+    # Derived series -------------------------------------------------------
+    def _field(self, name: str) -> np.ndarray:
+        if name == "minutes":
+            return self.minutes
+        if name == "confidence":
+            return self.confidence
+        if name == "progress":
+            return self.progress
+        if name == "studied":
+            return self.studied.astype(np.float64)
+        raise ValueError(f"Unknown field: {name}")
+
+    def _compute(self, key: tuple, from_index: int = 0) -> np.ndarray:
+        """Compute series `key` for slots [from_index:], reading only the
+        lookback the window needs.
+        """
+        kind, field, window, param = key
+        values = self._field(field)
+        if kind == "ewma":
+            prev = self._cache[key][from_index - 1] if from_index else None
+            return ewma(values[from_index:], window, initial=prev)
+        lo = max(0, from_index - (window - 1))
+        if kind == "mean":
+            res = rolling_mean(values[lo:], window)
+        else:
+            res = rolling_percentile(values[lo:], window, param)
+        return res[from_index - lo:]
+
+    def _get(self, key: tuple) -> np.ndarray:
+        if key not in self._cache:
+            self._cache[key] = self._compute(key)
+        return self._cache[key]
+
+    def moving_average(self, window: int, field: str = "minutes") -> np.ndarray:
+        """Calendar-day moving average. Minutes count rest days as 0;
+        confidence/progress average only the days studied.
+        """
+        return self._get(("mean", field, int(window), None))
+
+    def ewma(self, span: int = 14, field: str = "confidence") -> np.ndarray:
+        return self._get(("ewma", field, int(span), None))
+
+    def rolling_percentile(self, q: float, window: int = 30, field: str = "minutes") -> np.ndarray:
+        return self._get(("pct", field, int(window), float(q)))
+
+    def active_days(self, window: int = 7) -> np.ndarray:
+        """Number of study days in each trailing window (rest-day aware)."""
+        return self._get(("mean", "studied", int(window), None)) * np.minimum(
+            np.arange(1, len(self) + 1), window
+        )
+
+    def sample(self, series: np.ndarray, dates) -> np.ndarray:
+        """Values of a dense series at the given dates."""
+        idx = date_ordinals(dates) - (self.start or 0)
+        return series[idx]
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import numpy as np
+
+from services.metrics import week_start_ordinals
+
+
+# The Insights charts, top to bottom
+CHARTS = ("minutes", "confidence", "progress")
+# Bars narrower than this (in pixels) switch the minutes chart to a coarser bin
+MIN_BAR_PX = 3
+BIN_DAYS = {"day": 1, "week": 7, "month": 30}
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of `threshold` points that
+    keep the visual shape of the series (peaks survive, flat runs thin out).
+    Always keeps the first and last point. `x` must be ascending.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = x.size
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    every = (n - 2) / (threshold - 2)
+    out = np.empty(threshold, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = int(i * every) + 1, int((i + 1) * every) + 1
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if nlo >= nhi:
+            avg_x, avg_y = x[-1], y[-1]
+        else:
+            avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def downsample(x: np.ndarray, y: np.ndarray, threshold: int) -> tuple[np.ndarray, np.ndarray]:
+    """Drop NaN points, then LTTB down to about `threshold` points."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    idx = lttb_indices(x, y, threshold)
+    return x[idx], y[idx]
+
+
+def window_slice(start: int, length: int, lo: int, hi: int) -> slice:
+    """Slice of a dense per-day series (first day `start`) covering days
+    [lo, hi] plus one day either side, so lines run to the chart edges."""
+    i = min(length, max(0, lo - start - 1))
+    j = min(length, hi - start + 2)
+    return slice(i, max(i, j))
+
+
+def pick_bin(span_days: int, width_px: int) -> str:
+    """'day', 'week' or 'month': the finest bin whose bars stay at least
+    MIN_BAR_PX wide across `width_px`."""
+    for name, days in BIN_DAYS.items():
+        if span_days / days * MIN_BAR_PX <= width_px:
+            return name
+    return "month"
+
+
+def bin_sums(ordinals: np.ndarray, values: np.ndarray, unit: str) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sum values per day/week/month. Returns (bin start ordinals, bin
+    lengths in days, sums); bins with no days are omitted."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    values = np.asarray(values, dtype=np.float64)
+    if unit == "day":
+        return ordinals, np.ones(ordinals.size, dtype=np.int64), values
+    if unit == "week":
+        keys = week_start_ordinals(ordinals)
+    else:
+        keys = ordinals.astype("datetime64[D]").astype("datetime64[M]").astype("datetime64[D]").astype(np.int64)
+    starts, inverse = np.unique(keys, return_inverse=True)
+    sums = np.bincount(inverse, weights=values, minlength=starts.size)
+    if unit == "week":
+        lengths = np.full(starts.size, 7, dtype=np.int64)
+    else:
+        nxt = (starts.astype("datetime64[D]").astype("datetime64[M]") + 1).astype("datetime64[D]").astype(np.int64)
+        lengths = nxt - starts
+    return starts, lengths, sums
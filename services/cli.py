@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import argparse
+import csv
+import datetime as dt
+import json
+import os
+import sys
+from typing import Iterable, Optional, TextIO
+
+from services import instrumentation, storage
+from services.filesync import EXPORT_FORMATS, export_head, export_rows, export_tail
+from services.metrics import stats_summary
+
+# Headless entry point for batch jobs: `python -m services <command>`.
+# Imports only the standard library, NumPy and the services it needs (no Qt,
+# matplotlib or pandas). Results go to stdout as JSON, one object per line
+# where there are several; notes and errors go to stderr. Exit status is 0 on
+# success, 1 when the command ran but found problems, 2 on usage errors.
+
+IMPORT_SUFFIXES = (".json", ".ndjson", ".jsonl", ".csv")
+
+
+def _emit(obj: dict, out: TextIO = None) -> None:
+    out = out or sys.stdout
+    out.write(json.dumps(obj, ensure_ascii=False, default=str) + "\n")
+    out.flush()
+
+
+def _note(text: str) -> None:
+    print(text, file=sys.stderr)
+
+
+def _parse_ndjson(lines: Iterable[str]) -> list[dict]:
+    return [json.loads(line) for line in lines if line.strip()]
+
+
+def read_records(path: str) -> list[dict]:
+    """Entries from a JSON export, NDJSON/JSONL, CSV, or "-" (stdin; the
+    format is recognised from the first character)."""
+    from services.importer import read_entries
+
+    if path == "-":
+        text = sys.stdin.read()
+        head = text.lstrip()[:1]
+        if head == "[":
+            return json.loads(text)
+        if head == "{":
+            return _parse_ndjson(text.splitlines())
+        return list(csv.DictReader(text.splitlines()))
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            return list(csv.DictReader(f))
+    if suffix in (".ndjson", ".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            return _parse_ndjson(f)
+    return read_entries(path)
+
+
+def _expand(paths: Iterable[str]) -> list[str]:
+    """Files to import: directories contribute their importable files, by name."""
+    out = []
+    for path in paths:
+        if os.path.isdir(path):
+            out.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.lower().endswith(IMPORT_SUFFIXES) and os.path.isfile(os.path.join(path, name))
+            )
+        else:
+            out.append(path)
+    return out
+
+
+def cmd_import(args) -> int:
+    from services.importer import apply_plan, plan_import
+
+    storage.init_db()
+    failed = False
+    for path in _expand(args.paths):
+        summary = {"path": path}
+        try:
+            records = read_records(path)
+        except (OSError, ValueError) as ex:
+            failed = True
+            _emit(dict(summary, error=f"Failed to read {path}: {ex}"))
+            continue
+        plan = plan_import(records, stop_on_fatal=args.strict)
+        blocked = args.strict and bool(plan["fatal"])
+        changed = 0
+        if not (args.dry_run or blocked) and plan["rows"]:
+            changed = apply_plan(plan)
+        failed |= blocked
+        summary.update(
+            records=len(records), inserted=plan["inserted"], updated=plan["updated"], changed=changed,
+            dry_run=args.dry_run, messages=len(plan["messages"]),
+        )
+        if blocked:
+            summary["error"] = "not imported: " + "; ".join(plan["fatal"][:5])
+        _emit(summary)
+        for m in plan["messages"][: args.max_messages]:
+            _note(f"{path}: {m}")
+    return 1 if failed else 0
+
+
+def write_entries(out: TextIO, fmt: str, rows: Iterable[tuple], chunk: int = 1000) -> int:
+    """Stream rows of storage.ENTRY_COLUMNS to `out` as a JSON list (the app's
+    export/import format), NDJSON or CSV. Returns the number written."""
+    out.write(export_head(fmt))
+    n = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk:
+            out.write(export_rows(fmt, batch, n))
+            n += len(batch)
+            batch = []
+    out.write(export_rows(fmt, batch, n))
+    n += len(batch)
+    out.write(export_tail(fmt, n))
+    return n
+
+
+def cmd_export(args) -> int:
+    storage.init_db()
+    fmt = args.format
+    if fmt is None:
+        suffix = os.path.splitext(args.output)[1].lower().lstrip(".") if args.output != "-" else ""
+        fmt = {"jsonl": "ndjson"}.get(suffix, suffix) if suffix in EXPORT_FORMATS + ("jsonl",) else "json"
+    if args.output == "-":
+        n = write_entries(sys.stdout, fmt, storage.iter_entries())
+        sys.stdout.flush()
+    else:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        tmp = args.output + ".tmp"
+        with open(tmp, "w", encoding="utf-8", newline="") as f:
+            n = write_entries(f, fmt, storage.iter_entries())
+        os.replace(tmp, args.output)
+        _emit({"path": args.output, "format": fmt, "entries": n})
+    return 0
+
+
+def cmd_backup(args) -> int:
+    if not os.path.exists(storage.DB_PATH):
+        _note(f"No database at {storage.DB_PATH}")
+        return 1
+    if args.output:
+        _emit({"path": storage.backup_db(args.output)})
+    else:
+        made = storage.backup_db_daily()
+        tag = dt.date.today().strftime("%Y%m%d")
+        _emit({"path": os.path.join(os.path.dirname(storage.DB_PATH), "backups", f"tracker-{tag}.db"), "created": made})
+    return 0
+
+
+def cmd_restore(args) -> int:
+    try:
+        safety = storage.restore_db(args.path)
+    except (OSError, ValueError) as ex:
+        _note(f"Restore failed: {ex}")
+        return 1
+    _emit({"restored": args.path, "previous_copy": safety, "data_version": storage.get_data_version()})
+    return 0
+
+
+def cmd_check(args) -> int:
+    storage.init_db()
+    messages = storage.integrity_check(quick=args.quick)
+    derived_ok = storage.verify_derived_state()
+    repaired = False
+    if not derived_ok and args.repair:
+        storage.rebuild_derived_state()
+        repaired = derived_ok = storage.verify_derived_state()
+    sound = messages == ["ok"]
+    _emit({"integrity": messages, "derived_state_ok": derived_ok, "repaired": repaired, "ok": sound and derived_ok})
+    return 0 if sound and derived_ok else 1
+
+
+def cmd_maintain(args) -> int:
+    storage.init_db()
+    ran = {} if args.status else storage.run_maintenance(args.task, force=args.force)
+    _emit({"ran": ran, "status": storage.maintenance_status()})
+    return 0 if all(r["result"].get("ok") for r in ran.values()) else 1
+
+
+def cmd_stats(args) -> int:
+    storage.init_db()
+    _emit(stats_summary(args.today, args.weeks))
+    return 0
+
+
+def cmd_archive(args) -> int:
+    storage.init_db()
+    try:
+        if args.through is not None or args.keep is not None:
+            through = args.through if args.through is not None else dt.date.today().year - args.keep
+            moved = {"archived": storage.archive_years(through)}
+        elif args.unarchive_from is not None:
+            moved = {"unarchived": storage.unarchive_years(args.unarchive_from)}
+        else:
+            moved = {}
+    except (OSError, ValueError, RuntimeError) as ex:
+        _note(f"Archive failed: {ex}")
+        return 1
+    _emit(dict(moved, **storage.get_archive_state(), db_bytes=os.path.getsize(storage.DB_PATH)))
+    return 0
+
+
+def cmd_serve(args) -> int:
+    from services import server
+
+    try:
+        server.serve(args.host, args.port, args.readers, on_ready=lambda s: _note(f"Serving {storage.DB_PATH} on http://{s.host}:{s.port}/ (Ctrl+C to stop)"))
+    except (ValueError, OSError) as ex:
+        _note(f"Cannot serve: {ex}")
+        return 1
+    return 0
+
+
+def cmd_team(args) -> int:
+    from services import team
+
+    if not os.path.isdir(args.directory):
+        _note(f"Not a directory: {args.directory}")
+        return 1
+    report = team.build_report(
+        args.directory, weeks=args.weeks, today=args.today, workers=args.workers,
+        cache_path=None if args.no_cache else "",
+    )
+    if args.format == "text":
+        print(team.format_report(report))
+    else:
+        _emit(report)
+    return 1 if report["errors"] else 0
+
+
+def cmd_bench(args) -> int:
+    from benchmarks import bench
+
+    return bench.main(args.bench_args)
+
+
+def _date(text: str) -> dt.date:
+    try:
+        return dt.date.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m services", description="Learning Progress Tracker batch commands (no GUI).")
+    parser.add_argument("--db", help=f"database file (default: {storage.DB_PATH})")
+    parser.add_argument("--diagnostics", metavar="FILE", help="record storage statistics and write a JSON snapshot to FILE")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="import JSON, NDJSON or CSV files, directories of them, or - (stdin)")
+    p.add_argument("paths", nargs="+")
+    p.add_argument("--dry-run", action="store_true", help="validate and count only")
+    p.add_argument("--strict", action="store_true", help="skip a file entirely if any row has a blocking problem")
+    p.add_argument("--max-messages", type=int, default=20, help="row notes printed to stderr per file (default: %(default)s)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="stream all entries as JSON, NDJSON or CSV")
+    p.add_argument("-o", "--output", default="-", help="file to write (default: stdout)")
+    p.add_argument("-f", "--format", choices=EXPORT_FORMATS, help="default: from the file suffix, else json")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("backup", help="consistent copy of the database")
+    p.add_argument("-o", "--output", help="target file (default: today's file under backups/, once per day)")
+    p.set_defaults(func=cmd_backup)
+
+    p = sub.add_parser("restore", help="replace the database with a backup (the current one is kept under backups/)")
+    p.add_argument("path")
+    p.set_defaults(func=cmd_restore)
+
+    p = sub.add_parser("check", help="SQLite integrity check plus streak/weekly state verification")
+    p.add_argument("--quick", action="store_true", help="quick_check instead of integrity_check")
+    p.add_argument("--repair", action="store_true", help="rebuild streak/weekly state if it does not match")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("maintain", help="PRAGMA optimize, incremental vacuum, ANALYZE and quick_check when due")
+    p.add_argument("--task", action="append", choices=tuple(storage.MAINTENANCE_INTERVALS), help="only this task (repeatable)")
+    p.add_argument("--force", action="store_true", help="run even if not due yet")
+    p.add_argument("--status", action="store_true", help="only show when each task last ran")
+    p.set_defaults(func=cmd_maintain)
+
+    p = sub.add_parser("stats", help="streaks and weekly minutes as JSON")
+    p.add_argument("--today", type=_date, help="reference day (default: today)")
+    p.add_argument("--weeks", type=int, default=12, help="weeks of history (default: %(default)s)")
+    p.set_defaults(func=cmd_stats)
+
+    p = sub.add_parser("archive", help="move closed years into read-only per-year archive databases (no option: show them)")
+    group = p.add_mutually_exclusive_group()
+    group.add_argument("--through", type=int, metavar="YEAR", help="archive every year up to and including YEAR")
+    group.add_argument("--keep", type=int, metavar="N", help="archive all but the last N years (this year counts)")
+    group.add_argument("--unarchive-from", type=int, metavar="YEAR", help="move YEAR and later archived years back into the database")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("serve", help="local HTTP/JSON API for several clients (loopback only)")
+    p.add_argument("--host", default="127.0.0.1", help="loopback address to bind (default: %(default)s)")
+    p.add_argument("--port", type=int, default=8765, help="default: %(default)s")
+    p.add_argument("--readers", type=int, default=4, help="pooled read connections (default: %(default)s)")
+    p.set_defaults(func=cmd_serve)
+
+    p = sub.add_parser("team", help="combined report over a directory of learners' tracker databases")
+    p.add_argument("directory", help="folder of *.db files (or one folder per learner with tracker.db)")
+    p.add_argument("--weeks", type=int, default=12, help="weeks of history (default: %(default)s)")
+    p.add_argument("--today", type=_date, help="reference day (default: today)")
+    p.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    p.add_argument("--no-cache", action="store_true", help="recompute every database instead of reusing unchanged results")
+    p.add_argument("-f", "--format", choices=("json", "text"), default="json")
+    p.set_defaults(func=cmd_team)
+
+    # Everything after "bench" is handed to benchmarks.bench (see main)
+    p = sub.add_parser("bench", help="run the benchmark suite (options as for python -m benchmarks.bench)", add_help=False)
+    p.set_defaults(func=cmd_bench)
+    return parser
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    if args.db:
+        storage.DB_PATH = args.db
+    if args.diagnostics:
+        instrumentation.enable(instrumentation.slow_query_ms)
+    try:
+        return args.func(args)
+    except BrokenPipeError:
+        # Downstream closed the pipe (e.g. `| head`); not an error for us.
+        # Point stdout at devnull so the interpreter's final flush is quiet.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if args.diagnostics:
+            instrumentation.export_snapshot(args.diagnostics)
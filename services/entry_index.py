@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Callable, Iterable, Optional
+
+import numpy as np
+
+
+def split_tags(tags: str) -> list[str]:
+    """Lower-cased tag names from a comma-separated string."""
+    return [t.strip().lower() for t in str(tags or "").split(",") if t.strip()]
+
+
+class _Vocab:
+    """Append-only string table. Rows store codes; sorting uses ranks."""
+
+    def __init__(self):
+        self.values: list[str] = []
+        self._codes: dict[str, int] = {}
+        self._ranks: Optional[np.ndarray] = None
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+            self._ranks = None
+        return code
+
+    def ranks(self) -> np.ndarray:
+        """code -> position of the value in sorted order."""
+        if self._ranks is None:
+            order = sorted(range(len(self.values)), key=self.values.__getitem__)
+            self._ranks = np.empty(len(self.values), dtype=np.int64)
+            self._ranks[order] = np.arange(len(self.values))
+        return self._ranks
+
+
+class EntryIndex:
+    """Columnar index over entry summaries for sorting and filtering.
+
+    Each date gets a stable row id; deletes clear an alive flag so ids never
+    shift. Sort permutations are computed per column on first use (ties
+    broken by date) and reused until the next write. Filters build a boolean
+    mask over row ids, so neither sorting nor filtering copies records.
+
+    `external_order(column)` may supply dates in ascending order for columns
+    the index does not hold (e.g. note text sorted by SQLite).
+    """
+
+    def __init__(self, records: Iterable[dict] = (), external_order: Optional[Callable[[str], list]] = None):
+        self._external_order = external_order
+        self.reset(records)
+
+    def reset(self, records: Iterable[dict]) -> None:
+        records = list(records)
+        n = len(records)
+        self._n = n
+        self._dates: list[dt.date] = [r["date"] for r in records]
+        self._rid: dict[dt.date, int] = {d: i for i, d in enumerate(self._dates)}
+        self._ordinal = np.fromiter((d.toordinal() for d in self._dates), dtype=np.int64, count=n)
+        self._minutes = np.fromiter((r["minutes"] for r in records), dtype=np.int64, count=n)
+        self._confidence = np.fromiter((r["confidence"] for r in records), dtype=np.int64, count=n)
+        self._alive = np.ones(n, dtype=bool)
+        self._topics, self._tag_strings = _Vocab(), _Vocab()
+        self._topic = np.fromiter((self._topics.code(r["topic"]) for r in records), dtype=np.int64, count=n)
+        self._tags_code = np.fromiter((self._tag_strings.code(r["tags"]) for r in records), dtype=np.int64, count=n)
+        self._by_tag: dict[str, set[int]] = {}
+        for rid, r in enumerate(records):
+            for tag in split_tags(r["tags"]):
+                self._by_tag.setdefault(tag, set()).add(rid)
+        self._perm: dict[str, np.ndarray] = {}
+
+    # Writes ---------------------------------------------------------------
+    def _grow(self) -> None:
+        cap = max(16, 2 * self._ordinal.size)
+        for name in ("_ordinal", "_minutes", "_confidence", "_topic", "_tags_code", "_alive"):
+            old = getattr(self, name)
+            new = np.zeros(cap, dtype=old.dtype)
+            new[:old.size] = old
+            setattr(self, name, new)
+
+    def set(self, rec: dict) -> int:
+        """Add or replace the row for rec['date']; returns its row id."""
+        d = rec["date"]
+        rid = self._rid.get(d)
+        if rid is None:
+            if self._n == self._ordinal.size:
+                self._grow()
+            rid = self._n
+            self._n += 1
+            self._rid[d] = rid
+            self._dates.append(d)
+        else:
+            self._untag(rid)
+        self._ordinal[rid] = d.toordinal()
+        self._minutes[rid] = rec["minutes"]
+        self._confidence[rid] = rec["confidence"]
+        self._topic[rid] = self._topics.code(rec["topic"])
+        self._tags_code[rid] = self._tag_strings.code(rec["tags"])
+        self._alive[rid] = True
+        for tag in split_tags(rec["tags"]):
+            self._by_tag.setdefault(tag, set()).add(rid)
+        self._perm.clear()
+        return rid
+
+    def discard(self, date: dt.date) -> Optional[int]:
+        """Mark the row for `date` deleted; returns its row id if it existed."""
+        rid = self._rid.get(date)
+        if rid is None or not self._alive[rid]:
+            return None
+        self._alive[rid] = False
+        self._untag(rid)
+        self._perm.clear()
+        return rid
+
+    def _untag(self, rid: int) -> None:
+        for tag in split_tags(self._tag_strings.values[self._tags_code[rid]]):
+            ids = self._by_tag.get(tag)
+            if ids is not None:
+                ids.discard(rid)
+                if not ids:
+                    del self._by_tag[tag]
+
+    # Reads ----------------------------------------------------------------
+    def __len__(self) -> int:
+        return int(self._alive[:self._n].sum())
+
+    def __contains__(self, date: dt.date) -> bool:
+        rid = self._rid.get(date)
+        return rid is not None and bool(self._alive[rid])
+
+    def rid(self, date: dt.date) -> Optional[int]:
+        return self._rid.get(date) if date in self else None
+
+    def date_of(self, rid: int) -> dt.date:
+        return self._dates[rid]
+
+    def tags(self) -> list[str]:
+        return sorted(self._by_tag)
+
+    def _column(self, column: str) -> np.ndarray:
+        n = self._n
+        if column == "date":
+            return self._ordinal[:n]
+        if column == "minutes":
+            return self._minutes[:n]
+        if column == "confidence":
+            return self._confidence[:n]
+        if column == "progress":
+            return self._minutes[:n] * self._confidence[:n]
+        if column == "topic":
+            return self._topics.ranks()[self._topic[:n]]
+        if column == "tags":
+            return self._tag_strings.ranks()[self._tags_code[:n]]
+        raise KeyError(column)
+
+    def insert_position(self, rows: np.ndarray, rid: int, column: str, descending: bool = False) -> Optional[int]:
+        """Where `rid` belongs in `rows` (ids already sorted as by order()).
+        None if `column` is only available through external_order."""
+        try:
+            values = self._column(column)
+        except KeyError:
+            return None
+        v, o = values[rid], self._ordinal[rid]
+        if descending:
+            ahead = (values[rows] > v) | ((values[rows] == v) & (self._ordinal[rows] > o))
+        else:
+            ahead = (values[rows] < v) | ((values[rows] == v) & (self._ordinal[rows] < o))
+        return int(np.count_nonzero(ahead))
+
+    def _permutation(self, column: str) -> np.ndarray:
+        perm = self._perm.get(column)
+        if perm is None:
+            try:
+                values = self._column(column)
+                perm = np.lexsort((self._ordinal[:self._n], values)) if column != "date" else np.argsort(values, kind="stable")
+            except KeyError:
+                if self._external_order is None:
+                    raise
+                perm = np.fromiter(
+                    (self._rid[d] for d in self._external_order(column) if d in self._rid), dtype=np.int64
+                )
+            self._perm[column] = perm
+        return perm
+
+    def mask(
+        self,
+        *,
+        start: Optional[dt.date] = None,
+        end: Optional[dt.date] = None,
+        tag: Optional[str] = None,
+        topic: Optional[str] = None,
+        min_minutes: Optional[int] = None,
+    ) -> np.ndarray:
+        """Boolean mask over row ids of live rows matching every given filter.
+        `topic` matches case-insensitively anywhere in the topic; `tag` is an
+        exact (case-insensitive) tag name."""
+        n = self._n
+        m = self._alive[:n].copy()
+        if start is not None:
+            m &= self._ordinal[:n] >= start.toordinal()
+        if end is not None:
+            m &= self._ordinal[:n] <= end.toordinal()
+        if min_minutes:
+            m &= self._minutes[:n] >= min_minutes
+        if topic:
+            needle = topic.casefold()
+            codes = [c for c, v in enumerate(self._topics.values) if needle in v.casefold()]
+            m &= np.isin(self._topic[:n], codes)
+        if tag:
+            ids = self._by_tag.get(tag.strip().lower(), ())
+            tagged = np.zeros(n, dtype=bool)
+            tagged[np.fromiter(ids, dtype=np.int64, count=len(ids))] = True
+            m &= tagged
+        return m
+
+    def matches(self, rid: int, **filters) -> bool:
+        """Scalar form of mask() for one row."""
+        d = self._dates[rid]
+        if not self._alive[rid]:
+            return False
+        if filters.get("start") is not None and d < filters["start"]:
+            return False
+        if filters.get("end") is not None and d > filters["end"]:
+            return False
+        if filters.get("min_minutes") and self._minutes[rid] < filters["min_minutes"]:
+            return False
+        topic = filters.get("topic")
+        if topic and topic.casefold() not in self._topics.values[self._topic[rid]].casefold():
+            return False
+        tag = filters.get("tag")
+        if tag and rid not in self._by_tag.get(tag.strip().lower(), ()):
+            return False
+        return True
+
+    def order(self, column: str = "date", descending: bool = False, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Row ids of live rows (optionally filtered by `mask`) sorted by
+        `column`."""
+        perm = self._permutation(column)
+        if descending:
+            perm = perm[::-1]
+        keep = self._alive[:self._n] if mask is None else mask
+        return perm[keep[perm]]
@@ -1,16 +1,39 @@
 import os
 import atexit
+import csv
+import datetime as dt
+import io
 import json
-from typing import Optional
+import uuid
+from typing import Iterable, Optional
 
-import pandas as pd
-
-from services.storage import get_all_entries_df, import_dataframe
+from services import instrumentation
+from services.storage import (
+    ENTRY_COLUMNS,
+    fetch_changes_since,
+    fetch_entries_for_dates,
+    get_all_entries_df,
+    get_setting,
+    import_dataframe,
+    init_db,
+    iter_entries,
+    last_change,
+    prune_changes,
+    set_setting,
+    untracked_changes,
+)
 
 
 APP_DIR_NAME = "Learning Progress Tracker"
 ENV_CSV_PATH = "LPT_CSV_PATH"
 ENV_JSON_PATH = "LPT_JSON_PATH"
+ENV_JOURNAL_PATH = "LPT_JOURNAL_PATH"
+ENV_SYNC_FORMAT = "LPT_SYNC_FORMAT"
+
+# Sync file written on launch/exit: "json" rewrites entries.json, "journal"
+# appends to entries.ndjson (see save_journal). Settings key "sync_format".
+SYNC_FORMATS = ("json", "journal")
+SYNC_FORMAT_KEY = "sync_format"
 
 
 def _documents_dir() -> str:
@@ -42,6 +65,21 @@ def get_json_path() -> str:
     return os.path.join(folder, "entries.json")
 
 
+def get_journal_path() -> str:
+    override = os.getenv(ENV_JOURNAL_PATH)
+    if override:
+        return os.path.abspath(override)
+    folder = os.path.join(_documents_dir(), APP_DIR_NAME)
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, "entries.ndjson")
+
+
+def get_sync_format() -> str:
+    fmt = os.getenv(ENV_SYNC_FORMAT) or get_setting(SYNC_FORMAT_KEY, "json") or "json"
+    return fmt if fmt in SYNC_FORMATS else "json"
+
+
+@instrumentation.operation
 def export_db_to_csv(path: Optional[str] = None) -> str:
     path = path or get_csv_path()
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -65,6 +103,7 @@ def export_db_to_csv(path: Optional[str] = None) -> str:
     return path
 
 
+@instrumentation.operation
 def export_db_to_json(path: Optional[str] = None) -> str:
     path = path or get_json_path()
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -90,7 +129,41 @@ def export_db_to_json(path: Optional[str] = None) -> str:
     return path
 
 
+# Streaming exports (CLI, local server): rows of ENTRY_COLUMNS are encoded
+# batch by batch, so memory does not grow with the history
+EXPORT_FORMATS = ("json", "ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"json": "application/json", "ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def export_head(fmt: str) -> str:
+    if fmt == "csv":
+        return ",".join(ENTRY_COLUMNS) + "\n"
+    return "[" if fmt == "json" else ""
+
+
+def export_rows(fmt: str, rows: Iterable[tuple], start: int = 0) -> str:
+    """Encode a batch of rows; `start` is how many rows came before it (the
+    JSON list needs separators between batches)."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(rows)
+        return buf.getvalue()
+    parts = [json.dumps(dict(zip(ENTRY_COLUMNS, row)), ensure_ascii=False, default=str) for row in rows]
+    if fmt == "ndjson":
+        return "".join(p + "\n" for p in parts)
+    return "".join(("\n  " if start + i == 0 else ",\n  ") + p for i, p in enumerate(parts))
+
+
+def export_tail(fmt: str, count: int) -> str:
+    if fmt == "json":
+        return "\n]\n" if count else "]\n"
+    return ""
+
+
+@instrumentation.operation
 def import_csv_to_db(path: Optional[str] = None) -> tuple[int, int, list[str]]:
+    import pandas as pd
+
     path = path or get_csv_path()
     if not os.path.exists(path):
         return 0, 0, []
@@ -101,25 +174,281 @@ def import_csv_to_db(path: Optional[str] = None) -> tuple[int, int, list[str]]:
     return import_dataframe(df, dry_run=False)
 
 
+@instrumentation.operation
 def import_json_to_db(path: Optional[str] = None) -> tuple[int, int, list[str]]:
+    from services.importer import import_records, read_entries
+
     path = path or get_json_path()
     if not os.path.exists(path):
         return 0, 0, []
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        if not isinstance(data, list):
-            return 0, 0, ["Invalid JSON format: expected a list of entries"]
-        df = pd.DataFrame(data)
+        records = read_entries(path)
     except Exception as ex:
         return 0, 0, [f"Failed to read JSON at {path}: {ex}"]
-    return import_dataframe(df, dry_run=False)
+    init_db()
+    return import_records(records)
+
+
+# Journal sync. entries.snapshot.ndjson is a header line plus one entry per
+# line; entries.ndjson is a header line plus appended change records,
+# {"seq": n, "op": "upsert", "entry": {...}} or {"seq": n, "op": "delete",
+# "date": ...}. Both headers carry the snapshot's id and the last record
+# number folded into it. A save appends only the entries written since the
+# previous save (storage's entry_changes feed), so it costs O(changes);
+# when the journal outgrows its threshold, it is compacted into a new
+# snapshot. Readers replay the snapshot plus the records numbered after it.
+JOURNAL_FORMAT = "lpt-journal"
+# Settings key: {"id": snapshot id, "change": last change number saved,
+# "read": last record number imported at launch}
+JOURNAL_STATE_KEY = "journal_sync"
+# Compact once the journal is larger than this share of the snapshot and
+# at least JOURNAL_COMPACT_MIN_BYTES (small histories are not rewritten)
+JOURNAL_COMPACT_RATIO = 0.5
+JOURNAL_COMPACT_MIN_BYTES = 256 * 1024
+
+
+def snapshot_path(journal_path: str) -> str:
+    return os.path.splitext(journal_path)[0] + ".snapshot.ndjson"
+
+
+def _journal_state() -> dict:
+    try:
+        return json.loads(get_setting(JOURNAL_STATE_KEY, "") or "{}")
+    except ValueError:
+        return {}
+
+
+def _update_journal_state(**values) -> None:
+    set_setting(JOURNAL_STATE_KEY, json.dumps(dict(_journal_state(), **values)))
+
+
+def _read_header(path: str, kind: str) -> Optional[dict]:
+    """First line of a journal or snapshot file; None if missing or foreign."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            header = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(header, dict) or header.get("format") != JOURNAL_FORMAT or header.get("kind") != kind:
+        return None
+    return header
+
+
+def _iter_lines(path: str) -> Iterable[dict]:
+    """Objects after the header line. An unterminated last line is a save
+    cut short by a crash and is skipped; any other bad line is an error."""
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for number, line in enumerate(f, start=2):
+            try:
+                yield json.loads(line)
+            except ValueError as ex:
+                if not line.endswith("\n"):
+                    return
+                raise ValueError(f"{path}, line {number}: {ex}") from ex
+
+
+def _journal_tail(path: str) -> tuple[int, int]:
+    """(last record number, length of the complete lines) of the journal,
+    read from the end of the file."""
+    with open(path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        block = 8192
+        while True:
+            start = max(0, size - block)
+            f.seek(start)
+            data = f.read()
+            end = data.rfind(b"\n")
+            begin = data.rfind(b"\n", 0, max(end, 0)) + 1
+            if end >= 0 and (begin > 0 or start == 0):
+                return int(json.loads(data[begin:end])["seq"]), start + end + 1
+            if start == 0:
+                raise ValueError(f"{path}: no complete header line")
+            block *= 4
+
+
+def _record(seq: int, date: str, row) -> dict:
+    if row is None:
+        return {"seq": seq, "op": "delete", "date": date}
+    return {"seq": seq, "op": "upsert", "entry": dict(zip(ENTRY_COLUMNS, row))}
+
+
+def _write_atomic(path: str, chunks: Iterable[str]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8", newline="\n") as f:
+        for chunk in chunks:
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@instrumentation.operation
+def compact_journal(path: Optional[str] = None) -> dict:
+    """Write every entry to a new snapshot and start an empty journal after
+    it. Record numbers carry on from the old journal, so a reader can tell
+    whether it has seen everything in the snapshot."""
+    path = path or get_journal_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    snap = snapshot_path(path)
+    try:
+        seq = _journal_tail(path)[0] if _read_header(path, "journal") else 0
+    except (OSError, ValueError, KeyError):
+        seq = 0
+    through = last_change()  # later writes are picked up by the next save
+    header = {"format": JOURNAL_FORMAT, "id": uuid.uuid4().hex, "seq": seq}
+    count = 0
+
+    def snapshot():
+        nonlocal count
+        yield json.dumps(dict(header, kind="snapshot", written=dt.datetime.now().isoformat(timespec="seconds"))) + "\n"
+        batch = []
+        for row in iter_entries():
+            batch.append(row)
+            if len(batch) == 1000:
+                yield export_rows("ndjson", batch)
+                count += len(batch)
+                batch = []
+        yield export_rows("ndjson", batch)
+        count += len(batch)
+
+    # Snapshot first: after a crash in between, the old journal's id no
+    # longer matches and its records (all folded into the snapshot) are ignored
+    _write_atomic(snap, snapshot())
+    _write_atomic(path, [json.dumps(dict(header, kind="journal")) + "\n"])
+    _update_journal_state(id=header["id"], change=through)
+    prune_changes(through)
+    return {"path": path, "appended": 0, "compacted": True, "entries": count, "seq": seq}
+
+
+@instrumentation.operation
+def save_journal(path: Optional[str] = None, *, compact: Optional[bool] = None) -> dict:
+    """Append a record for each entry written or deleted since the last
+    save, then compact if the journal has grown past its threshold (or
+    `compact` is True). Without a journal that this DB wrote, the first save
+    is a compaction. Returns {"path", "appended", "compacted", "seq"}."""
+    path = path or get_journal_path()
+    snap = snapshot_path(path)
+    state = _journal_state()
+    header = _read_header(snap, "snapshot")
+    journal = _read_header(path, "journal")
+    if compact or header is None or journal is None or not (header["id"] == journal["id"] == state.get("id")):
+        return compact_journal(path)
+    seq, length = _journal_tail(path)
+    changes = fetch_changes_since(int(state.get("change", 0)))
+    if changes:
+        rows = {str(r["date"])[:10]: r for r in fetch_entries_for_dates(d for d, _ in changes)}
+        lines = []
+        for date, _ in changes:
+            seq += 1
+            key = date.isoformat()
+            lines.append(json.dumps(_record(seq, key, rows.get(key)), ensure_ascii=False, default=str) + "\n")
+        with open(path, "r+b") as f:
+            f.truncate(length)  # drop a record cut short by a crash
+            f.seek(length)
+            f.write("".join(lines).encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        _update_journal_state(change=changes[-1][1])
+        prune_changes(changes[-1][1])
+    if compact is None and os.path.getsize(path) > max(JOURNAL_COMPACT_MIN_BYTES, JOURNAL_COMPACT_RATIO * os.path.getsize(snap)):
+        return dict(compact_journal(path), appended=len(changes))
+    return {"path": path, "appended": len(changes), "compacted": False, "seq": seq}
+
+
+def read_journal(path: Optional[str] = None, since: int = 0) -> list[dict]:
+    """Journal records numbered after `since`, without reading the snapshot
+    (a reader that has already seen record `since` only needs these)."""
+    path = path or get_journal_path()
+    if _read_header(path, "journal") is None:
+        return []
+    return [r for r in _iter_lines(path) if int(r["seq"]) > since]
+
+
+@instrumentation.operation
+def replay_journal(path: Optional[str] = None) -> tuple[list[dict], int]:
+    """Entries (by date) from the snapshot with the later journal records
+    applied, and the last record number. A journal left over from before
+    a compaction is ignored."""
+    path = path or get_journal_path()
+    snap = snapshot_path(path)
+    header = _read_header(snap, "snapshot")
+    entries: dict[str, dict] = {}
+    seq = 0
+    if header is not None:
+        seq = int(header["seq"])
+        entries = {str(e["date"])[:10]: e for e in _iter_lines(snap)}
+    journal = _read_header(path, "journal")
+    if journal is not None and (header is None or journal["id"] == header["id"]):
+        for record in read_journal(path, seq):
+            seq = int(record["seq"])
+            if record["op"] == "delete":
+                entries.pop(str(record["date"])[:10], None)
+            else:
+                entries[str(record["entry"]["date"])[:10]] = record["entry"]
+    return [entries[d] for d in sorted(entries)], seq
+
+
+@instrumentation.operation
+def sync_journal_on_launch(path: Optional[str] = None) -> tuple[str, list[str]]:
+    """Import the journal, then save the DB's own changes to it. If this DB
+    wrote the current snapshot and has read up to record n, only the records
+    after n (from other devices) are imported. Entries are merged as in the
+    JSON sync: deletes from other devices are not applied here. Without a
+    journal, entries.json is imported once."""
+    from services.importer import import_records
+
+    path = path or get_journal_path()
+    state = _journal_state()
+    header = _read_header(snapshot_path(path), "snapshot")
+    msgs: list[str] = []
+    try:
+        if header is not None and header["id"] == state.get("id") and int(header["seq"]) <= int(state.get("read", -1)):
+            latest: dict[str, dict] = {}
+            for record in read_journal(path, int(state["read"])):
+                if record["op"] == "upsert":
+                    latest[str(record["entry"]["date"])[:10]] = record["entry"]
+            records = list(latest.values())
+        elif header is not None or os.path.exists(path):
+            records, _ = replay_journal(path)
+            journal = _read_header(path, "journal")
+            if header is not None and journal is not None and journal["id"] == header["id"] and "change" in state:
+                # Another device compacted: append to its journal rather
+                # than compacting again (unsaved changes are still in the feed)
+                _update_journal_state(id=header["id"])
+        else:
+            records = None
+    except (OSError, ValueError, KeyError, TypeError) as ex:
+        # Keep the read position and do not save: appending to (or
+        # compacting over) a journal this DB could not read may lose records
+        return path, [f"Failed to read journal at {path}: {ex}"]
+    if records is None:
+        _, _, msgs = import_json_to_db(get_json_path())
+    elif records:
+        init_db()
+        # These records are in the journal already; saving them again
+        # would echo every other device's changes back to it
+        with untracked_changes():
+            _, _, msgs = import_records(records)
+    result = save_journal(path)
+    _update_journal_state(read=result["seq"])
+    return path, msgs
+
+
+def save_sync_file() -> str:
+    """Write the sync file in the chosen format (on exit)."""
+    if get_sync_format() == "journal":
+        return save_journal()["path"]
+    return export_db_to_json()
 
 
+@instrumentation.operation
 def create_or_sync_on_launch() -> tuple[str, list[str]]:
     """Prefer JSON for user-visible sync; fall back to CSV if present.
     Returns (path_used, messages) where messages are any non-fatal import notes.
     """
+    if get_sync_format() == "journal":
+        return sync_journal_on_launch()
     msgs: list[str] = []
     json_path = get_json_path()
     csv_path = get_csv_path()
@@ -146,7 +475,7 @@ def register_atexit_export():
 
     def _export():
         try:
-            export_db_to_json()
+            save_sync_file()
         except Exception:
             # Best-effort on interpreter shutdown
             pass
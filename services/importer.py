@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+from typing import Any, Callable, Iterable, Optional
+
+from services import instrumentation, storage
+from services.validation import validate_entry_fields
+
+# One import = parse once, validate once into a plan, then commit the plan in
+# a single transaction. The dry run the UI shows and the commit share the plan.
+
+# Validator messages that block an interactive import (others are warnings)
+FATAL_MARKERS = ("required", "must be")
+# Stop validating once this many fatal problems have been found
+MAX_FATAL = 20
+# Rows between progress callbacks / cancel checks
+PROGRESS_EVERY = 500
+# Above this many rows, streak/weekly state is rebuilt once instead of per row
+REBUILD_ROWS = 2000
+# Fields an import row must match to pass over an archived (read-only) entry
+ARCHIVE_COMPARED = ("topic", "minutes", "practiced", "challenges", "wins", "confidence", "tags")
+
+Progress = Callable[[str, int, int], None]
+
+
+class ImportCancelled(Exception):
+    """Raised inside the commit transaction so it rolls back."""
+
+
+def read_entries(path: str) -> list[dict]:
+    """Parse a JSON export: a list of entry objects."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError("Invalid JSON format: expected a list of entries")
+    return data
+
+
+def _missing(value: Any) -> bool:
+    if value is None:
+        return True
+    if isinstance(value, str):
+        return not value.strip()
+    try:
+        # NaN and pandas' NaT, which DataFrames use for blank cells
+        return bool(value != value)
+    except TypeError:
+        return True  # pandas' NA: comparing it gives NA again
+
+
+def _text(value: Any) -> str:
+    return "" if _missing(value) else str(value)
+
+
+def _int(value: Any, default: int) -> int:
+    try:
+        return int(value)
+    except Exception:
+        return default
+
+
+def _parse_date(value: Any) -> dt.date:
+    if isinstance(value, dt.datetime):
+        return value.date()
+    if isinstance(value, dt.date):
+        return value
+    try:
+        return dt.date.fromisoformat(str(value).strip())
+    except ValueError:
+        # Other spellings (timestamps, "2025/01/02", ...) go through pandas
+        import pandas as pd
+
+        return pd.to_datetime(value).date()
+
+
+@instrumentation.operation
+def plan_import(
+    records: Iterable[dict],
+    *,
+    stop_on_fatal: bool = True,
+    cancel=None,
+    progress: Optional[Progress] = None,
+) -> dict:
+    """Validate `records` without writing. Returns a plan dict: `rows`
+    (sanitized entries in file order, ready for apply_plan), `inserted`,
+    `updated`, `messages` (all row notes) and `fatal` (the blocking ones).
+    With stop_on_fatal, validation ends after MAX_FATAL fatal problems.
+    """
+    records = list(records)
+    total = len(records)
+    cutoff = storage.archive_cutoff()
+    archived: list[tuple[int, dict]] = []
+    rows: list[dict] = []
+    messages: list[str] = []
+    fatal: list[str] = []
+    for idx, rec in enumerate(records):
+        if idx % PROGRESS_EVERY == 0:
+            if cancel is not None and cancel.cancelled:
+                raise ImportCancelled()
+            if progress:
+                progress("Validating", idx, total)
+        if not isinstance(rec, dict):
+            fatal.append(f"Row {idx}: expected an object")
+            messages.append(fatal[-1])
+            continue
+        rec = {str(k).lower(): v for k, v in rec.items()}
+        raw_date = rec.get("date")
+        if _missing(raw_date):
+            fatal.append(f"Row {idx}: missing date")
+            messages.append(fatal[-1])
+            continue
+        try:
+            d = _parse_date(raw_date)
+        except Exception as ex:
+            fatal.append(f"Row {idx}: invalid date {raw_date!r} ({ex})")
+            messages.append(fatal[-1])
+            continue
+        sanitized, msgs = validate_entry_fields(
+            topic=_text(rec.get("topic")),
+            minutes=_int(rec.get("minutes"), 0),
+            confidence=_int(rec.get("confidence"), 3),
+            practiced=_text(rec.get("practiced")),
+            challenges=_text(rec.get("challenges")),
+            wins=_text(rec.get("wins")),
+            tags=_text(rec.get("tags")),
+        )
+        for m in msgs:
+            messages.append(f"Row {idx}: {m}")
+            if any(marker in m.lower() for marker in FATAL_MARKERS):
+                fatal.append(messages[-1])
+        if cutoff is not None and d < cutoff:
+            archived.append((idx, dict(sanitized, date=d)))
+        else:
+            rows.append(dict(sanitized, date=d))
+        if stop_on_fatal and len(fatal) >= MAX_FATAL:
+            break
+    if stop_on_fatal and len(fatal) >= MAX_FATAL:
+        fatal = fatal[:MAX_FATAL]
+        return dict(rows=[], inserted=0, updated=0, messages=messages, fatal=fatal)
+
+    if archived:
+        # Archived years are read-only: rows that match what is stored (a
+        # full export being synced back) are skipped quietly, others block
+        def fields(row):
+            return tuple("" if row[k] is None else row[k] for k in ARCHIVE_COMPARED)
+
+        stored = {
+            dt.date.fromisoformat(str(r["date"])[:10]): fields(r)
+            for r in storage.fetch_entries_for_dates(r["date"] for _, r in archived)
+        }
+        for idx, r in archived:
+            if stored.get(r["date"]) != fields(r):
+                fatal.append(f"Row {idx}: {r['date'].year} is archived; entries before {cutoff.isoformat()} cannot be changed")
+                messages.append(fatal[-1])
+
+    # One indexed lookup per chunk of dates instead of one query per row
+    existing = storage.fetch_existing_dates(r["date"] for r in rows)
+    inserted = updated = 0
+    for r in rows:
+        if r["date"] in existing:
+            updated += 1
+        else:
+            inserted += 1
+            existing.add(r["date"])  # a repeated date updates the first
+    if progress:
+        progress("Validating", total, total)
+    return dict(rows=rows, inserted=inserted, updated=updated, messages=messages, fatal=fatal)
+
+
+@instrumentation.operation
+def apply_plan(plan: dict, *, cancel=None, progress: Optional[Progress] = None) -> int:
+    """Write a plan's rows in one transaction; rolls back (raising
+    ImportCancelled) if `cancel` is set part-way. Returns rows changed."""
+    rows = plan["rows"]
+    total = len(rows)
+    bulk = total > REBUILD_ROWS
+    changed = 0
+    with storage.conn_ctx() as conn:
+        # Before the first write opens the transaction: a bulk rebuild reads all years
+        storage.attach_archives(conn)
+        storage.check_writable(conn, (r["date"] for r in rows))
+        for i, r in enumerate(rows):
+            if i % PROGRESS_EVERY == 0:
+                if cancel is not None and cancel.cancelled:
+                    raise ImportCancelled()
+                if progress:
+                    progress("Importing", i, total)
+            changed += storage.write_entry(
+                conn, r["date"], r["topic"], r["minutes"], r["practiced"], r["challenges"], r["wins"], r["confidence"], r["tags"],
+                derived=not bulk,
+            )
+        if changed:
+            storage.bump_data_version(conn)
+            if bulk:
+                storage.rebuild_derived_state(conn)
+        if cancel is not None and cancel.cancelled:
+            raise ImportCancelled()
+    if progress:
+        progress("Importing", total, total)
+    return changed
+
+
+@instrumentation.operation
+def import_records(records: Iterable[dict], *, dry_run: bool = False) -> tuple[int, int, list[str]]:
+    """Non-interactive import (launch sync, import_dataframe): rows with
+    problems are clamped or skipped, never blocking. Returns
+    (inserted, updated, messages)."""
+    plan = plan_import(records, stop_on_fatal=False)
+    if not dry_run and plan["rows"]:
+        apply_plan(plan)
+    return plan["inserted"], plan["updated"], plan["messages"]
+
+
+@instrumentation.operation
+def import_file(path: str, *, cancel=None, progress: Optional[Progress] = None) -> dict:
+    """Interactive import of a JSON file: parse once, validate once, and
+    commit the same plan unless it has fatal problems. Returns the plan with
+    `cancelled` set; file-level errors (unreadable, not a list) raise.
+    """
+    storage.init_db()
+    if progress:
+        progress("Reading", 0, 0)
+    records = read_entries(path)
+    try:
+        plan = plan_import(records, cancel=cancel, progress=progress)
+        if not plan["fatal"] and plan["rows"]:
+            apply_plan(plan, cancel=cancel, progress=progress)
+    except ImportCancelled:
+        return dict(rows=[], inserted=0, updated=0, messages=[], fatal=[], cancelled=True)
+    plan["cancelled"] = False
+    return plan
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import datetime as dt
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Iterable, Optional
+
+# Opt-in instrumentation of storage access. Storage functions are wrapped
+# with @operation and conn_ctx opens a traced connection while enabled; every
+# connection, statement, commit, fetched row and bound/returned byte is
+# charged to the outermost tracked operation on the current thread, so an
+# import shows up as one "import_file" line with its total query count.
+# Disabled (the default), the cost is one module attribute check per call.
+
+# Upper bounds (ms) of the latency histogram buckets; one more open bucket follows
+BUCKETS_MS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000)
+# Slow statements kept (oldest dropped first)
+SLOW_LOG_SIZE = 200
+# Operation name for connections opened outside any tracked function
+OTHER = "other"
+
+
+def _env_ms(name: str) -> Optional[float]:
+    """A positive millisecond value from the environment, else None (a typo
+    must not stop storage from importing)."""
+    try:
+        ms = float(os.environ.get(name, ""))
+    except ValueError:
+        return None
+    return ms if ms > 0 else None
+
+
+# Statements slower than this are logged with their query plan; None = off.
+# The log only fills while collecting, so setting a threshold turns it on too.
+slow_query_ms: Optional[float] = _env_ms("LPT_SLOW_QUERY_MS")
+enabled = os.environ.get("LPT_DIAGNOSTICS", "") == "1" or slow_query_ms is not None
+
+_lock = threading.Lock()
+_local = threading.local()
+_ops: dict[str, dict] = {}
+_slow: deque = deque(maxlen=SLOW_LOG_SIZE)
+_since = dt.datetime.now()
+
+
+def enable(slow_ms: Optional[float] = None) -> None:
+    """Start collecting; `slow_ms` also turns on the slow-query log."""
+    global enabled, slow_query_ms
+    slow_query_ms = slow_ms if slow_ms else None
+    enabled = True
+
+
+def disable() -> None:
+    """Stop collecting (counters are kept until reset)."""
+    global enabled
+    enabled = False
+
+
+def set_slow_query_ms(ms: Optional[float]) -> None:
+    global slow_query_ms
+    slow_query_ms = ms if ms else None
+
+
+def reset() -> None:
+    global _since
+    with _lock:
+        _ops.clear()
+        _slow.clear()
+        _since = dt.datetime.now()
+
+
+def _stack() -> list[str]:
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _current() -> str:
+    stack = getattr(_local, "stack", None)
+    return stack[0] if stack else OTHER
+
+
+def _stats(name: str) -> dict:
+    # Caller holds _lock
+    stats = _ops.get(name)
+    if stats is None:
+        stats = _ops[name] = dict(
+            calls=0, errors=0, connections=0, queries=0, commits=0, rows=0, bytes=0,
+            total_ms=0.0, max_ms=0.0, query_ms=0.0, histogram=[0] * (len(BUCKETS_MS) + 1),
+        )
+    return stats
+
+
+def _bucket(ms: float) -> int:
+    for i, bound in enumerate(BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(BUCKETS_MS)
+
+
+def _add(name: str, **counts) -> None:
+    with _lock:
+        stats = _stats(name)
+        for key, value in counts.items():
+            stats[key] += value
+
+
+def _size(values: Any) -> int:
+    """Approximate payload size of bound parameters or a row."""
+    if values is None:
+        return 0
+    if isinstance(values, dict):
+        values = values.values()
+    total = 0
+    for v in values:
+        if isinstance(v, str):
+            total += len(v.encode("utf-8", "replace"))
+        elif isinstance(v, (bytes, bytearray, memoryview)):
+            total += len(v)
+        elif v is not None:
+            total += 8
+    return total
+
+
+def operation(fn: Callable) -> Callable:
+    """Wrap a storage function so its calls, latency and the database work
+    done inside it are recorded while instrumentation is enabled."""
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return fn(*args, **kwargs)
+        stack = _stack()
+        stack.append(name)
+        t0 = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            stack.pop()
+            ms = (time.perf_counter() - t0) * 1000
+            with _lock:
+                stats = _stats(name)
+                stats["calls"] += 1
+                stats["errors"] += not ok
+                stats["total_ms"] += ms
+                stats["max_ms"] = max(stats["max_ms"], ms)
+                stats["histogram"][_bucket(ms)] += 1
+
+    return wrapper
+
+
+class TracedCursor(sqlite3.Cursor):
+    def _done(self, sql: str, params: Any, t0: float, size: int) -> None:
+        ms = (time.perf_counter() - t0) * 1000
+        changed = max(self.rowcount, 0)
+        _add(_current(), queries=1, query_ms=ms, rows=changed, bytes=size)
+        if slow_query_ms is not None and ms >= slow_query_ms:
+            _log_slow(self.connection, sql, params, ms)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        t0 = time.perf_counter()
+        super().execute(sql, parameters)
+        self._done(sql, parameters, t0, _size(parameters))
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable):
+        seq = list(seq_of_parameters)
+        t0 = time.perf_counter()
+        super().executemany(sql, seq)
+        self._done(sql, seq[0] if seq else (), t0, sum(_size(p) for p in seq))
+        return self
+
+    def _fetched(self, rows: list) -> None:
+        if rows:
+            _add(_current(), rows=len(rows), bytes=sum(_size(r) for r in rows))
+
+    def fetchone(self):
+        row = super().fetchone()
+        if row is not None:
+            self._fetched([row])
+        return row
+
+    def fetchmany(self, size: int = -1):
+        rows = super().fetchmany(size if size >= 0 else self.arraysize)
+        self._fetched(rows)
+        return rows
+
+    def fetchall(self):
+        rows = super().fetchall()
+        self._fetched(rows)
+        return rows
+
+    def __next__(self):
+        row = super().__next__()
+        self._fetched([row])
+        return row
+
+
+class TracedConnection(sqlite3.Connection):
+    # sqlite3.Connection.execute does not go through cursor(), so the
+    # shortcuts are spelled out here
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Iterable):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def commit(self) -> None:
+        t0 = time.perf_counter()
+        super().commit()
+        _add(_current(), commits=1, query_ms=(time.perf_counter() - t0) * 1000)
+
+
+def connect(path: str, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect with a traced connection (used by conn_ctx while enabled)."""
+    conn = sqlite3.connect(path, factory=TracedConnection, **kwargs)
+    _add(_current(), connections=1)
+    return conn
+
+
+def _log_slow(conn: sqlite3.Connection, sql: str, params: Any, ms: float) -> None:
+    try:
+        # Base-class execute so the EXPLAIN itself is not counted or logged
+        rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        plan = [str(r[3]) for r in rows]
+    except sqlite3.Error as ex:
+        plan = [f"(no plan: {ex})"]
+    entry = {
+        "at": dt.datetime.now().isoformat(timespec="seconds"),
+        "operation": _current(),
+        "ms": round(ms, 3),
+        "sql": " ".join(sql.split())[:500],
+        "params": len(params) if isinstance(params, (list, tuple, dict)) else 0,
+        "plan": plan,
+    }
+    with _lock:
+        _slow.append(entry)
+
+
+def _bucket_labels() -> list[str]:
+    return [f"<={b:g}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]:g}ms"]
+
+
+def snapshot() -> dict:
+    """Copy of the counters: per-operation stats (calls, errors,
+    connections, queries, commits, rows, bytes, total/mean/max ms, time spent
+    in SQLite and a latency histogram) and the slow-query log."""
+    labels = _bucket_labels()
+    with _lock:
+        ops = {}
+        for name, s in sorted(_ops.items()):
+            ops[name] = dict(
+                {k: s[k] for k in ("calls", "errors", "connections", "queries", "commits", "rows", "bytes")},
+                total_ms=round(s["total_ms"], 3),
+                mean_ms=round(s["total_ms"] / s["calls"], 3) if s["calls"] else 0.0,
+                max_ms=round(s["max_ms"], 3),
+                query_ms=round(s["query_ms"], 3),
+                histogram={label: n for label, n in zip(labels, s["histogram"]) if n},
+            )
+        slow = list(_slow)
+        since = _since
+    return {
+        "enabled": enabled,
+        "slow_query_ms": slow_query_ms,
+        "since": since.isoformat(timespec="seconds"),
+        "taken": dt.datetime.now().isoformat(timespec="seconds"),
+        "sqlite": sqlite3.sqlite_version,
+        "operations": ops,
+        "slow_queries": slow,
+    }
+
+
+def export_snapshot(path: str) -> str:
+    """Write snapshot() as JSON to `path`; returns the path."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+def format_snapshot(snap: Optional[dict] = None) -> str:
+    """Plain-text table of a snapshot, busiest operations first."""
+    snap = snap or snapshot()
+    ops = snap["operations"]
+    if not ops:
+        state = "Collecting" if snap["enabled"] else "Diagnostics are off"
+        return f"{state}; no storage calls recorded since {snap['since']}."
+    lines = [f"{'operation':<24}{'calls':>7}{'conns':>7}{'commits':>8}{'queries':>9}{'rows':>9}{'KiB':>9}{'mean ms':>9}{'max ms':>9}"]
+    for name, s in sorted(ops.items(), key=lambda kv: -(kv[1]["total_ms"] or kv[1]["query_ms"])):
+        lines.append(
+            f"{name:<24}{s['calls']:>7}{s['connections']:>7}{s['commits']:>8}{s['queries']:>9}{s['rows']:>9}"
+            f"{s['bytes'] / 1024:>9.1f}{s['mean_ms']:>9.2f}{s['max_ms']:>9.2f}"
+        )
+    if snap["slow_queries"]:
+        lines.append("")
+        lines.append(f"Slow queries (>= {snap['slow_query_ms']:g} ms), newest last:")
+        for q in snap["slow_queries"][-10:]:
+            lines.append(f"  {q['ms']:.2f} ms in {q['operation']}: {q['sql'][:100]}")
+            lines.extend(f"    {p}" for p in q["plan"])
+    return "\n".join(lines)
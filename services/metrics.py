@@ -1,7 +1,14 @@
 from __future__ import annotations
 
 import datetime as dt
-import pandas as pd
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from services import instrumentation
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 def compute_progress_score(minutes: int, confidence: int) -> int:
@@ -16,14 +23,37 @@ def compute_week_index(date: dt.date, start_date: dt.date) -> int:
     return max(0, delta // 7)
 
 
+def date_ordinals(values) -> np.ndarray:
+    """Days since the Unix epoch as an int64 array (datetime64[D] view).
+    Accepts a Series/array of dates, datetimes or ISO strings.
+    """
+    import pandas as pd
+
+    days = pd.to_datetime(pd.Series(values)).to_numpy().astype("datetime64[D]")
+    return days.astype(np.int64)
+
+
+def progress_scores(minutes, confidence) -> np.ndarray:
+    """Vectorized compute_progress_score."""
+    return np.asarray(minutes, dtype=np.int64) * np.asarray(confidence, dtype=np.int64)
+
+
+def week_indices(ordinals: np.ndarray, start: int | None = None) -> np.ndarray:
+    """Vectorized compute_week_index over day ordinals (see date_ordinals)."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    if start is None:
+        start = int(ordinals.min()) if ordinals.size else 0
+    return np.maximum(0, (ordinals - start) // 7)
+
+
 def add_derived_fields(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
     out = df.copy()
-    out["date"] = pd.to_datetime(out["date"]).dt.date
-    out["progress_score"] = out.apply(lambda r: compute_progress_score(int(r["minutes"]), int(r["confidence"])), axis=1)
-    start_date = out["date"].min()
-    out["week_index"] = out["date"].apply(lambda d: compute_week_index(d, start_date))
+    days = date_ordinals(out["date"].to_numpy())
+    out["date"] = days.astype("datetime64[D]").astype(object)
+    out["progress_score"] = progress_scores(out["minutes"].astype(np.int64), out["confidence"].astype(np.int64))
+    out["week_index"] = week_indices(days)
     return out
 
 
@@ -58,6 +88,33 @@ def compute_streaks(dates: list[dt.date]) -> tuple[int, int]:
     return current, longest
 
 
+def compute_runs(ordinals) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized run detection over day ordinals (see date_ordinals).
+    Returns (starts, ends) of maximal runs of consecutive days, both inclusive.
+    """
+    uniq = np.unique(np.asarray(ordinals, dtype=np.int64))
+    if uniq.size == 0:
+        return uniq, uniq
+    breaks = np.flatnonzero(np.diff(uniq) != 1)
+    starts = uniq[np.concatenate(([0], breaks + 1))]
+    ends = uniq[np.concatenate((breaks, [uniq.size - 1]))]
+    return starts, ends
+
+
+def week_start_ordinals(ordinals) -> np.ndarray:
+    """Monday of each day's week as a day ordinal (1970-01-01 was a Thursday)."""
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    return ordinals - (ordinals + 3) % 7
+
+
+def weekly_totals(ordinals, minutes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized per-week sums. Returns (week_starts, minutes, sessions)."""
+    weeks, inverse = np.unique(week_start_ordinals(ordinals), return_inverse=True)
+    mins = np.bincount(inverse, weights=np.asarray(minutes, dtype=np.int64), minlength=weeks.size)
+    counts = np.bincount(inverse, minlength=weeks.size)
+    return weeks, mins.astype(np.int64), counts.astype(np.int64)
+
+
 def week_bounds_for(date: dt.date) -> tuple[dt.date, dt.date]:
     start = date - dt.timedelta(days=date.weekday())  # Monday
     end = start + dt.timedelta(days=6)
@@ -65,6 +122,8 @@ def week_bounds_for(date: dt.date) -> tuple[dt.date, dt.date]:
 
 
 def weekly_minutes(df: pd.DataFrame, week_of: dt.date | None = None) -> int:
+    import pandas as pd
+
     if df.empty:
         return 0
     df2 = df.copy()
@@ -73,3 +132,128 @@ def weekly_minutes(df: pd.DataFrame, week_of: dt.date | None = None) -> int:
     start, end = week_bounds_for(ref)
     m = (df2["date"] >= start) & (df2["date"] <= end)
     return int(df2.loc[m, "minutes"].sum())
+
+
+# SQL pushdown aggregations. Grouping runs inside SQLite over an indexed date
+# range and only the small grouped result is turned into a frame; the pandas
+# helpers above remain the reference implementations.
+AGGREGATE_COLUMNS = ["key", "minutes", "sessions", "avg_confidence", "progress"]
+
+_GROUP_KEYS = {
+    "week": "date(date, '-' || ((CAST(strftime('%w', date) AS INTEGER) + 6) % 7) || ' days')",
+    "month": "substr(date, 1, 7)",
+    "topic": "COALESCE(topic, '')",
+}
+
+
+def _date_range_clause(start: dt.date | None, end: dt.date | None) -> tuple[str, list]:
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(end.isoformat())
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+
+@instrumentation.operation
+def aggregate_db(by: str = "week", start: dt.date | None = None, end: dt.date | None = None) -> pd.DataFrame:
+    """Group sessions by week (Monday start), month (YYYY-MM), topic or tag.
+    Returns columns: key, minutes, sessions, avg_confidence, progress.
+    """
+    import pandas as pd
+    from services.storage import conn_ctx, source_table
+
+    where, params = _date_range_clause(start, end)
+    if by == "tag":
+        sql = f"""
+            WITH RECURSIVE split(minutes, confidence, tag, rest) AS (
+                SELECT minutes, confidence, '', COALESCE(tags, '') || ',' FROM {{source}}{where}
+                UNION ALL
+                SELECT minutes, confidence, TRIM(substr(rest, 1, instr(rest, ',') - 1)), substr(rest, instr(rest, ',') + 1)
+                FROM split WHERE rest <> ''
+            )
+            SELECT tag, SUM(minutes), COUNT(*), AVG(confidence), SUM(minutes * confidence)
+            FROM split WHERE tag <> '' GROUP BY tag ORDER BY tag
+        """
+    elif by in _GROUP_KEYS:
+        key = _GROUP_KEYS[by]
+        sql = f"""
+            SELECT {key} AS k, SUM(minutes), COUNT(*), AVG(confidence), SUM(minutes * confidence)
+            FROM {{source}}{where} GROUP BY k ORDER BY k
+        """
+    else:
+        raise ValueError(f"Unknown grouping: {by}")
+    with conn_ctx() as conn:
+        rows = conn.execute(sql.format(source=source_table(conn, start, end)), params).fetchall()
+    df = pd.DataFrame(rows, columns=AGGREGATE_COLUMNS)
+    return df.astype({"minutes": "int64", "sessions": "int64", "avg_confidence": "float64", "progress": "int64"})
+
+
+@instrumentation.operation
+def weekly_minutes_db(week_of: dt.date | None = None) -> int:
+    """SQL counterpart of weekly_minutes: sums one week via the date index."""
+    from services.storage import conn_ctx, source_table
+
+    start, end = week_bounds_for(week_of or dt.date.today())
+    with conn_ctx() as conn:
+        row = conn.execute(
+            f"SELECT COALESCE(SUM(minutes), 0) FROM {source_table(conn, start, end)} WHERE date >= ? AND date <= ?",
+            (start.isoformat(), end.isoformat()),
+        ).fetchone()
+    return int(row[0])
+
+
+@instrumentation.operation
+def weekly_summary_db(weeks: int = 12, week_of: dt.date | None = None) -> pd.DataFrame:
+    """Totals and averages for the last `weeks` weeks ending at week_of's week."""
+    last_start, last_end = week_bounds_for(week_of or dt.date.today())
+    first_start = last_start - dt.timedelta(weeks=max(1, weeks) - 1)
+    df = aggregate_db("week", first_start, last_end)
+    df["avg_minutes_per_day"] = (df["minutes"] / 7).round(1)
+    return df.rename(columns={"key": "week"})
+
+
+@instrumentation.operation
+def stats_summary(today: dt.date | None = None, weeks: int = 12) -> dict:
+    """Streaks, totals and the last `weeks` weeks of minutes as plain JSON
+    types (CLI `stats`, server `/stats`). Served from the stored
+    streak_runs/weekly_totals tables, so cheap on any history size."""
+    from services import storage
+
+    today = today or dt.date.today()
+    weeks = max(1, weeks)
+    state = storage.get_streak_state(today)
+    totals = storage.get_entry_totals()
+    last_week = week_bounds_for(today)[0]
+    first_week = last_week - dt.timedelta(weeks=weeks - 1)
+    stored = {w: (m, n) for w, m, n in storage.fetch_week_totals(first_week, last_week)}
+    series = []
+    for i in range(weeks):
+        week = first_week + dt.timedelta(weeks=i)
+        m, n = stored.get(week, (0, 0))
+        series.append({"week": week.isoformat(), "minutes": m, "sessions": n})
+
+    def run(bounds):
+        return [bounds[0].isoformat(), bounds[1].isoformat()] if bounds else None
+
+    try:
+        goal = int(storage.get_setting("weekly_goal_minutes", "0") or 0)
+    except ValueError:
+        goal = 0
+    return {
+        "today": today.isoformat(),
+        "entries": totals["entries"],
+        "total_minutes": totals["minutes"],
+        "first_date": totals["first_date"].isoformat() if totals["first_date"] else None,
+        "last_date": totals["last_date"].isoformat() if totals["last_date"] else None,
+        "current_streak": state["current_streak"],
+        "longest_streak": state["longest_streak"],
+        "current_run": run(state["current_run"]),
+        "longest_run": run(state["longest_run"]),
+        "week_start": state["week_start"].isoformat(),
+        "week_minutes": state["week_minutes"],
+        "weekly_goal_minutes": goal,
+        "weeks": series,
+    }
@@ -0,0 +1,562 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import ipaddress
+import json
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from services import importer, instrumentation, storage
+from services.filesync import EXPORT_FORMATS, EXPORT_MEDIA_TYPES, export_head, export_rows, export_tail
+from services.metrics import stats_summary
+
+# Optional local HTTP/JSON server so several clients can share one tracker DB
+# (`python -m services serve`). Standard library only:
+# - reads run on a small pool of read-only connections (WAL mode, so they do
+#   not block the writer), lent to the storage functions via use_connection;
+# - writes go through one queue to a single writer thread that applies
+#   whatever has queued up in one transaction (a savepoint per request);
+# - GET responses carry the data version as ETag and are cached by URL, so
+#   repeated reads are answered without touching SQLite beyond one lookup;
+# - /export streams with chunked transfer encoding.
+# It only listens on loopback addresses and checks the Host header.
+#
+#   GET    /health                          {"ok": true, "data_version": n}
+#   GET    /entries?start=&end=&limit=      entries in a date range
+#   GET    /entries/YYYY-MM-DD              one entry (404 if none)
+#   PUT    /entries/YYYY-MM-DD              upsert one entry (JSON object)
+#   DELETE /entries/YYYY-MM-DD
+#   POST   /import                          JSON list; all-or-nothing if any row is invalid
+#   GET    /stats?today=&weeks=             as `python -m services stats`
+#   GET    /export?format=json|ndjson|csv   streamed
+
+DEFAULT_PORT = 8765
+READERS = 4
+# Writes applied per transaction at most
+MAX_BATCH = 256
+# Cached GET responses (by URL; stale versions are dropped on lookup)
+CACHE_SIZE = 256
+EXPORT_CHUNK = 2000
+MAX_BODY = 64 * 1024 * 1024
+
+_REASONS = {
+    200: "OK", 304: "Not Modified", 400: "Bad Request", 403: "Forbidden", 404: "Not Found",
+    405: "Method Not Allowed", 409: "Conflict", 413: "Payload Too Large", 500: "Internal Server Error",
+}
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, detail: Any = None):
+        super().__init__(message)
+        self.status = status
+        self.detail = detail
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def host_name(host: str) -> str:
+    """The name part of a Host header: "[::1]:8765" -> "::1", "localhost:80" -> "localhost"."""
+    if host.startswith("["):
+        end = host.find("]")
+        return host[1:end] if end > 0 else host
+    return host.rsplit(":", 1)[0]
+
+
+def _open(readonly: bool) -> sqlite3.Connection:
+    connect = instrumentation.connect if instrumentation.enabled else sqlite3.connect
+    conn = connect(storage.DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES, check_same_thread=False, timeout=10)
+    if readonly:
+        conn.execute("PRAGMA query_only=1")
+    else:
+        conn.isolation_level = None  # transactions are managed by the writer
+    return conn
+
+
+class ReaderPool:
+    """Read-only connections shared by a thread pool; each call borrows one."""
+
+    def __init__(self, size: int = READERS):
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="lpt-read")
+        self._idle: queue.SimpleQueue = queue.SimpleQueue()
+        self._all = [_open(readonly=True) for _ in range(size)]
+        for conn in self._all:
+            self._idle.put(conn)
+
+    def _call(self, fn, args):
+        conn = self._idle.get()
+        try:
+            with storage.use_connection(conn):
+                return fn(*args)
+        finally:
+            self._idle.put(conn)
+
+    async def run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, fn, args)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        for conn in self._all:
+            conn.close()
+
+
+class BatchWriter:
+    """Single writer: requests queue up while a batch commits, then the next
+    batch applies them all in one transaction. Each request runs in its own
+    savepoint, so one failing request does not undo the others."""
+
+    def __init__(self, max_batch: int = MAX_BATCH):
+        self._max_batch = max_batch
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lpt-write")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.writes = 0
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, fn, *args):
+        """Run fn(*args) inside the next write transaction; returns its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((fn, args, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(self._executor, self._apply, [(fn, args) for fn, args, _ in batch])
+            except Exception as ex:
+                results = [(False, ex)] * len(batch)
+            for (_, _, future), (ok, value) in zip(batch, results):
+                if future.done():
+                    continue
+                if ok:
+                    future.set_result(value)
+                else:
+                    future.set_exception(value)
+
+    def _apply(self, ops) -> list[tuple[bool, Any]]:
+        if self._conn is None:
+            self._conn = _open(readonly=False)
+        conn = self._conn
+        results = []
+        with storage.use_connection(conn):
+            storage.attach_archives(conn)  # cannot ATTACH once the transaction is open
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for fn, args in ops:
+                    conn.execute("SAVEPOINT request")
+                    try:
+                        results.append((True, fn(*args)))
+                        conn.execute("RELEASE request")
+                    except Exception as ex:
+                        conn.execute("ROLLBACK TO request")
+                        conn.execute("RELEASE request")
+                        results.append((False, ex))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        self.batches += 1
+        self.writes += len(ops)
+        return results
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.submit(self._close_conn).result()
+        self._executor.shutdown(wait=True)
+
+    def _close_conn(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# Write operations (run on the writer thread, inside its transaction)
+def _put_entry(record: dict) -> dict:
+    plan = importer.plan_import([record])
+    if plan["fatal"]:
+        raise HttpError(400, "Invalid entry", plan["fatal"])
+    changed = importer.apply_plan(plan)
+    return {"date": record["date"], "inserted": plan["inserted"], "changed": bool(changed), "messages": plan["messages"]}
+
+
+def _import(records: list) -> dict:
+    plan = importer.plan_import(records)
+    if plan["fatal"]:
+        raise HttpError(400, "Import rejected; nothing was saved", plan["fatal"])
+    changed = importer.apply_plan(plan) if plan["rows"] else 0
+    return {"inserted": plan["inserted"], "updated": plan["updated"], "changed": changed, "messages": plan["messages"]}
+
+
+def _delete_entry(date: dt.date) -> dict:
+    existed = storage.get_entry_by_date(date) is not None
+    if existed:
+        try:
+            storage.delete_entry(date)
+        except ValueError as ex:  # an archived year
+            raise HttpError(409, str(ex))
+    return {"date": date.isoformat(), "deleted": existed}
+
+
+def _entry(row) -> dict:
+    return {k: row[k] for k in storage.ENTRY_COLUMNS}
+
+
+def _read_entries(start, end, limit) -> list[dict]:
+    return [_entry(r) for r in storage.fetch_entries_in_range(start, end, limit)]
+
+
+def _read_entry(date: dt.date) -> Optional[dict]:
+    row = storage.get_entry_by_date(date)
+    return _entry(row) if row else None
+
+
+def _date(value: Optional[str], name: str) -> Optional[dt.date]:
+    if value is None or value == "":
+        return None
+    try:
+        return dt.date.fromisoformat(value)
+    except ValueError:
+        raise HttpError(400, f"{name} must be YYYY-MM-DD")
+
+
+def _int(value: Optional[str], name: str, default: Optional[int]) -> Optional[int]:
+    if value is None or value == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HttpError(400, f"{name} must be an integer")
+
+
+class TrackerServer:
+    """Loopback HTTP/JSON API over the tracker DB. `await start()`, then
+    `await close()`; `port` is the bound port (useful with port=0)."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, readers: int = READERS):
+        if not is_loopback(host):
+            raise ValueError(f"Refusing to listen on {host}: only loopback addresses are supported")
+        self.host = host
+        self.port = port
+        self._readers_size = readers
+        self._readers: Optional[ReaderPool] = None
+        self.writer = BatchWriter()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cache: OrderedDict[str, tuple[str, bytes]] = OrderedDict()
+        self.cache_hits = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._journal_mode: Optional[str] = None
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        storage.init_db()
+        with storage.conn_ctx() as conn:
+            # Readers and the writer (and the app) no longer block each other;
+            # close() puts the previous mode back
+            self._journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            conn.execute("PRAGMA journal_mode=WAL")
+        self._readers = ReaderPool(self._readers_size)
+        self.writer.start()
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.writer.close()
+        if self._readers is not None:
+            self._readers.close()
+        if self._journal_mode and self._journal_mode != "wal":
+            try:
+                with storage.conn_ctx() as conn:
+                    conn.execute("PRAGMA busy_timeout=0")
+                    conn.execute(f"PRAGMA journal_mode={self._journal_mode}")
+            except sqlite3.OperationalError:
+                # Another connection (e.g. the desktop app) still has the DB
+                # open; leaving it in WAL is safe
+                pass
+            self._journal_mode = None
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    # HTTP plumbing --------------------------------------------------------
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                try:
+                    await self._dispatch(writer, method, target, headers, body, keep_alive)
+                except HttpError as ex:
+                    payload = {"error": str(ex)}
+                    if ex.detail is not None:
+                        payload["detail"] = ex.detail
+                    self._respond(writer, ex.status, _json_bytes(payload), keep_alive=keep_alive)
+                except Exception as ex:
+                    self._respond(writer, 500, _json_bytes({"error": f"{type(ex).__name__}: {ex}"}), keep_alive=keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        line = await reader.readline()
+        if not line:
+            return None
+        try:
+            method, target, _version = line.decode("latin-1").split()
+        except ValueError:
+            raise ConnectionError("malformed request line")
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = h.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", "0") or 0)
+        if length > MAX_BODY:
+            raise ConnectionError("request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), target, headers, body
+
+    def _respond(self, writer, status: int, body: bytes = b"", *, content_type="application/json",
+                 etag: Optional[str] = None, keep_alive: bool = True) -> None:
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Length: {len(body)}"]
+        if body or status != 304:
+            head.append(f"Content-Type: {content_type}; charset=utf-8")
+        if etag:
+            head.append(f"ETag: {etag}")
+        head.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+
+    # Routing ---------------------------------------------------------------
+    async def _dispatch(self, writer, method, target, headers, body, keep_alive) -> None:
+        hostname = host_name(headers.get("host", ""))
+        if hostname and not is_loopback(hostname):
+            # A page elsewhere resolving its own name to 127.0.0.1 (DNS rebinding)
+            raise HttpError(403, "Host not allowed")
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip("/") or "/"
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        parts = path.strip("/").split("/")
+
+        if method == "GET":
+            if path == "/export":
+                return await self._export(writer, query, headers, keep_alive)
+            return await self._get(writer, target, path, parts, query, headers, keep_alive)
+        if parts[0] == "entries" and len(parts) == 2:
+            date = _date(parts[1], "date")
+            if method == "PUT":
+                record = _json_body(body)
+                if not isinstance(record, dict):
+                    raise HttpError(400, "Expected a JSON object")
+                record = dict(record, date=date.isoformat())
+                result = await self.writer.submit(_put_entry, record)
+            elif method == "DELETE":
+                result = await self.writer.submit(_delete_entry, date)
+            else:
+                raise HttpError(405, f"{method} not allowed here")
+        elif path == "/import" and method == "POST":
+            records = _json_body(body)
+            if not isinstance(records, list):
+                raise HttpError(400, "Expected a JSON list of entries")
+            result = await self.writer.submit(_import, records)
+        else:
+            raise HttpError(405 if path in ("/import", "/entries", "/stats", "/health") else 404, f"No route for {method} {path}")
+        self._respond(writer, 200, _json_bytes(result), keep_alive=keep_alive)
+
+    async def _get(self, writer, target, path, parts, query, headers, keep_alive) -> None:
+        version = await self._readers.run(storage.get_data_version)
+        etag = f'"v{version}"'
+        if path == "/stats" and not query.get("today"):
+            etag = f'"v{version}-{dt.date.today().isoformat()}"'  # "today" moves on its own
+        if headers.get("if-none-match") == etag:
+            return self._respond(writer, 304, etag=etag, keep_alive=keep_alive)
+        cached = self._cache.get(target)
+        if cached is not None and cached[0] == etag:
+            self._cache.move_to_end(target)
+            self.cache_hits += 1
+            return self._respond(writer, 200, cached[1], etag=etag, keep_alive=keep_alive)
+
+        if path == "/health":
+            result: Any = {"ok": True, "data_version": version}
+        elif path == "/entries":
+            result = await self._readers.run(
+                _read_entries, _date(query.get("start"), "start"), _date(query.get("end"), "end"), _int(query.get("limit"), "limit", None)
+            )
+        elif parts[0] == "entries" and len(parts) == 2:
+            result = await self._readers.run(_read_entry, _date(parts[1], "date"))
+            if result is None:
+                raise HttpError(404, "No entry for that date")
+        elif path == "/stats":
+            result = await self._readers.run(stats_summary, _date(query.get("today"), "today"), _int(query.get("weeks"), "weeks", 12))
+        else:
+            raise HttpError(404, f"No route for GET {path}")
+        body = _json_bytes(result)
+        self._cache[target] = (etag, body)
+        self._cache.move_to_end(target)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        self._respond(writer, 200, body, etag=etag, keep_alive=keep_alive)
+
+    async def _export(self, writer, query, headers, keep_alive) -> None:
+        fmt = query.get("format", "json")
+        if fmt not in EXPORT_FORMATS:
+            raise HttpError(400, f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        loop = asyncio.get_running_loop()
+        # A dedicated connection: the snapshot stays consistent for the whole
+        # stream without holding a pooled reader
+        conn = await loop.run_in_executor(None, _open, True)
+        try:
+            version, cur = await loop.run_in_executor(None, _begin_export, conn)
+            etag = f'"v{version}-{fmt}"'
+            if headers.get("if-none-match") == etag:
+                return self._respond(writer, 304, etag=etag, keep_alive=keep_alive)
+            head = [
+                "HTTP/1.1 200 OK",
+                f"Content-Type: {EXPORT_MEDIA_TYPES[fmt]}; charset=utf-8",
+                "Transfer-Encoding: chunked",
+                f"ETag: {etag}",
+                "Connection: keep-alive" if keep_alive else "Connection: close",
+            ]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1"))
+            _chunk(writer, export_head(fmt))
+            count = 0
+            while True:
+                rows = await loop.run_in_executor(None, cur.fetchmany, EXPORT_CHUNK)
+                if not rows:
+                    break
+                _chunk(writer, export_rows(fmt, rows, count))
+                count += len(rows)
+                await writer.drain()  # back-pressure from slow clients
+            _chunk(writer, export_tail(fmt, count))
+            writer.write(b"0\r\n\r\n")
+        finally:
+            await loop.run_in_executor(None, _end_export, conn)
+
+
+def _begin_export(conn: sqlite3.Connection) -> tuple[int, sqlite3.Cursor]:
+    """Open one read transaction on `conn` and return the data version and a
+    cursor over every entry, both from the same snapshot (so the ETag always
+    matches the rows sent)."""
+    # source_table may ATTACH archives, which cannot happen inside the transaction
+    sql = f"SELECT {', '.join(storage.ENTRY_COLUMNS)} FROM {storage.source_table(conn)} ORDER BY date ASC"
+    conn.execute("BEGIN")
+    with storage.use_connection(conn):
+        version = storage.get_data_version()
+    return version, conn.execute(sql)
+
+
+def _end_export(conn: sqlite3.Connection) -> None:
+    try:
+        if conn.in_transaction:
+            conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+
+def _chunk(writer, text: str) -> None:
+    if text:
+        data = text.encode("utf-8")
+        writer.write(f"{len(data):X}\r\n".encode("latin-1") + data + b"\r\n")
+
+
+def _json_bytes(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _json_body(body: bytes) -> Any:
+    try:
+        return json.loads(body.decode("utf-8") or "null")
+    except (UnicodeDecodeError, ValueError) as ex:
+        raise HttpError(400, f"Invalid JSON body: {ex}")
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, readers: int = READERS, on_ready=None) -> None:
+    """Run the server until interrupted (Ctrl+C)."""
+    async def main():
+        server = TrackerServer(host, port, readers)
+        await server.start()
+        if on_ready:
+            on_ready(server)
+        try:
+            await server._server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+def run_in_thread(host: str = "127.0.0.1", port: int = 0, readers: int = READERS) -> tuple[TrackerServer, threading.Thread]:
+    """Start a server on a background event loop (tests, embedding).
+    Stop it with stop_thread(server, thread)."""
+    started = threading.Event()
+    holder: dict = {}
+
+    def target():
+        loop = asyncio.new_event_loop()
+        server = TrackerServer(host, port, readers)
+        holder["server"] = server
+        try:
+            loop.run_until_complete(server.start())
+        except BaseException as ex:
+            holder["error"] = ex
+            started.set()
+            return
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(server.close())
+        loop.close()
+
+    thread = threading.Thread(target=target, name="lpt-server", daemon=True)
+    thread.start()
+    started.wait()
+    if "error" in holder:
+        raise holder["error"]
+    return holder["server"], thread
+
+
+def stop_thread(server: TrackerServer, thread: threading.Thread) -> None:
+    server._loop.call_soon_threadsafe(server._loop.stop)
+    thread.join()
@@ -1,20 +1,51 @@
+from __future__ import annotations
+
+import json
 import os
+import pathlib
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Iterable, Optional
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional
 import datetime as dt
 
-import pandas as pd
-from services.validation import normalize_tags, validate_entry_fields
+import numpy as np
+from services import instrumentation
+from services.metrics import compute_runs, date_ordinals, week_bounds_for, weekly_totals
+
+# pandas is imported inside the functions that build or consume frames so
+# plain CRUD (and app startup) does not pay for it.
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 DB_PATH = os.path.join("data", "tracker.db")
+# Entry columns in export order (JSON/CSV files use the same names)
+ENTRY_COLUMNS = ("date", "topic", "minutes", "practiced", "challenges", "wins", "confidence", "tags")
+
+
+# Connection lent to this thread by use_connection (server pools)
+_lent = threading.local()
+# Set on this thread by untracked_changes (writes kept out of entry_changes)
+_untracked = threading.local()
 
 
 @contextmanager
 def conn_ctx():
+    lent = getattr(_lent, "conn", None)
+    if lent is not None:
+        # The lender owns the transaction and the connection's lifetime
+        factory = lent.row_factory
+        try:
+            yield lent
+        finally:
+            lent.row_factory = factory
+        return
     os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
+    if instrumentation.enabled:
+        conn = instrumentation.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
+    else:
+        conn = sqlite3.connect(DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
     try:
         yield conn
         conn.commit()
@@ -22,24 +53,68 @@ def conn_ctx():
         conn.close()
 
 
+@contextmanager
+def use_connection(conn: sqlite3.Connection):
+    """Make conn_ctx on this thread yield `conn` (no commit, no close) for
+    the duration, so the storage functions run on a pooled connection or
+    inside a caller-managed transaction."""
+    previous = getattr(_lent, "conn", None)
+    _lent.conn = conn
+    try:
+        yield conn
+    finally:
+        _lent.conn = previous
+
+
+@contextmanager
+def untracked_changes():
+    """Keep entry writes on this thread out of the entry_changes feed for the
+    duration: the journal sync uses it while importing records that are
+    already in the journal, so they are not appended again."""
+    previous = getattr(_untracked, "on", False)
+    _untracked.on = True
+    try:
+        yield
+    finally:
+        _untracked.on = previous
+
+
+def _create_sessions_schema(conn: sqlite3.Connection) -> None:
+    """The sessions table and its indexes (hot DB and year archives alike)."""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY,
+            date TEXT NOT NULL,
+            topic TEXT,
+            minutes INTEGER DEFAULT 0,
+            practiced TEXT,
+            challenges TEXT,
+            wins TEXT,
+            confidence INTEGER DEFAULT 3,
+            tags TEXT
+        )
+        """
+    )
+    # Covering index for date-range aggregations (see services.metrics.aggregate_db);
+    # it also serves every lookup and ordering by date, so the older date-only
+    # index is dropped rather than maintained on each write
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date_minutes ON sessions(date, minutes, confidence)")
+    conn.execute("DROP INDEX IF EXISTS idx_sessions_date")
+    # One index per History sort mode so each page is an index range scan
+    for name, expr in SORTED_PAGE_KEYS.items():
+        if name != "date":
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_sessions_{name}_date ON sessions({expr}, date)")
+
+
+@instrumentation.operation
 def init_db() -> None:
     with conn_ctx() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sessions (
-                id INTEGER PRIMARY KEY,
-                date TEXT NOT NULL,
-                topic TEXT,
-                minutes INTEGER DEFAULT 0,
-                practiced TEXT,
-                challenges TEXT,
-                wins TEXT,
-                confidence INTEGER DEFAULT 3,
-                tags TEXT
-            )
-            """
-        )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions(date)")
+        if conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchone() is None:
+            # A new file: auto_vacuum has to be chosen before the first table.
+            # Existing DBs are switched over by the "vacuum" maintenance task.
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        _create_sessions_schema(conn)
         # Settings table for simple key/value configuration (e.g., weekly goal minutes)
         conn.execute(
             """
@@ -54,14 +129,286 @@ def init_db() -> None:
         cols = [r[1] for r in cur.fetchall()]
         if "tags" not in cols:
             conn.execute("ALTER TABLE sessions ADD COLUMN tags TEXT")
-    # After ensuring DB exists, create a daily backup if not already present
+        # Derived state: runs of consecutive study days and per-week totals,
+        # maintained incrementally by upsert_entry/delete_entry.
+        cur = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='streak_runs'")
+        needs_rebuild = cur.fetchone() is None
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS streak_runs (
+                start TEXT PRIMARY KEY,
+                end TEXT NOT NULL,
+                length INTEGER NOT NULL
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_streak_runs_end ON streak_runs(end)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_streak_runs_length ON streak_runs(length)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS weekly_totals (
+                week_start TEXT PRIMARY KEY,
+                minutes INTEGER NOT NULL DEFAULT 0,
+                sessions INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        if needs_rebuild:
+            rebuild_derived_state(conn)
+        # Change feed for the journal sync (services.filesync.save_journal):
+        # the latest change number per written/deleted date. Kept with the
+        # JSON format too (one indexed upsert per write, at most one row per
+        # date), so switching to the journal later still has every change
+        conn.execute("CREATE TABLE IF NOT EXISTS entry_changes (date TEXT PRIMARY KEY, seq INTEGER NOT NULL)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_entry_changes_seq ON entry_changes(seq)")
+
+
+# Year partitions. Closed years can be moved out of the hot DB into one
+# archive DB per year (archive_years); entries dated before the cutoff then
+# live only there and are read-only. Reads build their FROM clause with
+# source_table(), which ATTACHes just the partitions the date range needs
+# (read-only) and unions them; with nothing archived it is plain `sessions`.
+# The streak/weekly tables stay in the hot DB and cover all years.
+ARCHIVE_DIR = "archive"
+# Settings key holding {"before": "YYYY-01-01", "years": [...]}
+ARCHIVE_KEY = "archive"
+# TEMP view over every partition, (re)defined per connection by source_table
+ARCHIVE_VIEW = "all_sessions"
+
+
+def archive_path(year: int, db_path: Optional[str] = None) -> str:
+    """archive/<db name>-<year>.db next to the hot DB (default DB_PATH)."""
+    db_path = db_path or DB_PATH
+    stem = os.path.splitext(os.path.basename(db_path))[0]
+    return os.path.join(os.path.dirname(db_path), ARCHIVE_DIR, f"{stem}-{year}.db")
+
+
+def _ro_uri(path: str) -> str:
+    return pathlib.Path(path).resolve().as_uri() + "?mode=ro"
+
+
+def _has_archive_dir() -> bool:
+    return os.path.isdir(os.path.join(os.path.dirname(DB_PATH), ARCHIVE_DIR))
+
+
+def _archive_state(conn: sqlite3.Connection) -> tuple[Optional[dt.date], list[int]]:
+    """(cutoff, archived years); (None, []) when nothing is archived."""
+    # No archive folder is the common case: skip the settings lookup
+    if not _has_archive_dir():
+        return None, []
     try:
-        backup_db_daily()
-    except Exception:
-        # Backups are best-effort; avoid blocking app
-        pass
+        row = conn.execute("SELECT value FROM settings WHERE key=?", (ARCHIVE_KEY,)).fetchone()
+    except sqlite3.OperationalError:
+        return None, []
+    if not row:
+        return None, []
+    state = json.loads(row[0])
+    return dt.date.fromisoformat(state["before"]), [int(y) for y in state["years"]]
+
+
+def _attach(conn: sqlite3.Connection, year: int) -> str:
+    """ATTACH the archive for `year` read-only (once per connection); returns
+    its schema name. Must run outside a transaction (see attach_archives)."""
+    schema = f"archive_{year}"
+    if schema not in {r[1] for r in conn.execute("PRAGMA database_list")}:
+        path = archive_path(year)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(f"Archive for {year} is missing: {path}")
+        conn.execute(f"ATTACH DATABASE ? AS {schema}", (_ro_uri(path),))
+    return schema
+
 
+def _detach_stale(conn: sqlite3.Connection, years: Iterable[int]) -> None:
+    """DETACH the archives a long-lived connection (one lent through
+    use_connection, e.g. the server's pool) still has attached although
+    another connection has unarchived them since. Fresh conn_ctx
+    connections never hold any, so they skip the check."""
+    if getattr(_lent, "conn", None) is not conn or conn.in_transaction:
+        return
+    keep = {f"archive_{y}" for y in years}
+    for name in [r[1] for r in conn.execute("PRAGMA database_list") if r[1].startswith("archive_") and r[1] not in keep]:
+        conn.execute(f"DETACH DATABASE {name}")
+
+
+def attach_archives(conn: sqlite3.Connection) -> None:
+    """ATTACH every archive now, for callers about to open a transaction in
+    which source_table() may be used (SQLite cannot ATTACH inside one)."""
+    _, years = _archive_state(conn)
+    _detach_stale(conn, years)
+    for year in years:
+        _attach(conn, year)
+
+
+def _partitions(conn: sqlite3.Connection, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> list[str]:
+    """The sessions tables that may hold entries in [start, end], oldest
+    first, attaching archives as needed; ["sessions"] when none are."""
+    cutoff, years = _archive_state(conn)
+    _detach_stale(conn, years)
+    if cutoff is None or (start is not None and start >= cutoff):
+        return ["sessions"]
+    schemas = [
+        _attach(conn, y) for y in years
+        if (start is None or y >= start.year) and (end is None or y <= end.year)
+    ]
+    if end is None or end >= cutoff or not schemas:
+        schemas.append("main")
+    return [f"{s}.sessions" for s in schemas]
+
+
+def source_table(conn: sqlite3.Connection, start: Optional[dt.date] = None, end: Optional[dt.date] = None) -> str:
+    """FROM-clause source with the ENTRY_COLUMNS of every entry that may fall
+    in [start, end] (bounds optional): `sessions` when nothing is archived or
+    the range is all hot, one archive, or a UNION ALL of the partitions the
+    range touches. SQLite pushes WHERE clauses into each partition and
+    merges date-ordered scans, so the date indexes still apply."""
+    tables = _partitions(conn, start, end)
+    if len(tables) == 1:
+        return tables[0]
+    cols = ", ".join(ENTRY_COLUMNS)
+    union = " UNION ALL ".join(f"SELECT {cols} FROM {t}" for t in tables)
+    if start is None and end is None:
+        view = conn.execute("SELECT sql FROM sqlite_temp_master WHERE name=?", (ARCHIVE_VIEW,)).fetchone()
+        if view and view[0].endswith(union):
+            return ARCHIVE_VIEW
+        try:
+            conn.execute(f"DROP VIEW IF EXISTS temp.{ARCHIVE_VIEW}")
+            conn.execute(f"CREATE TEMP VIEW {ARCHIVE_VIEW} AS {union}")
+            return ARCHIVE_VIEW
+        except sqlite3.OperationalError:
+            pass  # query_only connections (server readers) cannot create it
+    return f"({union})"
 
+
+@instrumentation.operation
+def archive_cutoff() -> Optional[dt.date]:
+    """Entries dated before this day are archived (read-only); None if none are."""
+    if not _has_archive_dir():
+        return None
+    with conn_ctx() as conn:
+        return _archive_state(conn)[0]
+
+
+@instrumentation.operation
+def get_archive_state() -> dict:
+    """Keys: before (cutoff date or None), years (archived years with their
+    archive paths, entry counts and file sizes)."""
+    with conn_ctx() as conn:
+        cutoff, years = _archive_state(conn)
+        info = []
+        for year in years:
+            path = archive_path(year)
+            entries = None
+            if os.path.isfile(path):
+                entries = conn.execute(f"SELECT COUNT(*) FROM {_attach(conn, year)}.sessions").fetchone()[0]
+            info.append({"year": year, "path": path, "entries": entries, "bytes": os.path.getsize(path) if entries is not None else None})
+    return {"before": cutoff, "years": info}
+
+
+def _write_archive(year: int) -> int:
+    """Copy the hot DB's entries for `year` into a fresh archive file (built
+    under a temp name, then renamed). Returns the rows copied."""
+    path = archive_path(year)
+    tmp = path + ".tmp"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    cols = ", ".join(ENTRY_COLUMNS)
+    dst = sqlite3.connect(tmp)
+    try:
+        _create_sessions_schema(dst)
+        dst.execute("ATTACH DATABASE ? AS hot", (_ro_uri(DB_PATH),))
+        n = dst.execute(
+            f"INSERT INTO main.sessions({cols}) SELECT {cols} FROM hot.sessions WHERE date >= ? AND date < ? ORDER BY date",
+            (f"{year}-01-01", f"{year + 1}-01-01"),
+        ).rowcount
+        dst.commit()
+        dst.execute("DETACH DATABASE hot")
+    finally:
+        dst.close()
+    os.replace(tmp, path)
+    return n
+
+
+def _set_archive_state(conn: sqlite3.Connection, cutoff: Optional[dt.date], years: Iterable[int]) -> None:
+    years = sorted(set(years))
+    if cutoff is None or not years:
+        conn.execute("DELETE FROM settings WHERE key=?", (ARCHIVE_KEY,))
+    else:
+        conn.execute(
+            "INSERT INTO settings(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+            (ARCHIVE_KEY, json.dumps({"before": cutoff.isoformat(), "years": years})),
+        )
+
+
+@instrumentation.operation
+def archive_years(through: int) -> list[int]:
+    """Move every entry dated up to the end of `through` (a closed year) out
+    of the hot DB into one archive DB per year, then VACUUM the hot DB.
+    Archived entries stay visible to all reads but can no longer be
+    changed (see unarchive_years). Returns the years newly archived."""
+    if through >= dt.date.today().year:
+        raise ValueError(f"Only closed years can be archived (up to {dt.date.today().year - 1})")
+    init_db()
+    cutoff = dt.date(through + 1, 1, 1)
+    with conn_ctx() as conn:
+        old_cutoff, archived = _archive_state(conn)
+        if old_cutoff is not None and cutoff <= old_cutoff:
+            return []
+        years = [
+            int(r[0]) for r in conn.execute(
+                "SELECT DISTINCT substr(date, 1, 4) FROM sessions WHERE date < ? ORDER BY 1", (cutoff.isoformat(),)
+            )
+        ]
+    if not years:
+        return []
+    for year in years:
+        _write_archive(year)
+    cols = ", ".join(ENTRY_COLUMNS)
+    with conn_ctx() as conn:
+        schemas = {year: _attach(conn, year) for year in years}
+        # Under the write lock, make sure each archive still matches the hot
+        # rows (an entry saved meanwhile must not be lost), then drop them
+        conn.execute("BEGIN IMMEDIATE")
+        for year, schema in schemas.items():
+            bounds = (f"{year}-01-01", f"{year + 1}-01-01")
+            hot = f"SELECT {cols} FROM main.sessions WHERE date >= ? AND date < ?"
+            (count,) = conn.execute("SELECT COUNT(*) FROM main.sessions WHERE date >= ? AND date < ?", bounds).fetchone()
+            (stored,) = conn.execute(f"SELECT COUNT(*) FROM {schema}.sessions").fetchone()
+            (differ,) = conn.execute(f"SELECT COUNT(*) FROM ({hot} EXCEPT SELECT {cols} FROM {schema}.sessions)", bounds).fetchone()
+            if count != stored or differ:
+                raise RuntimeError(f"Entries for {year} changed while archiving; nothing was moved, try again")
+        conn.execute("DELETE FROM sessions WHERE date < ?", (cutoff.isoformat(),))
+        _set_archive_state(conn, cutoff, [*archived, *years])
+        bump_data_version(conn)
+    with conn_ctx() as conn:
+        conn.execute("VACUUM")  # hand the freed pages back so the file (and its backups) shrink
+    return years
+
+
+@instrumentation.operation
+def unarchive_years(since: int) -> list[int]:
+    """Move archived years from `since` on back into the hot DB (making
+    them editable again) and delete their archive files. Returns them.
+    Stop the server first: its pooled connections only let go of the files
+    on their next request, and Windows refuses to delete open files."""
+    with conn_ctx() as conn:
+        cutoff, years = _archive_state(conn)
+        if cutoff is None or since >= cutoff.year:
+            return []
+        back = [y for y in years if y >= since]
+        schemas = [_attach(conn, y) for y in back]
+        conn.execute("BEGIN IMMEDIATE")
+        cols = ", ".join(ENTRY_COLUMNS)
+        for schema in schemas:
+            conn.execute(f"INSERT INTO main.sessions({cols}) SELECT {cols} FROM {schema}.sessions ORDER BY date")
+        _set_archive_state(conn, dt.date(since, 1, 1), [y for y in years if y < since])
+        bump_data_version(conn)
+    for year in back:
+        os.remove(archive_path(year))
+    return back
+
+
+@instrumentation.operation
 def upsert_entry(
     *,
     date: dt.date,
@@ -73,54 +420,446 @@ def upsert_entry(
     confidence: int,
     tags: Optional[str] = "",
 ) -> None:
+    with conn_ctx() as conn:
+        check_writable(conn, [date])
+        if write_entry(conn, date, topic, minutes, practiced, challenges, wins, confidence, tags):
+            bump_data_version(conn)
+
+
+def check_writable(conn: sqlite3.Connection, dates: Iterable[dt.date]) -> None:
+    """ValueError if any of `dates` is in an archived (read-only) year."""
+    cutoff, _ = _archive_state(conn)
+    if cutoff is not None:
+        early = min(dates, default=cutoff)
+        if early < cutoff:
+            raise ValueError(f"{early.year} is archived: entries before {cutoff.isoformat()} are read-only (unarchive the year to change them)")
+
+
+@instrumentation.operation
+def write_entry(
+    conn: sqlite3.Connection,
+    date: dt.date,
+    topic: str,
+    minutes: int,
+    practiced: str,
+    challenges: str,
+    wins: str,
+    confidence: int,
+    tags: Optional[str] = "",
+    *,
+    derived: bool = True,
+) -> bool:
+    """Insert or update one entry on an open connection (the caller owns the
+    transaction, the data-version bump and check_writable). Returns False if
+    an identical row was already stored. With derived=False, streak/weekly state is left for
+    the caller to rebuild (bulk imports).
+    """
     d = date.isoformat()
+    cur = conn.execute(
+        "SELECT id, minutes, topic, practiced, challenges, wins, confidence, tags FROM sessions WHERE date = ?", (d,)
+    )
+    row = cur.fetchone()
+    if row and tuple(row[1:]) == (minutes, topic, practiced, challenges, wins, confidence, tags):
+        # Unchanged (e.g. the launch-time JSON sync): keep the data version
+        return False
+    if row:
+        if derived:
+            _add_week_minutes(conn, date, int(minutes or 0) - int(row[1] or 0), 0)
+        conn.execute(
+            """
+            UPDATE sessions
+            SET topic=?, minutes=?, practiced=?, challenges=?, wins=?, confidence=?, tags=?
+            WHERE date=?
+            """,
+            (topic, minutes, practiced, challenges, wins, confidence, tags, d),
+        )
+    else:
+        conn.execute(
+            """
+            INSERT INTO sessions (date, topic, minutes, practiced, challenges, wins, confidence, tags)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (d, topic, minutes, practiced, challenges, wins, confidence, tags),
+        )
+        if derived:
+            _add_week_minutes(conn, date, int(minutes or 0), 1)
+            _add_run_day(conn, date)
+    _record_change(conn, d)
+    return True
+
+
+def _record_change(conn: sqlite3.Connection, date: str) -> None:
+    if getattr(_untracked, "on", False):
+        return
+    conn.execute(
+        "INSERT INTO entry_changes(date, seq) SELECT ?, COALESCE(MAX(seq), 0) + 1 FROM entry_changes WHERE true "
+        "ON CONFLICT(date) DO UPDATE SET seq=excluded.seq",
+        (date,),
+    )
+
+
+@instrumentation.operation
+def fetch_changes_since(seq: int) -> list[tuple[dt.date, int]]:
+    """(date, change number) of entries written or deleted after change
+    `seq`, oldest first; an index range scan, so O(changes)."""
     with conn_ctx() as conn:
-        cur = conn.execute("SELECT id FROM sessions WHERE date = ?", (d,))
-        row = cur.fetchone()
-        if row:
-            conn.execute(
-                """
-                UPDATE sessions
-                SET topic=?, minutes=?, practiced=?, challenges=?, wins=?, confidence=?, tags=?
-                WHERE date=?
-                """,
-                (topic, minutes, practiced, challenges, wins, confidence, tags, d),
-            )
-        else:
-            conn.execute(
-                """
-                INSERT INTO sessions (date, topic, minutes, practiced, challenges, wins, confidence, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                (d, topic, minutes, practiced, challenges, wins, confidence, tags),
-            )
+        cur = conn.execute("SELECT date, seq FROM entry_changes WHERE seq > ? ORDER BY seq", (int(seq),))
+        return [(dt.date.fromisoformat(d), n) for d, n in cur.fetchall()]
+
+
+@instrumentation.operation
+def last_change() -> int:
+    with conn_ctx() as conn:
+        return int(conn.execute("SELECT COALESCE(MAX(seq), 0) FROM entry_changes").fetchone()[0])
 
 
+@instrumentation.operation
+def prune_changes(through: int) -> None:
+    """Forget changes up to `through` once a journal holds them. The newest
+    one is kept so change numbers keep growing."""
+    with conn_ctx() as conn:
+        conn.execute(
+            "DELETE FROM entry_changes WHERE seq <= ? AND seq < (SELECT MAX(seq) FROM entry_changes)", (int(through),)
+        )
+
+
+@instrumentation.operation
 def fetch_all_entries() -> Iterable[sqlite3.Row]:
     with conn_ctx() as conn:
         conn.row_factory = sqlite3.Row
+        cur = conn.execute(f"SELECT {', '.join(ENTRY_COLUMNS)} FROM {source_table(conn)} ORDER BY date ASC")
+        return cur.fetchall()
+
+
+def iter_entries(chunk: int = 1000) -> Iterator[tuple]:
+    """Stream all entries in date order as tuples of ENTRY_COLUMNS, reading
+    `chunk` rows at a time (the connection stays open while iterating)."""
+    with conn_ctx() as conn:
+        cur = conn.execute(f"SELECT {', '.join(ENTRY_COLUMNS)} FROM {source_table(conn)} ORDER BY date ASC")
+        while True:
+            rows = cur.fetchmany(chunk)
+            if not rows:
+                return
+            yield from rows
+
+
+@instrumentation.operation
+def fetch_entry_summaries() -> Iterable[sqlite3.Row]:
+    """All entries without the long note columns (practiced/challenges/wins)."""
+    with conn_ctx() as conn:
+        conn.row_factory = sqlite3.Row
+        cur = conn.execute(f"SELECT date, topic, minutes, confidence, tags FROM {source_table(conn)} ORDER BY date ASC")
+        return cur.fetchall()
+
+
+@instrumentation.operation
+def fetch_entries_in_range(
+    start: Optional[dt.date] = None, end: Optional[dt.date] = None, limit: Optional[int] = None
+) -> list[sqlite3.Row]:
+    """Full rows with start <= date <= end (either bound optional), oldest
+    first, via the date index."""
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("date >= ?")
+        params.append(start.isoformat())
+    if end is not None:
+        clauses.append("date <= ?")
+        params.append(end.isoformat())
+    sql = f"SELECT {', '.join(ENTRY_COLUMNS)} FROM {{source}}"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY date ASC"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+    with conn_ctx() as conn:
+        conn.row_factory = sqlite3.Row
+        return conn.execute(sql.format(source=source_table(conn, start, end)), params).fetchall()
+
+
+@instrumentation.operation
+def fetch_entries_for_dates(dates: Iterable[dt.date], chunk: int = 500) -> list[sqlite3.Row]:
+    """Full rows for the given dates (indexed lookups), in no particular order."""
+    keys = sorted({d.isoformat() for d in dates})
+    rows: list[sqlite3.Row] = []
+    with conn_ctx() as conn:
+        conn.row_factory = sqlite3.Row
+        for i in range(0, len(keys), chunk):
+            part = keys[i:i + chunk]
+            source = source_table(conn, dt.date.fromisoformat(part[0]), dt.date.fromisoformat(part[-1]))
+            cur = conn.execute(
+                f"SELECT {', '.join(ENTRY_COLUMNS)} FROM {source} WHERE date IN ({','.join('?' * len(part))})",
+                part,
+            )
+            rows.extend(cur.fetchall())
+    return rows
+
+
+@instrumentation.operation
+def fetch_existing_dates(dates: Iterable[dt.date], chunk: int = 500) -> set[dt.date]:
+    """Which of `dates` already have an entry (indexed lookups)."""
+    keys = sorted({d.isoformat() for d in dates})
+    found: set[dt.date] = set()
+    with conn_ctx() as conn:
+        for i in range(0, len(keys), chunk):
+            part = keys[i:i + chunk]
+            source = source_table(conn, dt.date.fromisoformat(part[0]), dt.date.fromisoformat(part[-1]))
+            cur = conn.execute(f"SELECT date FROM {source} WHERE date IN ({','.join('?' * len(part))})", part)
+            found.update(dt.date.fromisoformat(r[0]) for r in cur)
+    return found
+
+
+@instrumentation.operation
+def fetch_dates_ordered_by(column: str) -> list[dt.date]:
+    """Entry dates sorted ascending by a text column (ties by date)."""
+    if column not in ("topic", "practiced", "challenges", "wins", "tags"):
+        raise ValueError(f"Unsupported sort column: {column}")
+    with conn_ctx() as conn:
+        cur = conn.execute(f"SELECT date FROM {source_table(conn)} ORDER BY {column}, date")
+        return [dt.date.fromisoformat(str(r[0])[:10]) for r in cur.fetchall()]
+
+
+@instrumentation.operation
+def fetch_day_summaries(start: dt.date, end: dt.date) -> list[tuple[dt.date, str, int]]:
+    """(date, topic, confidence) for entries in [start, end] (index range scan)."""
+    with conn_ctx() as conn:
         cur = conn.execute(
-            "SELECT date, topic, minutes, practiced, challenges, wins, confidence, tags FROM sessions ORDER BY date ASC"
+            f"SELECT date, topic, confidence FROM {source_table(conn, start, end)} WHERE date BETWEEN ? AND ?",
+            (start.isoformat(), end.isoformat()),
         )
-        return cur.fetchall()
+        return [
+            (dt.date.fromisoformat(str(d)[:10]), str(topic or ""), int(conf or 0))
+            for d, topic, conf in cur.fetchall()
+        ]
+
+
+# Sort mode -> SQL key for fetch_sorted_page (each backed by an index)
+SORTED_PAGE_KEYS = {
+    "date": "date",
+    "minutes": "minutes",
+    "confidence": "confidence",
+    "progress": "(minutes * confidence)",
+}
 
 
+@instrumentation.operation
+def fetch_sorted_page(
+    mode: str = "date", after: Optional[tuple] = None, limit: int = 200
+) -> list[sqlite3.Row]:
+    """One page of (date, topic, key) ordered by `mode` descending, newest
+    first on ties. `after` is the (key, date) of the last row already shown
+    (keyset pagination, so pages stay correct while rows are written).
+    """
+    key = SORTED_PAGE_KEYS[mode]
+    where, params = "", []
+    if after is not None:
+        k, d = after
+        if mode == "date":
+            where, params = "WHERE date < ?", [d.isoformat()]
+        else:
+            # Spelled as a range on the key so SQLite seeks the index
+            where, params = f"WHERE {key} <= ? AND ({key} < ? OR date < ?)", [k, k, d.isoformat()]
+    order = "date DESC" if mode == "date" else f"{key} DESC, date DESC"
+    with conn_ctx() as conn:
+        conn.row_factory = sqlite3.Row
+        tables = _partitions(conn)
+        pages = [f"SELECT date, topic, {key} AS key FROM {t} {where} ORDER BY {order} LIMIT ?" for t in tables]
+        if len(pages) == 1:
+            return conn.execute(pages[0], (*params, limit)).fetchall()
+        # One index-ordered page per partition, then the best `limit` of those
+        inner = " UNION ALL ".join(f"SELECT * FROM ({page})" for page in pages)
+        outer = "date DESC" if mode == "date" else "key DESC, date DESC"
+        return conn.execute(
+            f"SELECT date, topic, key FROM ({inner}) ORDER BY {outer} LIMIT ?", (*params, limit) * len(pages) + (limit,)
+        ).fetchall()
+
+
+@instrumentation.operation
 def get_entry_by_date(date: dt.date) -> Optional[sqlite3.Row]:
     with conn_ctx() as conn:
         conn.row_factory = sqlite3.Row
         cur = conn.execute(
-            "SELECT date, topic, minutes, practiced, challenges, wins, confidence, tags FROM sessions WHERE date=?",
+            f"SELECT {', '.join(ENTRY_COLUMNS)} FROM {source_table(conn, date, date)} WHERE date=?",
             (date.isoformat(),),
         )
         return cur.fetchone()
 
 
+@instrumentation.operation
 def delete_entry(date: dt.date) -> None:
     with conn_ctx() as conn:
+        check_writable(conn, [date])
+        cur = conn.execute("SELECT minutes FROM sessions WHERE date=?", (date.isoformat(),))
+        row = cur.fetchone()
+        if not row:
+            return
         conn.execute("DELETE FROM sessions WHERE date=?", (date.isoformat(),))
+        _record_change(conn, date.isoformat())
+        bump_data_version(conn)
+        _add_week_minutes(conn, date, -int(row[0] or 0), -1)
+        _remove_run_day(conn, date)
+
+
+# Incremental streak/weekly-goal state. Each helper touches O(1) rows through
+# the primary key or an index, so a write costs O(log n).
+def _add_week_minutes(conn: sqlite3.Connection, date: dt.date, minutes: int, sessions: int) -> None:
+    week = week_bounds_for(date)[0].isoformat()
+    conn.execute(
+        """
+        INSERT INTO weekly_totals(week_start, minutes, sessions) VALUES(?, ?, ?)
+        ON CONFLICT(week_start) DO UPDATE SET minutes=minutes+excluded.minutes, sessions=sessions+excluded.sessions
+        """,
+        (week, minutes, sessions),
+    )
+    conn.execute("DELETE FROM weekly_totals WHERE week_start=? AND sessions<=0", (week,))
+
+
+def _insert_run(conn: sqlite3.Connection, start: dt.date, end: dt.date) -> None:
+    conn.execute(
+        "INSERT INTO streak_runs(start, end, length) VALUES(?, ?, ?)",
+        (start.isoformat(), end.isoformat(), (end - start).days + 1),
+    )
+
+
+def _add_run_day(conn: sqlite3.Connection, date: dt.date) -> None:
+    one = dt.timedelta(days=1)
+    start = end = date
+    left = conn.execute("SELECT start FROM streak_runs WHERE end=?", ((date - one).isoformat(),)).fetchone()
+    if left:
+        start = dt.date.fromisoformat(left[0])
+        conn.execute("DELETE FROM streak_runs WHERE start=?", (left[0],))
+    right = conn.execute("SELECT end FROM streak_runs WHERE start=?", ((date + one).isoformat(),)).fetchone()
+    if right:
+        end = dt.date.fromisoformat(right[0])
+        conn.execute("DELETE FROM streak_runs WHERE start=?", ((date + one).isoformat(),))
+    _insert_run(conn, start, end)
+
+
+def _remove_run_day(conn: sqlite3.Connection, date: dt.date) -> None:
+    one = dt.timedelta(days=1)
+    row = conn.execute(
+        "SELECT start, end FROM streak_runs WHERE start<=? ORDER BY start DESC LIMIT 1",
+        (date.isoformat(),),
+    ).fetchone()
+    if not row or row[1] < date.isoformat():
+        return
+    start, end = dt.date.fromisoformat(row[0]), dt.date.fromisoformat(row[1])
+    conn.execute("DELETE FROM streak_runs WHERE start=?", (row[0],))
+    if start < date:
+        _insert_run(conn, start, date - one)
+    if end > date:
+        _insert_run(conn, date + one, end)
+
+
+def _compute_derived_state(conn: sqlite3.Connection) -> tuple[list[tuple], list[tuple]]:
+    """Full NumPy recompute of (streak_runs rows, weekly_totals rows) from
+    the entries of all years."""
+    rows = conn.execute(f"SELECT date, minutes FROM {source_table(conn)}").fetchall()
+    if not rows:
+        return [], []
+    days = date_ordinals([r[0] for r in rows])
+    minutes = np.array([int(r[1] or 0) for r in rows], dtype=np.int64)
+    starts, ends = compute_runs(days)
+    weeks, week_mins, week_counts = weekly_totals(days, minutes)
+
+    def iso(values):
+        return [str(v) for v in values.astype("datetime64[D]")]
+
+    runs = list(zip(iso(starts), iso(ends), (ends - starts + 1).tolist()))
+    totals = list(zip(iso(weeks), week_mins.tolist(), week_counts.tolist()))
+    return runs, totals
+
+
+@instrumentation.operation
+def rebuild_derived_state(conn: Optional[sqlite3.Connection] = None) -> None:
+    """Recompute streak runs and weekly totals from the sessions table."""
+    if conn is None:
+        with conn_ctx() as c:
+            return rebuild_derived_state(c)
+    runs, totals = _compute_derived_state(conn)
+    conn.execute("DELETE FROM streak_runs")
+    conn.execute("DELETE FROM weekly_totals")
+    conn.executemany("INSERT INTO streak_runs(start, end, length) VALUES(?, ?, ?)", runs)
+    conn.executemany("INSERT INTO weekly_totals(week_start, minutes, sessions) VALUES(?, ?, ?)", totals)
+
+
+@instrumentation.operation
+def verify_derived_state() -> bool:
+    """True if the stored streak/weekly state matches a full recompute."""
+    with conn_ctx() as conn:
+        runs, totals = _compute_derived_state(conn)
+        stored_runs = conn.execute("SELECT start, end, length FROM streak_runs ORDER BY start").fetchall()
+        stored_totals = conn.execute("SELECT week_start, minutes, sessions FROM weekly_totals ORDER BY week_start").fetchall()
+    return stored_runs == sorted(runs) and stored_totals == sorted(totals)
+
+
+@instrumentation.operation
+def get_week_minutes(week_of: Optional[dt.date] = None) -> int:
+    week = week_bounds_for(week_of or dt.date.today())[0].isoformat()
+    with conn_ctx() as conn:
+        row = conn.execute("SELECT minutes FROM weekly_totals WHERE week_start=?", (week,)).fetchone()
+    return int(row[0]) if row else 0
+
+
+@instrumentation.operation
+def get_entry_totals() -> dict:
+    """Keys: entries, minutes, first_date, last_date (dates None if empty)."""
+    with conn_ctx() as conn:
+        count, minutes, first, last = conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(minutes), 0), MIN(date), MAX(date) FROM {source_table(conn)}"
+        ).fetchone()
+    return {
+        "entries": int(count),
+        "minutes": int(minutes),
+        "first_date": dt.date.fromisoformat(str(first)[:10]) if first else None,
+        "last_date": dt.date.fromisoformat(str(last)[:10]) if last else None,
+    }
+
+
+@instrumentation.operation
+def fetch_week_totals(first_week: dt.date, last_week: dt.date) -> list[tuple[dt.date, int, int]]:
+    """(week_start, minutes, sessions) for stored weeks in [first_week,
+    last_week] (Mondays), from the weekly_totals table."""
+    with conn_ctx() as conn:
+        rows = conn.execute(
+            "SELECT week_start, minutes, sessions FROM weekly_totals WHERE week_start BETWEEN ? AND ? ORDER BY week_start",
+            (first_week.isoformat(), last_week.isoformat()),
+        ).fetchall()
+    return [(dt.date.fromisoformat(w), int(m), int(n)) for w, m, n in rows]
+
+
+@instrumentation.operation
+def get_streak_state(today: Optional[dt.date] = None) -> dict:
+    """Streak and weekly-goal state from the stored runs (no history scan).
+    Keys: current_streak, longest_streak, current_run, longest_run (as
+    (start, end) date tuples or None), week_start, week_minutes.
+    """
+    today = today or dt.date.today()
+    week = week_bounds_for(today)[0]
+    with conn_ctx() as conn:
+        cur_row = conn.execute("SELECT start, end, length FROM streak_runs WHERE end=?", (today.isoformat(),)).fetchone()
+        long_row = conn.execute(
+            "SELECT start, end, length FROM streak_runs ORDER BY length DESC, start DESC LIMIT 1"
+        ).fetchone()
+        week_row = conn.execute("SELECT minutes FROM weekly_totals WHERE week_start=?", (week.isoformat(),)).fetchone()
+
+    def bounds(row):
+        return (dt.date.fromisoformat(row[0]), dt.date.fromisoformat(row[1])) if row else None
 
+    return {
+        "current_streak": int(cur_row[2]) if cur_row else 0,
+        "longest_streak": int(long_row[2]) if long_row else 0,
+        "current_run": bounds(cur_row),
+        "longest_run": bounds(long_row),
+        "week_start": week,
+        "week_minutes": int(week_row[0]) if week_row else 0,
+    }
 
+
+@instrumentation.operation
 def get_all_entries_df() -> pd.DataFrame:
+    import pandas as pd
+
     rows = fetch_all_entries()
     if not rows:
         return pd.DataFrame(columns=[
@@ -143,6 +882,7 @@ def export_csv_bytes(df: pd.DataFrame) -> bytes:
 
 def export_excel_bytes(df: pd.DataFrame) -> bytes:
     import io
+    import pandas as pd
     bio = io.BytesIO()
     with pd.ExcelWriter(bio, engine="openpyxl") as writer:
         df.to_excel(writer, index=False, sheet_name="Progress")
@@ -150,28 +890,254 @@ def export_excel_bytes(df: pd.DataFrame) -> bytes:
     return bio.read()
 
 
-def backup_db_daily() -> None:
+@instrumentation.operation
+def backup_db_daily() -> bool:
     """Create a once-per-day backup copy of the SQLite DB.
-    Stored under data/backups/tracker-YYYYMMDD.db
+    Stored under data/backups/tracker-YYYYMMDD.db. Uses SQLite's online
+    backup, so it is consistent even while another connection writes; the
+    app runs it on a worker after launch. Returns True if a copy was made.
     """
     if not os.path.exists(DB_PATH):
-        return
-    backups_dir = os.path.join("data", "backups")
+        return False
+    backups_dir = os.path.join(os.path.dirname(DB_PATH), "backups")
     os.makedirs(backups_dir, exist_ok=True)
     today_tag = dt.date.today().strftime("%Y%m%d")
     backup_path = os.path.join(backups_dir, f"tracker-{today_tag}.db")
-    if not os.path.exists(backup_path):
-        # Copy the DB file bytes
-        with open(DB_PATH, "rb") as src, open(backup_path, "wb") as dst:
-            dst.write(src.read())
+    if os.path.exists(backup_path):
+        return False
+    backup_db(backup_path)
+    return True
+
+
+@instrumentation.operation
+def backup_db(path: str) -> str:
+    """Consistent copy of the DB at `path` (SQLite online backup into a temp
+    file, then an atomic rename). Returns `path`. Year archives are not
+    included: they do not change once written (see archive_years)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    src = sqlite3.connect(DB_PATH)
+    try:
+        dst = sqlite3.connect(tmp_path)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+@instrumentation.operation
+def restore_db(path: str) -> Optional[str]:
+    """Replace the DB contents with the backup at `path`. The backup must
+    pass quick_check and have a sessions table (ValueError otherwise). The
+    current DB is first copied to backups/pre-restore-<time>.db, whose path
+    is returned (None if there was no DB). The data version ends above both
+    the old and the restored value so version-keyed caches are not reused.
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(path)
+    src = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        try:
+            check = src.execute("PRAGMA quick_check").fetchone()[0]
+            has_sessions = src.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='sessions'").fetchone()
+        except sqlite3.DatabaseError as ex:
+            raise ValueError(f"{path} is not a tracker database: {ex}") from ex
+        if check != "ok" or not has_sessions:
+            raise ValueError(f"{path} is not a usable tracker database ({check if check != 'ok' else 'no sessions table'})")
+        safety = None
+        old_version = 0
+        if os.path.exists(DB_PATH):
+            stamp = dt.datetime.now().strftime("%Y%m%d-%H%M%S")
+            safety = backup_db(os.path.join(os.path.dirname(DB_PATH), "backups", f"pre-restore-{stamp}.db"))
+            old_version = get_data_version()
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        dst = sqlite3.connect(DB_PATH)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    init_db()  # older backups may predate the current schema
+    with conn_ctx() as conn:
+        conn.execute(
+            "INSERT INTO settings(key, value) VALUES('data_version', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value=MAX(CAST(value AS INTEGER), ?) + 1",
+            (str(old_version + 1), old_version),
+        )
+    return safety
+
+
+@instrumentation.operation
+def integrity_check(quick: bool = False) -> list[str]:
+    """SQLite's integrity_check (or quick_check) messages for the DB and its
+    year archives; ["ok"] if all are sound."""
+    with conn_ctx() as conn:
+        return _check(conn, "quick_check" if quick else "integrity_check")
+
+
+def _check(conn: sqlite3.Connection, pragma: str) -> list[str]:
+    messages = [str(r[0]) for r in conn.execute(f"PRAGMA {pragma}").fetchall()]
+    # Archives are checked too; their problems are prefixed with the year
+    for year in _archive_state(conn)[1]:
+        try:
+            found = [str(r[0]) for r in conn.execute(f"PRAGMA {_attach(conn, year)}.{pragma}").fetchall()]
+        except (OSError, sqlite3.DatabaseError) as ex:
+            found = [str(ex)]
+        if found != ["ok"]:
+            messages = [m for m in messages if m != "ok"] + [f"archive {year}: {m}" for m in found]
+    return messages
+
+
+# Maintenance tasks, run by run_maintenance when due (the app calls it on a
+# worker while idle; `python -m services maintain` runs it by hand). Each
+# records {"at", "seconds", "result"} under settings key maintenance_<task>.
+MAINTENANCE_INTERVALS = {
+    "optimize": dt.timedelta(days=1),
+    "vacuum": dt.timedelta(days=1),
+    "analyze": dt.timedelta(days=7),
+    "quick_check": dt.timedelta(days=7),
+}
+# Free pages worth reclaiming: below this fraction of the file, vacuum waits
+VACUUM_FREE_FRACTION = 0.1
+# The one-time full VACUUM that enables auto_vacuum cannot be interrupted, so
+# background runs leave larger DBs to the CLI or "Run maintenance now"
+VACUUM_MIGRATE_BACKGROUND_MAX_BYTES = 32 * 1024 * 1024
+
+
+def _maintain_optimize(conn: sqlite3.Connection) -> dict:
+    # Re-analyzes only what SQLite thinks has drifted since the last run
+    conn.execute("PRAGMA optimize")
+    return {"ok": True}
+
+
+def _maintain_analyze(conn: sqlite3.Connection) -> dict:
+    conn.execute("ANALYZE")
+    return {"ok": True, "statistics": conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0]}
+
+
+def _maintain_vacuum(conn: sqlite3.Connection, background: bool = False) -> dict:
+    """Hand free pages back to the file system. DBs created before auto_vacuum
+    was enabled are migrated once with a full VACUUM (in the background only
+    up to VACUUM_MIGRATE_BACKGROUND_MAX_BYTES)."""
+    page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    result = {"ok": True, "migrated": False, "freed_bytes": 0}
+    if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+        if background and pages * page_size > VACUUM_MIGRATE_BACKGROUND_MAX_BYTES:
+            result["pending"] = "one-time full VACUUM; run maintenance now"
+            result["bytes"] = pages * page_size
+            return result
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+        result["migrated"] = True
+    elif free and free >= VACUUM_FREE_FRACTION * pages:
+        # executescript steps the pragma to completion (execute frees one page)
+        conn.executescript("PRAGMA incremental_vacuum")
+    result["freed_bytes"] = (pages - conn.execute("PRAGMA page_count").fetchone()[0]) * page_size
+    result["bytes"] = conn.execute("PRAGMA page_count").fetchone()[0] * page_size
+    return result
+
+
+def _maintain_quick_check(conn: sqlite3.Connection) -> dict:
+    messages = _check(conn, "quick_check")
+    return {"ok": messages == ["ok"], "messages": messages[:20]}
+
+
+_MAINTENANCE = {
+    "optimize": _maintain_optimize,
+    "vacuum": _maintain_vacuum,
+    "analyze": _maintain_analyze,
+    "quick_check": _maintain_quick_check,
+}
+
+
+@instrumentation.operation
+def maintenance_status(now: Optional[dt.datetime] = None) -> dict[str, dict]:
+    """Task -> {"last": record of the last run or None, "due": bool}."""
+    now = now or dt.datetime.now()
+    with conn_ctx() as conn:
+        keys = [f"maintenance_{task}" for task in MAINTENANCE_INTERVALS]
+        rows = dict(conn.execute(f"SELECT key, value FROM settings WHERE key IN ({','.join('?' * len(keys))})", keys).fetchall())
+    status = {}
+    for task, interval in MAINTENANCE_INTERVALS.items():
+        try:
+            last = json.loads(rows[f"maintenance_{task}"])
+            due = now - dt.datetime.fromisoformat(last["at"]) >= interval
+        except (KeyError, ValueError, TypeError):
+            last, due = None, True
+        status[task] = {"last": last, "due": due}
+    return status
+
+
+@instrumentation.operation
+def run_maintenance(
+    tasks: Optional[Iterable[str]] = None, *, force: bool = False, cancel=None, background: bool = False
+) -> dict[str, dict]:
+    """Run the maintenance tasks that are due (all of `tasks` with force),
+    in MAINTENANCE_INTERVALS order, stopping early once `cancel` is set.
+    `background` (the app's idle runs) skips work that cannot be cancelled
+    on large DBs. Failures are recorded, not raised. Returns task -> record
+    for the tasks that ran."""
+    wanted = list(MAINTENANCE_INTERVALS) if tasks is None else list(tasks)
+    unknown = set(wanted) - set(MAINTENANCE_INTERVALS)
+    if unknown:
+        raise ValueError(f"Unknown maintenance task(s): {', '.join(sorted(unknown))}")
+    status = maintenance_status()
+    done = {}
+    for task in MAINTENANCE_INTERVALS:
+        if task not in wanted or not (force or status[task]["due"]):
+            continue
+        if cancel is not None and cancel.cancelled:
+            break
+        started = dt.datetime.now()
+        with conn_ctx() as conn:
+            try:
+                if task == "vacuum":
+                    result = _maintain_vacuum(conn, background=background)
+                else:
+                    result = _MAINTENANCE[task](conn)
+            except sqlite3.Error as ex:
+                result = {"ok": False, "error": str(ex)}
+            record = {"at": started.isoformat(timespec="seconds"), "seconds": round((dt.datetime.now() - started).total_seconds(), 3), "result": result}
+            conn.execute(
+                "INSERT INTO settings(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value",
+                (f"maintenance_{task}", json.dumps(record)),
+            )
+        done[task] = record
+    return done
+
+
+def format_maintenance(status: dict[str, dict]) -> str:
+    """One line per task for the Diagnostics panel."""
+    lines = []
+    for task, info in status.items():
+        last = info["last"]
+        if last is None:
+            lines.append(f"{task:<12} never run")
+            continue
+        result = last.get("result", {})
+        state = "ok" if result.get("ok") else f"FAILED: {result.get('error') or '; '.join(result.get('messages', []))}"
+        extra = f", freed {result['freed_bytes'] / 1024:.0f} KiB" if result.get("freed_bytes") else ""
+        if result.get("pending"):
+            extra += f", pending: {result['pending']}"
+        lines.append(f"{task:<12} {last['at'].replace('T', ' ')} ({last['seconds']:.2f} s) {state}{extra}{' - due' if info['due'] else ''}")
+    return "\n".join(lines)
 
 
 # Simple settings helpers
+@instrumentation.operation
 def set_setting(key: str, value: str) -> None:
     with conn_ctx() as conn:
         conn.execute("INSERT INTO settings(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value=excluded.value", (key, value))
 
 
+@instrumentation.operation
 def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
     with conn_ctx() as conn:
         cur = conn.execute("SELECT value FROM settings WHERE key=?", (key,))
@@ -181,86 +1147,36 @@ def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
         return row[0]
 
 
+def bump_data_version(conn: sqlite3.Connection) -> None:
+    """Mark the entries as changed; call inside the writing transaction."""
+    conn.execute(
+        "INSERT INTO settings(key, value) VALUES('data_version', '1') "
+        "ON CONFLICT(key) DO UPDATE SET value=CAST(value AS INTEGER) + 1"
+    )
+
+
+@instrumentation.operation
+def get_data_version() -> int:
+    """Counter bumped in the same transaction as every entry write; caches of
+    views derived from the entries (e.g. rendered charts) are keyed by it."""
+    try:
+        return int(get_setting("data_version", "0") or 0)
+    except (sqlite3.Error, ValueError):
+        return 0
+
+
+@instrumentation.operation
 def import_dataframe(df: pd.DataFrame, *, dry_run: bool = False) -> tuple[int, int, list[str]]:
     """Import/merge entries from a DataFrame.
     Required columns: date
     Optional columns: topic, minutes, practiced, challenges, wins, confidence, tags
     Returns: (inserted_count, updated_count, errors)
     """
+    from services.importer import import_records
+
     # Ensure schema exists
     init_db()
 
     if df is None or df.empty:
         return 0, 0, ["No rows to import."]
-
-    # Standardize columns
-    cols = {c.lower(): c for c in df.columns}
-    def col(name):
-        return cols.get(name, None)
-
-    errors: list[str] = []
-    inserted = 0
-    updated = 0
-
-    for idx, row in df.iterrows():
-        try:
-            # Date parsing
-            raw_date = row[col("date")] if col("date") else None
-            if pd.isna(raw_date):
-                errors.append(f"Row {idx}: missing date")
-                continue
-            if isinstance(raw_date, dt.date) and not isinstance(raw_date, dt.datetime):
-                d = raw_date
-            else:
-                d = pd.to_datetime(raw_date).date()
-
-            topic = str(row[col("topic")] if col("topic") else "")
-            practiced = str(row[col("practiced")] if col("practiced") else "")
-            challenges = str(row[col("challenges")] if col("challenges") else "")
-            wins = str(row[col("wins")] if col("wins") else "")
-            tags_raw = row[col("tags")] if col("tags") else ""
-
-            minutes = row[col("minutes")] if col("minutes") else 0
-            confidence = row[col("confidence")] if col("confidence") else 3
-            try:
-                minutes = int(minutes)
-            except Exception:
-                minutes = 0
-            try:
-                confidence = int(confidence)
-            except Exception:
-                confidence = 3
-
-            sanitized, msgs = validate_entry_fields(
-                topic=topic,
-                minutes=minutes,
-                confidence=confidence,
-                practiced=practiced,
-                challenges=challenges,
-                wins=wins,
-                tags=str(tags_raw or ""),
-            )
-
-            existed = get_entry_by_date(d) is not None
-            if not dry_run:
-                upsert_entry(
-                    date=d,
-                    topic=sanitized["topic"],
-                    minutes=sanitized["minutes"],
-                    practiced=sanitized["practiced"],
-                    challenges=sanitized["challenges"],
-                    wins=sanitized["wins"],
-                    confidence=sanitized["confidence"],
-                    tags=sanitized["tags"],
-                )
-            if existed:
-                updated += 1
-            else:
-                inserted += 1
-            # Collect non-fatal messages
-            for m in msgs:
-                errors.append(f"Row {idx}: {m}")
-        except Exception as ex:
-            errors.append(f"Row {idx}: {ex}")
-
-    return inserted, updated, errors
+    return import_records(df.to_dict(orient="records"), dry_run=dry_run)
@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+
+from services import storage
+from services.metrics import compute_runs, week_start_ordinals
+
+# Team dashboard: one summary per learner DB in a directory, combined into a
+# team report. Each DB is summarized in a worker process from its sessions
+# table (read-only, so any app version's DB works) and the summary is cached
+# under the file's fingerprint; a re-run only recomputes DBs that changed.
+
+# Bumped when the summary fields change meaning (old caches are ignored)
+CACHE_VERSION = 2
+DB_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+
+def default_cache_path() -> str:
+    """Summaries are cached next to the app's own DB (data/cache/team.json)."""
+    return os.path.join(os.path.dirname(storage.DB_PATH), "cache", "team.json")
+
+
+def find_databases(directory: str) -> dict[str, str]:
+    """Learner name -> DB path. `alice.db` is "alice"; `alice/tracker.db`
+    (one folder per person) is "alice" too. Backups folders are skipped."""
+    found: dict[str, str] = {}
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in ("backups", "cache", storage.ARCHIVE_DIR) and not d.startswith("."))
+        for name in sorted(files):
+            stem, suffix = os.path.splitext(name)
+            if suffix.lower() not in DB_SUFFIXES:
+                continue
+            path = os.path.join(root, name)
+            learner = os.path.basename(root) if stem == "tracker" and root != directory else stem
+            if learner in found:
+                learner = os.path.relpath(path, directory)
+            found[learner] = path
+    return found
+
+
+def fingerprint(path: str) -> str:
+    """Size and mtime of the DB and its WAL (a WAL-mode write may not touch
+    the main file until checkpoint). Year archives only change together
+    with the DB, so they need no part of their own."""
+    parts = []
+    for p in (path, path + "-wal"):
+        try:
+            st = os.stat(p)
+            parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+        except OSError:
+            parts.append("-")
+    return "/".join(parts)
+
+
+def _archives(path: str) -> list[str]:
+    """Year archive files of the DB at `path` (see storage.archive_years)."""
+    conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True)
+    try:
+        row = conn.execute("SELECT value FROM settings WHERE key=?", (storage.ARCHIVE_KEY,)).fetchone()
+    except sqlite3.OperationalError:
+        row = None  # no settings table: an old or foreign DB
+    finally:
+        conn.close()
+    return [storage.archive_path(year, path) for year in json.loads(row[0])["years"]] if row else []
+
+
+def summarize_db(path: str, weeks: int = 12, today: Optional[str] = None) -> dict:
+    """One learner's numbers: totals, current/longest streak (current only
+    if it reaches `today`, as in the app), minutes, sessions and mean
+    confidence for each of the last `weeks` weeks, and the confidence trend (least-squares slope per week over those weeks).
+    Archived years are read from their archive files. Runs in a worker
+    process; `today` is an ISO date."""
+    ref = dt.date.fromisoformat(today) if today else dt.date.today()
+    rows = []
+    for part in [path] + _archives(path):
+        conn = sqlite3.connect(f"file:{os.path.abspath(part)}?mode=ro", uri=True)
+        try:
+            rows += conn.execute("SELECT date, minutes, confidence FROM sessions").fetchall()
+        finally:
+            conn.close()
+    ref_day = (ref - dt.date(1970, 1, 1)).days
+    last_week = int(week_start_ordinals([ref_day])[0])
+    first_week = last_week - 7 * (weeks - 1)
+    week_labels = [str(np.datetime64(first_week + 7 * i, "D")) for i in range(weeks)]
+    empty = {
+        "entries": 0, "total_minutes": 0, "first_date": None, "last_date": None,
+        "current_streak": 0, "longest_streak": 0, "avg_confidence": None, "confidence_trend": None,
+        "weeks": week_labels, "week_minutes": [0] * weeks, "week_sessions": [0] * weeks,
+        "week_confidence": [None] * weeks,
+    }
+    if not rows:
+        return empty
+    days = np.array([str(r[0])[:10] for r in rows], dtype="datetime64[D]").astype(np.int64)
+    minutes = np.array([int(r[1] or 0) for r in rows], dtype=np.int64)
+    confidence = np.array([int(r[2] or 0) for r in rows], dtype=np.float64)
+
+    starts, ends = compute_runs(days[days <= ref_day])
+    lengths = ends - starts + 1
+    # Same rule as the app and `stats` (metrics.compute_streaks,
+    # storage.get_streak_state): a streak is current only if it reaches today
+    current = int(lengths[-1]) if lengths.size and ends[-1] == ref_day else 0
+
+    week_idx = (week_start_ordinals(days) - first_week) // 7
+    inside = (week_idx >= 0) & (week_idx < weeks) & (days <= ref_day)
+    idx = week_idx[inside]
+    week_minutes = np.bincount(idx, weights=minutes[inside], minlength=weeks).astype(np.int64)
+    week_sessions = np.bincount(idx, minlength=weeks)
+    conf_sums = np.bincount(idx, weights=confidence[inside], minlength=weeks)
+    week_conf = [round(c / n, 2) if n else None for c, n in zip(conf_sums, week_sessions)]
+    studied = week_sessions > 0
+    trend = None
+    if studied.sum() >= 2:
+        xs = np.flatnonzero(studied)
+        trend = round(float(np.polyfit(xs, conf_sums[studied] / week_sessions[studied], 1)[0]), 3)
+    return dict(
+        empty,
+        entries=int(days.size),
+        total_minutes=int(minutes.sum()),
+        first_date=str(np.datetime64(int(days.min()), "D")),
+        last_date=str(np.datetime64(int(days.max()), "D")),
+        current_streak=current,
+        longest_streak=int(lengths.max()) if lengths.size else 0,
+        avg_confidence=round(float(confidence.mean()), 2),
+        confidence_trend=trend,
+        week_minutes=week_minutes.tolist(),
+        week_sessions=week_sessions.tolist(),
+        week_confidence=week_conf,
+    )
+
+
+def _load_cache(path: Optional[str]) -> dict:
+    if not path:
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return data.get("entries", {}) if data.get("version") == CACHE_VERSION else {}
+
+
+def _save_cache(path: Optional[str], entries: dict) -> None:
+    if not path:
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"version": CACHE_VERSION, "entries": entries}, f)
+    os.replace(tmp, path)
+
+
+def _team(learners: dict[str, dict], weeks: int) -> dict:
+    minutes = np.zeros(weeks, dtype=np.int64)
+    sessions = np.zeros(weeks, dtype=np.int64)
+    conf_sums = np.zeros(weeks)
+    active = np.zeros(weeks, dtype=np.int64)
+    for s in learners.values():
+        m = np.asarray(s["week_minutes"], dtype=np.int64)
+        n = np.asarray(s["week_sessions"], dtype=np.int64)
+        c = np.array([v if v is not None else 0.0 for v in s["week_confidence"]])
+        minutes += m
+        sessions += n
+        conf_sums += c * n
+        active += n > 0
+    return {
+        "learners": len(learners),
+        "entries": sum(s["entries"] for s in learners.values()),
+        "total_minutes": sum(s["total_minutes"] for s in learners.values()),
+        "week_minutes": minutes.tolist(),
+        "week_sessions": sessions.tolist(),
+        "week_active_learners": active.tolist(),
+        # Session-weighted, so prolific learners count for more
+        "week_confidence": [round(float(c / n), 2) if n else None for c, n in zip(conf_sums, sessions)],
+        "on_streak": sum(1 for s in learners.values() if s["current_streak"]),
+        "longest_streak": max((s["longest_streak"] for s in learners.values()), default=0),
+    }
+
+
+def build_report(
+    directory: str,
+    *,
+    weeks: int = 12,
+    today: Optional[dt.date] = None,
+    workers: Optional[int] = None,
+    cache_path: Optional[str] = "",
+) -> dict:
+    """Summaries for every learner DB under `directory` plus team totals.
+    Unchanged DBs (same fingerprint, weeks and day) come from the cache at
+    `cache_path` ("" = default_cache_path(), None = no cache); the rest are
+    summarized in parallel on up to `workers` processes."""
+    weeks = max(1, int(weeks))
+    day = (today or dt.date.today()).isoformat()
+    cache_path = default_cache_path() if cache_path == "" else cache_path
+    cache = _load_cache(cache_path)
+    databases = find_databases(directory)
+    learners: dict[str, dict] = {}
+    errors: dict[str, str] = {}
+    stale: dict[str, tuple[str, str]] = {}
+    for name, path in databases.items():
+        key = os.path.abspath(path)
+        fp = fingerprint(path)
+        hit = cache.get(key)
+        if hit and hit["fingerprint"] == fp and hit["weeks"] == weeks and hit["today"] == day:
+            learners[name] = hit["summary"]
+        else:
+            stale[name] = (key, fp)
+
+    def done(name, key, fp, summary):
+        learners[name] = summary
+        cache[key] = {"fingerprint": fp, "weeks": weeks, "today": day, "summary": summary}
+
+    if len(stale) == 1 or workers == 1:
+        # A process pool costs more to start than one small DB takes
+        for name, (key, fp) in stale.items():
+            try:
+                done(name, key, fp, summarize_db(key, weeks, day))
+            except Exception as ex:
+                errors[name] = f"{type(ex).__name__}: {ex}"
+    elif stale:
+        with ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(stale))) as pool:
+            futures = {name: pool.submit(summarize_db, key, weeks, day) for name, (key, _) in stale.items()}
+            for name, future in futures.items():
+                key, fp = stale[name]
+                try:
+                    done(name, key, fp, future.result())
+                except Exception as ex:
+                    errors[name] = f"{type(ex).__name__}: {ex}"
+    if stale:
+        # Forget DBs that are gone so the cache does not grow without bound
+        live = {os.path.abspath(p) for p in databases.values()}
+        # Only keys under this directory: "team" must not prune "team2"
+        prefix = os.path.join(os.path.abspath(directory), "")
+        for key in [k for k in cache if k not in live and k.startswith(prefix)]:
+            del cache[key]
+        _save_cache(cache_path, cache)
+
+    learners = dict(sorted(learners.items()))
+    first = next(iter(learners.values()), None)
+    return {
+        "directory": os.path.abspath(directory),
+        "today": day,
+        "weeks": first["weeks"] if first else [],
+        "recomputed": len(stale) - len(errors),
+        "cached": len(databases) - len(stale),
+        "errors": errors,
+        "team": _team(learners, weeks),
+        "learners": learners,
+    }
+
+
+def format_report(report: dict) -> str:
+    """Compact text table: one line per learner and a team line."""
+    lines = [f"Team report for {report['directory']} (as of {report['today']}, last {len(report['weeks'])} weeks)"]
+    lines.append(f"{'learner':<20}{'entries':>8}{'hours':>8}{'streak':>7}{'best':>6}{'conf':>6}{'trend':>7}  last 4 weeks (min)")
+    for name, s in report["learners"].items():
+        trend = f"{s['confidence_trend']:+.2f}" if s["confidence_trend"] is not None else "-"
+        conf = f"{s['avg_confidence']:.1f}" if s["avg_confidence"] is not None else "-"
+        recent = " ".join(f"{m:>5}" for m in s["week_minutes"][-4:])
+        lines.append(
+            f"{name[:19]:<20}{s['entries']:>8}{s['total_minutes'] / 60:>8.1f}{s['current_streak']:>7}"
+            f"{s['longest_streak']:>6}{conf:>6}{trend:>7}  {recent}"
+        )
+    t = report["team"]
+    recent = " ".join(f"{m:>5}" for m in t["week_minutes"][-4:])
+    lines.append(f"{'TEAM':<20}{t['entries']:>8}{t['total_minutes'] / 60:>8.1f}{'':>7}{'':>6}{'':>6}{'':>7}  {recent}")
+    for name, error in report["errors"].items():
+        lines.append(f"! {name}: {error}")
+    return "\n".join(lines)
@@ -0,0 +1,88 @@
+import datetime as dt
+import random
+import sqlite3
+
+import pandas as pd
+
+from services import storage
+from services.metrics import aggregate_db, weekly_minutes, weekly_minutes_db, weekly_summary_db, week_bounds_for
+from services.storage import get_all_entries_df, import_dataframe, init_db
+
+
+def _seed(n: int = 120) -> None:
+    rng = random.Random(5)
+    start = dt.date(2024, 12, 1)
+    rows = []
+    for i in range(n):
+        if rng.random() < 0.25:
+            continue
+        rows.append({
+            "date": start + dt.timedelta(days=i),
+            "topic": rng.choice(["SQL", "Python", "Math"]),
+            "minutes": rng.randint(0, 180),
+            "confidence": rng.randint(1, 5),
+            "tags": ", ".join(rng.sample(["db", "py", "algo", "stats"], rng.randint(0, 3))),
+        })
+    import_dataframe(pd.DataFrame(rows))
+
+
+# Pandas reference implementations
+def _reference(by: str, start=None, end=None) -> pd.DataFrame:
+    df = get_all_entries_df()
+    df["date"] = pd.to_datetime(df["date"]).dt.date
+    if start is not None:
+        df = df[df["date"] >= start]
+    if end is not None:
+        df = df[df["date"] <= end]
+    if by == "week":
+        df["key"] = df["date"].map(lambda d: week_bounds_for(d)[0].isoformat())
+    elif by == "month":
+        df["key"] = df["date"].map(lambda d: d.strftime("%Y-%m"))
+    elif by == "topic":
+        df["key"] = df["topic"].fillna("")
+    else:
+        df["key"] = df["tags"].fillna("").map(lambda t: [x.strip() for x in t.split(",") if x.strip()])
+        df = df.explode("key").dropna(subset=["key"])
+    df["progress"] = df["minutes"] * df["confidence"]
+    g = df.groupby("key", sort=True)
+    return pd.DataFrame({
+        "key": list(g.groups.keys()),
+        "minutes": g["minutes"].sum().to_list(),
+        "sessions": g.size().to_list(),
+        "avg_confidence": g["confidence"].mean().to_list(),
+        "progress": g["progress"].sum().to_list(),
+    })
+
+
+def test_aggregations_match_pandas_reference():
+    init_db()
+    _seed()
+    for by in ("week", "month", "topic", "tag"):
+        for start, end in ((None, None), (dt.date(2025, 1, 6), dt.date(2025, 2, 20))):
+            got = aggregate_db(by, start, end).reset_index(drop=True)
+            ref = _reference(by, start, end)
+            pd.testing.assert_frame_equal(got, ref, check_dtype=False)
+
+
+def test_weekly_minutes_db_matches_pandas():
+    init_db()
+    _seed()
+    df = get_all_entries_df()
+    for week_of in (dt.date(2024, 12, 1), dt.date(2025, 1, 1), dt.date(2025, 3, 15), dt.date(2026, 1, 1)):
+        assert weekly_minutes_db(week_of) == weekly_minutes(df, week_of)
+    summary = weekly_summary_db(4, dt.date(2025, 3, 15))
+    assert list(summary["week"]) == sorted(summary["week"]) and len(summary) <= 4
+
+
+def test_date_lookups_use_the_covering_index_only():
+    init_db()
+    conn = sqlite3.connect(storage.DB_PATH)
+    conn.execute("CREATE INDEX idx_sessions_date ON sessions(date)")  # as older versions had
+    conn.commit()
+    conn.close()
+    init_db()
+    with sqlite3.connect(storage.DB_PATH) as conn:
+        names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='sessions'")}
+        plan = " ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN SELECT topic FROM sessions WHERE date = '2025-01-01'"))
+    assert "idx_sessions_date" not in names and "idx_sessions_date_minutes" in names
+    assert "idx_sessions_date_minutes" in plan
@@ -0,0 +1,67 @@
+import datetime as dt
+import random
+
+import numpy as np
+import pandas as pd
+
+from services.analytics import DailySeries
+
+
+def _history(n_days: int, seed: int = 3) -> pd.DataFrame:
+    rng = random.Random(seed)
+    start = dt.date(2024, 1, 1)
+    rows = []
+    for i in range(n_days):
+        if rng.random() < 0.3:
+            continue  # rest day
+        rows.append({
+            "date": (start + dt.timedelta(days=i)).isoformat(),
+            "minutes": rng.randint(5, 120),
+            "confidence": rng.randint(1, 5),
+        })
+    return pd.DataFrame(rows)
+
+
+def test_series_match_pandas_reference():
+    df = _history(200)
+    s = DailySeries()
+    s.update(df)
+    cal = df.assign(date=pd.to_datetime(df["date"])).set_index("date").asfreq("D")
+    minutes = cal["minutes"].fillna(0)
+    for w in (7, 30, 90):
+        ref = minutes.rolling(w, min_periods=1).mean().to_numpy()
+        assert np.allclose(s.moving_average(w), ref)
+    conf_ref = cal["confidence"].rolling(30, min_periods=1).mean().to_numpy()
+    assert np.allclose(s.moving_average(30, "confidence"), conf_ref, equal_nan=True)
+    ewm_ref = cal["confidence"].dropna().ewm(span=14, adjust=False).mean().reindex(cal.index).ffill().to_numpy()
+    assert np.allclose(s.ewma(14), ewm_ref)
+    p75_ref = minutes.rolling(30, min_periods=1).quantile(0.75).to_numpy()
+    assert np.allclose(s.rolling_percentile(75, 30), p75_ref)
+    assert s.active_days(7)[-1] == cal["confidence"].notna().iloc[-7:].sum()
+
+
+def test_incremental_extension_matches_rebuild():
+    df = _history(300, seed=11)
+    split = df["date"] < "2024-08-01"
+    inc = DailySeries()
+    inc.update(df[split])
+    # Touch series so they are cached and must be extended
+    inc.moving_average(7); inc.moving_average(90, "progress"); inc.ewma(10); inc.rolling_percentile(25, 30)
+    assert inc.update(df) is True
+
+    full = DailySeries()
+    full.update(df)
+    assert np.allclose(inc.moving_average(7), full.moving_average(7))
+    assert np.allclose(inc.moving_average(90, "progress"), full.moving_average(90, "progress"), equal_nan=True)
+    assert np.allclose(inc.ewma(10), full.ewma(10), equal_nan=True)
+    assert np.allclose(inc.rolling_percentile(25, 30), full.rolling_percentile(25, 30), equal_nan=True)
+
+
+def test_update_rebuilds_when_history_changes():
+    df = _history(60)
+    s = DailySeries()
+    s.update(df)
+    edited = df.copy()
+    edited.loc[edited.index[0], "minutes"] = 999
+    assert s.update(edited) is False
+    assert s.minutes[0] == 999
@@ -0,0 +1,84 @@
+import datetime as dt
+import os
+import sqlite3
+
+import pytest
+
+from services import importer, metrics, storage
+from services.storage import init_db, upsert_entry
+
+
+def _seed():
+    init_db()
+    # 2021-12-30 .. 2022-01-03 is one streak across the year boundary
+    for i in range(5):
+        day = dt.date(2021, 12, 30) + dt.timedelta(days=i)
+        upsert_entry(date=day, topic=f"T{i}", minutes=10 * (i + 1), practiced="", challenges="", wins="", confidence=1 + i % 5, tags="a")
+    upsert_entry(date=dt.date(2020, 5, 1), topic="old", minutes=5, practiced="", challenges="", wins="", confidence=3, tags="")
+    upsert_entry(date=dt.date(2024, 2, 1), topic="hot", minutes=7, practiced="", challenges="", wins="", confidence=2, tags="")
+
+
+def _views():
+    return (
+        storage.get_entry_totals(),
+        [tuple(r) for r in storage.fetch_all_entries()],
+        [tuple(r) for r in storage.fetch_sorted_page("progress", limit=4)],
+        metrics.aggregate_db("month").to_dict("records"),
+        storage.get_streak_state(dt.date(2022, 1, 3))["current_streak"],
+    )
+
+
+def test_archived_years_stay_visible_but_read_only():
+    _seed()
+    before = _views()
+    assert storage.archive_years(2022) == [2020, 2021, 2022]
+    assert storage.archive_cutoff() == dt.date(2023, 1, 1)
+    assert os.path.isfile(storage.archive_path(2021))
+    assert storage.fetch_entries_in_range(end=dt.date(2099, 1, 1), start=dt.date(2024, 1, 1))[0]["topic"] == "hot"
+    with storage.conn_ctx() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] == 1
+        # A range inside one year reads that archive alone
+        assert storage.source_table(conn, dt.date(2021, 3, 1), dt.date(2021, 12, 31)) == "archive_2021.sessions"
+        assert storage.source_table(conn, dt.date(2024, 1, 1)) == "sessions"
+    assert _views() == before
+    assert storage.verify_derived_state() and storage.integrity_check(quick=True) == ["ok"]
+    assert storage.get_entry_by_date(dt.date(2020, 5, 1))["topic"] == "old"
+
+    with pytest.raises(ValueError, match="archived"):
+        upsert_entry(date=dt.date(2021, 12, 31), topic="x", minutes=1, practiced="", challenges="", wins="", confidence=3)
+    with pytest.raises(ValueError):
+        storage.delete_entry(dt.date(2020, 5, 1))
+    # Syncing an unchanged export back is quiet; changing an archived entry is refused
+    assert importer.import_records([dict(r) for r in storage.fetch_all_entries()]) == (0, 1, [])
+    plan = importer.plan_import([{"date": "2021-12-31", "topic": "changed"}])
+    assert plan["fatal"] and not plan["rows"]
+    assert storage.archive_years(2021) == []
+
+
+def test_unarchive_moves_years_back():
+    _seed()
+    before = _views()
+    version = storage.get_data_version()
+    storage.archive_years(2022)
+    assert storage.unarchive_years(2022) == [2022]
+    assert storage.archive_cutoff() == dt.date(2022, 1, 1)
+    assert not os.path.exists(storage.archive_path(2022))
+    upsert_entry(date=dt.date(2022, 1, 3), topic="T4", minutes=50, practiced="", challenges="", wins="", confidence=5, tags="a")
+    assert storage.unarchive_years(2000) == [2020, 2021]
+    assert storage.archive_cutoff() is None and storage.get_data_version() > version
+    assert _views() == before
+
+
+def test_pooled_connections_let_go_of_unarchived_years():
+    _seed()
+    storage.archive_years(2022)
+    pooled = sqlite3.connect(storage.DB_PATH, detect_types=sqlite3.PARSE_DECLTYPES)
+    with storage.use_connection(pooled):
+        assert len(storage.fetch_all_entries()) == 7
+    assert "archive_2021" in {r[1] for r in pooled.execute("PRAGMA database_list")}
+    storage.unarchive_years(2021)
+    with storage.use_connection(pooled):
+        assert len(storage.fetch_all_entries()) == 7
+        storage.attach_archives(pooled)
+    assert {r[1] for r in pooled.execute("PRAGMA database_list")} - {"temp"} == {"main", "archive_2020"}
+    pooled.close()
@@ -0,0 +1,30 @@
+from benchmarks import bench
+from benchmarks.synthetic import generate_history, generate_team
+
+
+def test_generator_is_deterministic_and_configurable():
+    rows = generate_history(300, seed=7, note_length=40, tag_cardinality=3)
+    assert rows == generate_history(300, seed=7, note_length=40, tag_cardinality=3)
+    assert rows != generate_history(300, seed=8, note_length=40, tag_cardinality=3)
+    dates = [r["date"] for r in rows]
+    assert dates == sorted(set(dates))
+    assert all(len(r["practiced"]) <= 40 for r in rows)
+    tags = {t for r in rows for t in r["tags"].split(", ") if t}
+    assert tags <= {"tag0", "tag1", "tag2"}
+    team = generate_team(2, 50, years=1)
+    assert list(team) == ["learner01", "learner02"] and team["learner01"] != team["learner02"]
+
+
+def test_run_times_every_benchmark():
+    report = bench.run([200])
+    assert set(report["results"]) == set(bench.BENCHMARKS)
+    assert all(t["200"] >= 0 for t in report["results"].values())
+    assert bench.parse_size("10k") == 10_000 and bench.parse_size("1M") == 1_000_000
+
+
+def test_compare_flags_only_real_slowdowns():
+    baseline = {"results": {"a": {"1000": 0.1}, "b": {"1000": 0.001}}}
+    current = {"results": {"a": {"1000": 0.2}, "b": {"1000": 0.005}, "c": {"1000": 9.0}}}
+    problems = bench.compare(current, baseline)
+    assert len(problems) == 1 and problems[0].startswith("a @ 1000 rows")
+    assert bench.compare(current, baseline, tolerance=1.5) == []
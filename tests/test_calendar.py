@@ -0,0 +1,64 @@
+import datetime as dt
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtWidgets  # noqa: E402
+
+from desktop import main  # noqa: E402
+from services.storage import init_db, upsert_entry  # noqa: E402
+
+DAY = dt.date(2025, 3, 12)
+SIZE = QtCore.QSize(90, 60)
+
+
+@pytest.fixture
+def calendar():
+    app = QtCore.QCoreApplication.instance() or QtWidgets.QApplication([])
+    if not isinstance(app, QtWidgets.QApplication):
+        pytest.skip("needs a QApplication; a core application was created first")
+    init_db()
+    main._BADGE_CACHE.clear()
+    cal = main.EntryCalendarWidget()
+    cal.setCurrentPage(DAY.year, DAY.month)
+    yield cal
+    cal.deleteLater()
+
+
+def _write(topic, confidence=3):
+    upsert_entry(date=DAY, topic=topic, minutes=30, practiced="", challenges="", wins="", confidence=confidence, tags="")
+
+
+def test_badges_are_rendered_once_per_record_and_size(calendar):
+    rec = ("SQL joins", 4)
+    first = calendar._badge(rec, SIZE, 1.0)
+    assert calendar._badge(rec, SIZE, 1.0) is first
+    assert len(main._BADGE_CACHE) == 1
+    # Another day with the same snippet and confidence shares the pixmap
+    assert calendar._badge(("SQL joins", 4), SIZE, 1.0) is first
+    calendar._badge(rec, SIZE, 2.0)
+    calendar._badge(rec, QtCore.QSize(100, 60), 1.0)
+    assert len(main._BADGE_CACHE) == 3
+
+
+def test_entry_write_and_palette_change_invalidate_badges(calendar):
+    _write("Before")
+    calendar.reload()
+    before = calendar._days[DAY]
+    old = calendar._badge(before, SIZE, 1.0)
+
+    _write("After", confidence=5)
+    calendar.refresh_date(DAY)
+    after = calendar._days[DAY]
+    assert after == ("After", 5)
+    assert calendar._badge(after, SIZE, 1.0) is not old
+    assert len(main._BADGE_CACHE) == 2
+
+    pal = calendar.palette()
+    pal.setColor(pal.ColorRole.Base, QtCore.Qt.red)
+    calendar.setPalette(pal)
+    assert len(main._BADGE_CACHE) == 0
+    assert calendar._badge(after, SIZE, 1.0) is not None and len(main._BADGE_CACHE) == 1
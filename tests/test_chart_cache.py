@@ -0,0 +1,35 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtGui  # noqa: E402
+
+from desktop.chart_cache import ChartImageCache, default_directory  # noqa: E402
+
+
+def _image(color):
+    image = QtGui.QImage(40, 20, QtGui.QImage.Format_RGBA8888)
+    image.fill(QtGui.QColor(color))
+    return image
+
+
+def test_images_survive_in_memory_and_on_disk():
+    cache = ChartImageCache(default_directory(), max_images=2, max_files=3)
+    keys = [("minutes", 7, "None", None, (40, 20), 1.0, (c, "#000000")) for c in ("#111111", "#222222", "#333333", "#444444")]
+    for key in keys:
+        cache.put(key, _image(key[-1][0]))
+    # Memory keeps the newest two; disk keeps three files
+    assert cache.get(keys[0]) is None and cache.get(keys[3]) is not None
+    assert len(os.listdir(cache.directory)) == 3
+    # A fresh cache (next launch) reads the PNGs back
+    fresh = ChartImageCache(default_directory())
+    found = {k: fresh.load(k) for k in keys}
+    assert sum(image is not None for image in found.values()) == 3
+    for key, image in found.items():
+        if image is not None:
+            assert image.pixelColor(5, 5).name() == key[-1][0]
+            assert fresh.get(key) is not None
+    assert fresh.load(keys[2][:1] + (8,) + keys[2][2:]) is None
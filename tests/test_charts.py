@@ -0,0 +1,44 @@
+import datetime as dt
+
+import numpy as np
+
+from services.charts import bin_sums, downsample, lttb_indices, pick_bin, window_slice
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    idx = lttb_indices(x, y, 400)
+    assert idx.size == 400 and idx[0] == 0 and idx[-1] == 9_999
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+    # Short series and NaN gaps
+    assert lttb_indices(x[:5], y[:5], 400).tolist() == [0, 1, 2, 3, 4]
+    xs, ys = downsample(np.arange(6), np.array([1, np.nan, 2, np.nan, 3, 4.0]), 100)
+    assert xs.tolist() == [0, 2, 4, 5] and ys.tolist() == [1, 2, 3, 4]
+
+
+def test_bin_sums_match_calendar_weeks_and_months():
+    first = dt.date(2024, 1, 1)
+    ordinals = np.arange(100) + (first - dt.date(1970, 1, 1)).days
+    values = np.arange(100, dtype=float)
+    starts, lengths, sums = bin_sums(ordinals, values, "month")
+    epoch = dt.date(1970, 1, 1)
+    assert [str(epoch + dt.timedelta(days=int(s))) for s in starts] == ["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01"]
+    assert lengths.tolist() == [31, 29, 31, 30]
+    assert sums.tolist() == [sum(range(0, 31)), sum(range(31, 60)), sum(range(60, 91)), sum(range(91, 100))]
+    starts, lengths, sums = bin_sums(ordinals, values, "week")
+    # 2024-01-01 is a Monday
+    assert starts[0] == ordinals[0] and set(lengths.tolist()) == {7}
+    assert sums.sum() == values.sum() and sums[0] == sum(range(7))
+
+
+def test_bin_choice_and_window_slice():
+    assert pick_bin(100, 600) == "day"
+    assert pick_bin(1000, 600) == "week"
+    assert pick_bin(20_000, 600) == "month"
+    # Window plus one day either side, clipped to the series
+    assert window_slice(100, 50, 110, 119) == slice(9, 21)
+    assert window_slice(100, 50, 90, 200) == slice(0, 50)
+    assert window_slice(100, 50, 300, 400) == slice(50, 50)
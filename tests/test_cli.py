@@ -0,0 +1,64 @@
+import datetime as dt
+import json
+import os
+
+from services import cli, storage
+from services.storage import init_db, upsert_entry
+
+
+def _run(capsys, *argv):
+    code = cli.main(list(argv))
+    out = capsys.readouterr().out
+    return code, [json.loads(line) for line in out.splitlines() if line.startswith("{")], out
+
+
+def _seed(days=5):
+    init_db()
+    for i in range(days):
+        upsert_entry(date=dt.date(2025, 3, 3) + dt.timedelta(days=i), topic=f"T{i}", minutes=30, practiced="p", challenges="", wins="", confidence=4, tags="a")
+
+
+def test_import_directory_then_export_round_trips(capsys, tmp_path):
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "a.json").write_text(json.dumps([{"date": "2025-01-01", "topic": "A", "minutes": 10}]), encoding="utf-8")
+    (src / "b.csv").write_text("date,topic,minutes,tags\n2025-01-02,B,20,x\n", encoding="utf-8")
+    (src / "notes.txt").write_text("ignored", encoding="utf-8")
+    code, summaries, _ = _run(capsys, "import", str(src))
+    assert code == 0 and [s["inserted"] for s in summaries] == [1, 1]
+
+    code, _, out = _run(capsys, "export", "-f", "ndjson")
+    rows = [json.loads(line) for line in out.splitlines()]
+    assert code == 0 and [r["topic"] for r in rows] == ["A", "B"] and rows[1]["minutes"] == 20
+
+    target = tmp_path / "out.json"
+    _run(capsys, "export", "-o", str(target))
+    assert [r["date"] for r in json.loads(target.read_text(encoding="utf-8"))] == ["2025-01-01", "2025-01-02"]
+
+    code, summaries, _ = _run(capsys, "import", "--strict", str(tmp_path / "missing.json"))
+    assert code == 1 and "error" in summaries[0]
+
+
+def test_stats_and_check_report_json(capsys):
+    _seed()
+    code, (stats,), _ = _run(capsys, "stats", "--today", "2025-03-07", "--weeks", "2")
+    assert code == 0
+    assert (stats["entries"], stats["current_streak"], stats["week_minutes"]) == (5, 5, 150)
+    assert stats["weeks"] == [{"week": "2025-02-24", "minutes": 0, "sessions": 0}, {"week": "2025-03-03", "minutes": 150, "sessions": 5}]
+    code, (check,), _ = _run(capsys, "check")
+    assert code == 0 and check["ok"]
+
+
+def test_backup_and_restore(capsys, tmp_path):
+    _seed(2)
+    backup = str(tmp_path / "copy.db")
+    assert _run(capsys, "backup", "-o", backup)[0] == 0
+    version = storage.get_data_version()
+    storage.delete_entry(dt.date(2025, 3, 3))
+    code, (result,), _ = _run(capsys, "restore", backup)
+    assert code == 0 and os.path.exists(result["previous_copy"])
+    assert storage.get_entry_by_date(dt.date(2025, 3, 3))["topic"] == "T0"
+    assert storage.get_data_version() > version + 1
+    bogus = tmp_path / "bogus.db"
+    bogus.write_text("not a database", encoding="utf-8")
+    assert cli.main(["restore", str(bogus)]) == 1
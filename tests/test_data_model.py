@@ -0,0 +1,119 @@
+import datetime as dt
+import os
+import random
+import sqlite3
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore  # noqa: E402
+
+from desktop import main  # noqa: E402
+from desktop.main import EntryTableModel, SortedEntryListModel  # noqa: E402
+from desktop.store import EntryStore  # noqa: E402
+from services.storage import init_db, upsert_entry  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+BASE = dt.date(2023, 1, 1)
+
+
+def _fields(i):
+    return dict(topic=f"T{i}", minutes=i, practiced=f"line one {i}\nline two", challenges="", wins="", confidence=3, tags="")
+
+
+@pytest.fixture
+def store(qapp):
+    init_db()
+    for i in range(600):
+        upsert_entry(date=BASE + dt.timedelta(days=i), **_fields(i))
+    s = EntryStore()
+    s.reload()
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    QtCore.QCoreApplication.processEvents()
+    return s
+
+
+def test_rows_are_exposed_in_pages_and_notes_loaded_per_row(store):
+    model = EntryTableModel(store)
+    model.CACHE_ROWS = 100
+    assert model.rowCount() == model.PAGE_SIZE
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 600
+    col = model.COLUMNS.index("practiced")
+    # Newest first; notes show the first line only
+    assert model.data(model.index(0, 0)) == str(BASE + dt.timedelta(days=599))
+    assert model.data(model.index(0, col)) == "line one 599…"
+    for row in range(600):
+        model.data(model.index(row, 1))
+    assert len(model._cache) <= 100
+
+
+def test_note_read_errors_are_reported_once_and_retried(store, monkeypatch):
+    model = EntryTableModel(store)
+    errors = []
+    store.failed.connect(errors.append)
+
+    def locked(dates):
+        raise sqlite3.OperationalError("database is locked")
+
+    real = main.fetch_entries_for_dates
+    monkeypatch.setattr(main, "fetch_entries_for_dates", locked)
+    col = model.COLUMNS.index("practiced")
+    assert model.data(model.index(0, 1)) == "T599"
+    assert model.data(model.index(0, col)) == ""  # summary only, not cached
+    assert len(errors) == 1 and "database is locked" in errors[0]
+    monkeypatch.setattr(main, "fetch_entries_for_dates", real)
+    assert model.data(model.index(0, col)) == "line one 599…"
+
+
+def test_store_changes_outside_fetched_pages_do_not_touch_rows(store):
+    model = EntryTableModel(store)
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append(first))
+    old = BASE - dt.timedelta(days=1)  # sorts last in the default newest-first order
+    store.upsert(date=old, **_fields(0))
+    assert inserted == [] and model.rowCount() == model.PAGE_SIZE
+    new = BASE + dt.timedelta(days=600)
+    store.upsert(date=new, **_fields(1))
+    assert inserted == [0] and model.data(model.index(0, 0)) == str(new)
+    while model.canFetchMore():
+        model.fetchMore()
+    assert model.rowCount() == 602
+    assert model.data(model.index(601, 0)) == str(old)
+
+
+def test_filters_apply_to_paged_rows_and_later_edits(store):
+    model = EntryTableModel(store)
+    model.set_filters(min_minutes=590)
+    assert model.match_count() == model.rowCount() == 10
+    assert model.data(model.index(0, 0)) == str(BASE + dt.timedelta(days=599))
+    store.upsert(date=BASE + dt.timedelta(days=700), **dict(_fields(0), minutes=5))
+    assert model.rowCount() == 10
+    store.upsert(date=BASE + dt.timedelta(days=5), **dict(_fields(0), minutes=595))
+    model.sort(2, QtCore.Qt.AscendingOrder)
+    assert [model.data(model.index(r, 2)) for r in range(3)] == ["590", "591", "592"]
+    assert model.data(model.index(5, 0)) == str(BASE + dt.timedelta(days=5))
+
+
+def test_sorted_list_follows_store_edits_inside_the_fetched_prefix(store):
+    model = SortedEntryListModel(store, mode="minutes")
+    rng = random.Random(4)
+    for _ in range(80):
+        d = BASE + dt.timedelta(days=rng.randrange(620))
+        if d in store.entries() and rng.random() < 0.4:
+            store.delete(d)
+        else:
+            store.upsert(date=d, **dict(_fields(0), minutes=rng.randrange(700)))
+    ents = store.entries()
+    want = sorted(ents, key=lambda d: (ents[d]["minutes"], d), reverse=True)
+    got = [model.data(model.index(r, 0), QtCore.Qt.UserRole) for r in range(model.rowCount())]
+    assert got == want[:len(got)] and len(got) > 100
+    assert all(model._find(d) == r for r, d in enumerate(got))
@@ -0,0 +1,74 @@
+import datetime as dt
+import random
+
+from services.entry_index import EntryIndex, split_tags
+
+
+BASE = dt.date(2022, 1, 1)
+
+
+def _record(rng, day):
+    return {
+        "date": BASE + dt.timedelta(days=day),
+        "topic": rng.choice(["SQL", "Python", "React", "sql joins", "Go"]),
+        "minutes": rng.randrange(0, 120, 5),
+        "confidence": rng.randint(1, 5),
+        "tags": ", ".join(rng.sample(["db", "Web", "algo", "py"], rng.randint(0, 2))),
+    }
+
+
+def _expected(records, column, descending, start=None, end=None, tag=None, topic=None, min_minutes=None):
+    rows = [
+        r for r in records.values()
+        if (start is None or r["date"] >= start)
+        and (end is None or r["date"] <= end)
+        and (not tag or tag.lower() in split_tags(r["tags"]))
+        and (not topic or topic.casefold() in r["topic"].casefold())
+        and (not min_minutes or r["minutes"] >= min_minutes)
+    ]
+    value = (lambda r: r["minutes"] * r["confidence"]) if column == "progress" else (lambda r: r[column])
+    rows.sort(key=lambda r: (value(r), r["date"]), reverse=descending)
+    return [r["date"] for r in rows]
+
+
+def test_order_and_filters_match_python_reference_across_edits():
+    rng = random.Random(11)
+    records = {}
+    for day in rng.sample(range(400), 250):
+        rec = _record(rng, day)
+        records[rec["date"]] = rec
+    index = EntryIndex(records.values())
+    for _ in range(60):
+        # Mix of inserts, edits and deletes between queries
+        day = rng.randrange(420)
+        d = BASE + dt.timedelta(days=day)
+        if d in records and rng.random() < 0.4:
+            del records[d]
+            index.discard(d)
+        else:
+            records[d] = _record(rng, day)
+            index.set(records[d])
+        filters = rng.choice([
+            {},
+            {"start": BASE + dt.timedelta(days=50), "end": BASE + dt.timedelta(days=300)},
+            {"tag": "web"},
+            {"topic": "SQL", "min_minutes": 30},
+        ])
+        column = rng.choice(["date", "topic", "minutes", "confidence", "progress", "tags"])
+        descending = rng.random() < 0.5
+        rows = index.order(column, descending, index.mask(**filters) if filters else None)
+        assert [index.date_of(r) for r in rows] == _expected(records, column, descending, **filters)
+    assert len(index) == len(records)
+    assert index.tags() == sorted({t for r in records.values() for t in split_tags(r["tags"])})
+
+
+def test_insert_position_and_external_order():
+    recs = [{"date": BASE + dt.timedelta(days=i), "topic": t, "minutes": m, "confidence": 3, "tags": ""}
+            for i, (t, m) in enumerate([("b", 10), ("a", 30), ("c", 20)])]
+    index = EntryIndex(recs[:2], external_order=lambda column: [r["date"] for r in reversed(recs)])
+    rows = index.order("minutes", descending=True)
+    rid = index.set(recs[2])
+    assert index.insert_position(rows, rid, "minutes", descending=True) == 1
+    assert index.matches(rid, min_minutes=15) and not index.matches(rid, topic="a")
+    assert index.insert_position(rows, rid, "practiced") is None
+    assert [index.date_of(r) for r in index.order("practiced")] == [r["date"] for r in reversed(recs)]
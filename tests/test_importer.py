@@ -0,0 +1,79 @@
+import datetime as dt
+import json
+
+import pandas as pd
+
+from services import importer
+from services.storage import (
+    fetch_all_entries, get_data_version, import_dataframe, init_db, upsert_entry, verify_derived_state,
+)
+
+
+BASE = dt.date(2024, 1, 1)
+
+
+class _Cancel:
+    cancelled = False
+
+
+def _write(tmp_path, records):
+    path = tmp_path / "import.json"
+    path.write_text(json.dumps(records), encoding="utf-8")
+    return str(path)
+
+
+def _records(n, start=0):
+    return [dict(date=str(BASE + dt.timedelta(days=i)), topic=f"T{i}", minutes=i % 90, confidence=1 + i % 5, tags="a") for i in range(start, start + n)]
+
+
+def test_plan_is_validated_once_and_committed_as_is(monkeypatch):
+    init_db()
+    upsert_entry(date=BASE, topic="old", minutes=1, practiced="", challenges="", wins="", confidence=3, tags="")
+    monkeypatch.setattr(importer, "REBUILD_ROWS", 50)  # exercise the bulk path
+    records = _records(120) + [dict(date=str(BASE + dt.timedelta(days=5)), topic="again", minutes=7)]
+    plan = importer.plan_import(records)
+    assert (plan["inserted"], plan["updated"], plan["fatal"]) == (119, 2, [])
+    assert importer.apply_plan(plan) == 121
+    rows = {r["date"]: r for r in fetch_all_entries()}
+    assert len(rows) == 120 and rows[str(BASE)]["topic"] == "T0" and rows[str(BASE + dt.timedelta(days=5))]["topic"] == "again"
+    assert verify_derived_state()
+
+
+def test_cancel_during_commit_rolls_back(monkeypatch, tmp_path):
+    init_db()
+    monkeypatch.setattr(importer, "PROGRESS_EVERY", 10)
+    version = get_data_version()
+    cancel = _Cancel()
+    seen = []
+
+    def progress(stage, done, total):
+        seen.append(stage)
+        if stage == "Importing" and done >= 30:
+            cancel.cancelled = True
+
+    plan = importer.import_file(_write(tmp_path, _records(100)), cancel=cancel, progress=progress)
+    assert plan["cancelled"] and "Validating" in seen
+    assert list(fetch_all_entries()) == [] and get_data_version() == version
+
+
+def test_fatal_rows_stop_validation_before_any_write(monkeypatch, tmp_path):
+    init_db()
+    parsed = []
+    real = importer._parse_date
+    monkeypatch.setattr(importer, "_parse_date", lambda v: parsed.append(v) or real(v))
+    bad = [dict(date=str(BASE + dt.timedelta(days=i)), topic="") for i in range(importer.MAX_FATAL + 30)]
+    plan = importer.import_file(_write(tmp_path, _records(10) + bad + _records(10, 500)))
+    assert len(plan["fatal"]) == importer.MAX_FATAL and not plan["cancelled"]
+    assert len(parsed) == 10 + importer.MAX_FATAL
+    assert list(fetch_all_entries()) == []
+
+
+def test_blank_pandas_cells_are_missing_values():
+    # A datetime column stores blanks as NaT, a nullable string column as NA
+    frame = pd.DataFrame({"date": pd.to_datetime(["2024-01-01", None]), "topic": ["a", "b"]})
+    assert import_dataframe(frame) == (1, 0, ["Row 1: missing date"])
+    frame = pd.DataFrame({"date": pd.array(["2024-01-02", pd.NA], dtype="string"), "topic": ["c", "d"]})
+    assert import_dataframe(frame) == (1, 0, ["Row 1: missing date"])
+    assert [r["topic"] for r in fetch_all_entries()] == ["a", "c"]
+    assert all(importer._missing(v) for v in (None, float("nan"), pd.NaT, pd.NA, " "))
+    assert not any(importer._missing(v) for v in (0, "x", dt.date(2024, 1, 1)))
@@ -0,0 +1,73 @@
+import datetime as dt
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("matplotlib")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore, QtWidgets  # noqa: E402
+
+from desktop.main import InsightsTab  # noqa: E402
+from desktop.store import EntryStore  # noqa: E402
+from services import analytics  # noqa: E402
+from services.storage import get_data_version, init_db, upsert_entry  # noqa: E402
+
+BASE = dt.date(2024, 1, 1)
+
+
+def _settle(tab):
+    for _ in range(3):
+        QtCore.QThreadPool.globalInstance().waitForDone()
+        tab._render_pool.waitForDone()
+        QtCore.QCoreApplication.processEvents()
+
+
+@pytest.fixture
+def tab():
+    app = QtCore.QCoreApplication.instance() or QtWidgets.QApplication([])
+    if not isinstance(app, QtWidgets.QApplication):
+        pytest.skip("needs a QApplication; a core application was created first")
+    init_db()
+    for i in range(200):
+        upsert_entry(date=BASE + dt.timedelta(days=i), topic="T", minutes=i % 60, practiced="", challenges="", wins="", confidence=1 + i % 5, tags="")
+    store = EntryStore()
+    store.reload()
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    QtCore.QCoreApplication.processEvents()
+    t = InsightsTab(store)
+    t.charts[0].resize(300, 160)
+    _settle(t)
+    yield t
+    t.deleteLater()
+
+
+def test_overlays_are_computed_once_across_renders(tab, monkeypatch):
+    computed = []
+    real = analytics.DailySeries._compute
+
+    def counting(self, key, from_index=0):
+        computed.append(key)
+        return real(self, key, from_index)
+
+    monkeypatch.setattr(analytics.DailySeries, "_compute", counting)
+    tab.overlay_combo.setCurrentText("7-day average")
+    _settle(tab)
+    first = len(computed)
+    assert first > 0
+    # A new size misses the image cache and renders again from the series
+    tab.charts[0].resize(320, 170)
+    tab._draw()
+    _settle(tab)
+    assert len(computed) == first
+
+
+def test_chart_version_changes_only_with_the_new_series(tab):
+    version = tab._version
+    upsert_entry(date=BASE + dt.timedelta(days=300), topic="new", minutes=5, practiced="", challenges="", wins="", confidence=3, tags="")
+    tab._recompute()
+    # Redraws before the new series arrives keep the old key
+    assert tab._version == version
+    _settle(tab)
+    assert tab._version == get_data_version() > version
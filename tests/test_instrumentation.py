@@ -0,0 +1,68 @@
+import datetime as dt
+import json
+import sqlite3
+
+import pytest
+
+from services import importer, instrumentation
+from services.storage import conn_ctx, get_entry_by_date, init_db, upsert_entry
+
+
+@pytest.fixture
+def collecting():
+    instrumentation.reset()
+    instrumentation.enable()
+    yield instrumentation
+    instrumentation.disable()
+    instrumentation.set_slow_query_ms(None)
+    instrumentation.reset()
+
+
+def _entry(day):
+    return dict(date=dt.date(2024, 1, day), topic="t", minutes=10, practiced="", challenges="", wins="", confidence=3, tags="")
+
+
+def test_disabled_uses_plain_connections_and_records_nothing():
+    instrumentation.reset()
+    init_db()
+    upsert_entry(**_entry(1))
+    with conn_ctx() as conn:
+        assert type(conn) is sqlite3.Connection
+    assert instrumentation.snapshot()["operations"] == {}
+
+
+def test_counts_are_charged_to_the_outermost_operation(collecting):
+    init_db()
+    upsert_entry(**_entry(1))
+    ops = collecting.snapshot()["operations"]
+    up = ops["upsert_entry"]
+    assert (up["calls"], up["connections"], up["commits"]) == (1, 1, 1)
+    assert up["queries"] >= 3 and up["bytes"] > 0 and sum(up["histogram"].values()) == 1
+    # write_entry ran inside upsert_entry: its call is timed, its queries are not double counted
+    assert ops["write_entry"]["calls"] == 1 and ops["write_entry"]["queries"] == 0
+
+    importer.import_records([dict(date=f"2024-02-{d:02d}", topic="x") for d in range(1, 11)])
+    imp = collecting.snapshot()["operations"]["import_records"]
+    assert imp["connections"] == 2 and imp["commits"] == 2
+    assert get_entry_by_date(dt.date(2024, 2, 3))["topic"] == "x"
+    assert collecting.snapshot()["operations"]["get_entry_by_date"]["rows"] == 1
+
+
+def test_slow_queries_are_logged_with_their_plan(collecting, tmp_path):
+    init_db()
+    upsert_entry(**_entry(2))
+    collecting.set_slow_query_ms(1e-9)
+    get_entry_by_date(dt.date(2024, 1, 2))
+    slow = collecting.snapshot()["slow_queries"]
+    assert slow and slow[-1]["operation"] == "get_entry_by_date"
+    assert any("idx_sessions_date" in line for line in slow[-1]["plan"])
+    path = collecting.export_snapshot(str(tmp_path / "snap.json"))
+    with open(path, encoding="utf-8") as f:
+        assert "get_entry_by_date" in json.load(f)["operations"]
+    assert "get_entry_by_date" in collecting.format_snapshot()
+
+
+def test_slow_query_threshold_from_the_environment_is_parsed_defensively(monkeypatch):
+    for raw, ms in (("250", 250.0), ("0", None), ("", None), ("fast", None)):
+        monkeypatch.setenv("LPT_SLOW_QUERY_MS", raw)
+        assert instrumentation._env_ms("LPT_SLOW_QUERY_MS") == ms
@@ -0,0 +1,142 @@
+import datetime as dt
+import json
+import os
+
+from services import filesync, storage
+from services.storage import delete_entry, get_entry_by_date, init_db, upsert_entry
+
+DAY = dt.date(2025, 1, 1)
+
+
+def _write(day, topic="T", minutes=30):
+    upsert_entry(date=day, topic=topic, minutes=minutes, practiced="", challenges="", wins="", confidence=3, tags="")
+
+
+def _lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_saves_append_changes_and_replay_snapshot_plus_tail(tmp_path):
+    init_db()
+    path = str(tmp_path / "entries.ndjson")
+    for i in range(5):
+        _write(DAY + dt.timedelta(days=i), topic=f"T{i}")
+
+    first = filesync.save_journal(path)
+    assert first["compacted"] and first["entries"] == 5
+    assert len(_lines(filesync.snapshot_path(path))) == 6 and len(_lines(path)) == 1
+    assert filesync.save_journal(path)["appended"] == 0
+
+    _write(DAY + dt.timedelta(days=1), topic="changed")
+    _write(DAY + dt.timedelta(days=1), topic="changed again")
+    delete_entry(DAY + dt.timedelta(days=2))
+    saved = filesync.save_journal(path)
+    assert (saved["appended"], saved["compacted"], saved["seq"]) == (2, False, 2)
+    assert [(r["seq"], r["op"]) for r in _lines(path)[1:]] == [(1, "upsert"), (2, "delete")]
+    assert filesync.read_journal(path, since=1) == [{"seq": 2, "op": "delete", "date": "2025-01-03"}]
+
+    entries, seq = filesync.replay_journal(path)
+    assert seq == 2 and [e["topic"] for e in entries] == ["T0", "changed again", "T3", "T4"]
+
+    # A save cut short by a crash leaves a torn last line: readers skip it
+    # and the next save overwrites it
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 3, "op": "ups')
+    assert filesync.replay_journal(path)[0] == entries
+    _write(DAY + dt.timedelta(days=9))
+    assert filesync.save_journal(path)["seq"] == 3
+    assert [r["seq"] for r in _lines(path)[1:]] == [1, 2, 3]
+
+    compacted = filesync.save_journal(path, compact=True)
+    assert compacted["compacted"] and compacted["entries"] == 5 and compacted["seq"] == 3
+    entries, seq = filesync.replay_journal(path)
+    assert len(_lines(path)) == 1 and seq == 3
+    assert [e["topic"] for e in entries] == ["T0", "changed again", "T3", "T4", "T"]
+
+
+def test_launch_sync_reads_other_devices_tail_and_compacts_past_threshold(tmp_path, monkeypatch):
+    path = str(tmp_path / "entries.ndjson")
+    monkeypatch.setenv(filesync.ENV_SYNC_FORMAT, "journal")
+    monkeypatch.setenv(filesync.ENV_JOURNAL_PATH, path)
+
+    def device(name):
+        storage.DB_PATH = str(tmp_path / name / "tracker.db")
+        init_db()
+
+    device("a")
+    _write(DAY, topic="from a")
+    assert filesync.create_or_sync_on_launch() == (path, [])
+    device("b")
+    assert filesync.create_or_sync_on_launch()[0] == path
+    assert get_entry_by_date(DAY)["topic"] == "from a"
+    _write(DAY + dt.timedelta(days=1), topic="from b")
+    filesync.save_sync_file()
+
+    # a's first launch after b's snapshot replays it all, then appends to it
+    device("a")
+    filesync.create_or_sync_on_launch()
+    assert get_entry_by_date(DAY + dt.timedelta(days=1))["topic"] == "from b"
+    device("b")
+    _write(DAY + dt.timedelta(days=1), topic="b again")
+    assert filesync.save_sync_file() == path
+
+    device("a")
+    real_replay, reads = filesync.replay_journal, []
+    monkeypatch.setattr(filesync, "replay_journal", lambda *a: reads.append(a))
+    filesync.create_or_sync_on_launch()
+    assert reads == []  # only the journal tail was read
+    assert get_entry_by_date(DAY + dt.timedelta(days=1))["topic"] == "b again"
+    monkeypatch.setattr(filesync, "replay_journal", real_replay)
+
+    monkeypatch.setattr(filesync, "JOURNAL_COMPACT_MIN_BYTES", 0)
+    monkeypatch.setattr(filesync, "JOURNAL_COMPACT_RATIO", 0.0)
+    _write(DAY + dt.timedelta(days=2), topic="again from a")
+    saved = filesync.save_journal(path)
+    assert saved["compacted"] and saved["appended"] == 1 and saved["entries"] == 3
+    assert os.path.getsize(path) < os.path.getsize(filesync.snapshot_path(path))
+
+
+def test_launch_that_only_imports_does_not_echo_and_read_errors_keep_the_cursor(tmp_path, monkeypatch):
+    path = str(tmp_path / "entries.ndjson")
+    monkeypatch.setenv(filesync.ENV_SYNC_FORMAT, "journal")
+    monkeypatch.setenv(filesync.ENV_JOURNAL_PATH, path)
+
+    def device(name):
+        storage.DB_PATH = str(tmp_path / name / "tracker.db")
+        init_db()
+
+    device("a")
+    _write(DAY, topic="from a")
+    filesync.create_or_sync_on_launch()
+    device("b")
+    filesync.create_or_sync_on_launch()
+    device("a")
+    for i in range(1, 4):
+        _write(DAY + dt.timedelta(days=i), topic=f"a{i}")
+    assert filesync.save_sync_file() == path
+    size = os.path.getsize(path)
+
+    device("b")
+    assert filesync.create_or_sync_on_launch() == (path, [])
+    assert get_entry_by_date(DAY + dt.timedelta(days=3))["topic"] == "a3"
+    assert os.path.getsize(path) == size
+    assert filesync.save_journal(path)["appended"] == 0
+    # Again when b only reads the journal tail
+    device("a")
+    _write(DAY + dt.timedelta(days=4), topic="a4")
+    assert filesync.save_journal(path)["appended"] == 1
+    size = os.path.getsize(path)
+    device("b")
+    filesync.create_or_sync_on_launch()
+    assert get_entry_by_date(DAY + dt.timedelta(days=4))["topic"] == "a4"
+    assert os.path.getsize(path) == size
+
+    # An unreadable journal is reported; nothing is saved and the read
+    # position stays where it was
+    state = filesync._journal_state()
+    _write(DAY + dt.timedelta(days=9), topic="local")
+    monkeypatch.setattr(filesync, "read_journal", lambda *a: (_ for _ in ()).throw(ValueError("bad line")))
+    _, msgs = filesync.create_or_sync_on_launch()
+    assert msgs and "bad line" in msgs[0]
+    assert filesync._journal_state() == state and os.path.getsize(path) == size
@@ -0,0 +1,76 @@
+import datetime as dt
+import json
+import os
+import sqlite3
+
+import pytest
+
+from services import cli, storage
+from services.storage import init_db, upsert_entry
+
+
+def _auto_vacuum():
+    with storage.conn_ctx() as conn:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+
+def test_new_databases_use_incremental_auto_vacuum():
+    init_db()
+    assert _auto_vacuum() == 2
+
+
+def _legacy_db():
+    """A DB from before auto_vacuum was enabled."""
+    os.makedirs(os.path.dirname(storage.DB_PATH), exist_ok=True)
+    conn = sqlite3.connect(storage.DB_PATH)
+    conn.execute(
+        "CREATE TABLE sessions (id INTEGER PRIMARY KEY, date TEXT NOT NULL, topic TEXT, minutes INTEGER DEFAULT 0, "
+        "practiced TEXT, challenges TEXT, wins TEXT, confidence INTEGER DEFAULT 3)"
+    )
+    conn.close()
+    init_db()
+    assert _auto_vacuum() == 0
+
+
+def test_tasks_run_when_due_and_record_their_results():
+    _legacy_db()
+    for i in range(300):
+        upsert_entry(date=dt.date(2024, 1, 1) + dt.timedelta(days=i), topic="t", minutes=5, practiced="x" * 2000, challenges="", wins="", confidence=3)
+
+    ran = storage.run_maintenance()
+    assert list(ran) == list(storage.MAINTENANCE_INTERVALS)
+    assert all(r["result"]["ok"] for r in ran.values()) and ran["vacuum"]["result"]["migrated"]
+    assert _auto_vacuum() == 2
+    assert storage.run_maintenance() == {}
+    status = storage.maintenance_status(dt.datetime.now() + dt.timedelta(days=2))
+    assert status["optimize"]["due"] and not status["analyze"]["due"]
+
+    with storage.conn_ctx() as conn:
+        conn.execute("DELETE FROM sessions WHERE date >= '2024-03-01'")
+    size = os.path.getsize(storage.DB_PATH)
+    vacuum = storage.run_maintenance(["vacuum"], force=True)["vacuum"]["result"]
+    assert vacuum["freed_bytes"] > 0 and os.path.getsize(storage.DB_PATH) < size
+    assert "freed" in storage.format_maintenance(storage.maintenance_status())
+    with pytest.raises(ValueError):
+        storage.run_maintenance(["defrag"])
+
+
+def test_background_runs_leave_large_migrations_for_an_explicit_run(monkeypatch):
+    _legacy_db()
+    monkeypatch.setattr(storage, "VACUUM_MIGRATE_BACKGROUND_MAX_BYTES", 0)
+    # quick_check runs on the task's own connection
+    monkeypatch.setattr(storage, "integrity_check", None)
+    ran = storage.run_maintenance(["vacuum", "quick_check"], background=True)
+    assert ran["vacuum"]["result"]["pending"] and not ran["vacuum"]["result"]["migrated"] and _auto_vacuum() == 0
+    assert ran["quick_check"]["result"] == {"ok": True, "messages": ["ok"]}
+    assert "pending" in storage.format_maintenance(storage.maintenance_status())
+    assert storage.run_maintenance(["vacuum"], force=True)["vacuum"]["result"]["migrated"] and _auto_vacuum() == 2
+
+
+def test_cli_maintain(capsys):
+    init_db()
+    assert cli.main(["maintain", "--task", "quick_check"]) == 0
+    out = json.loads(capsys.readouterr().out)
+    assert list(out["ran"]) == ["quick_check"] and out["status"]["analyze"]["last"] is None
+    assert cli.main(["maintain", "--status"]) == 0
+    assert json.loads(capsys.readouterr().out)["ran"] == {}
@@ -1,6 +1,9 @@
 import datetime as dt
+import random
 
-from services.metrics import compute_week_index
+import pandas as pd
+
+from services.metrics import add_derived_fields, compute_progress_score, compute_week_index
 
 
 def test_compute_week_index_same_week():
@@ -23,3 +26,23 @@ def test_compute_week_index_year_boundary():
     # (2025-01-02 - 2024-12-28) = 5 days -> week 0
     assert compute_week_index(d, start) == 0
 
+
+def test_add_derived_fields_matches_scalar_helpers():
+    rng = random.Random(1234)
+    for _ in range(25):
+        n = rng.randint(1, 60)
+        base = dt.date(2020, 1, 1) + dt.timedelta(days=rng.randint(0, 2000))
+        dates = [base + dt.timedelta(days=rng.randint(0, 900)) for _ in range(n)]
+        df = pd.DataFrame({
+            # Mix date objects and ISO strings like real imports do
+            "date": [d if rng.random() < 0.5 else d.isoformat() for d in dates],
+            "minutes": [rng.randint(0, 1440) for _ in range(n)],
+            "confidence": [rng.randint(1, 5) for _ in range(n)],
+        })
+        out = add_derived_fields(df)
+        start = min(dates)
+        assert out["date"].tolist() == dates
+        assert out["progress_score"].tolist() == [
+            compute_progress_score(m, c) for m, c in zip(df["minutes"], df["confidence"])
+        ]
+        assert out["week_index"].tolist() == [compute_week_index(d, start) for d in dates]
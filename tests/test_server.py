@@ -0,0 +1,113 @@
+import asyncio
+import datetime as dt
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from services import server
+from services.storage import conn_ctx, fetch_all_entries, get_data_version, init_db, upsert_entry
+
+
+@pytest.fixture
+def api():
+    init_db()
+    srv, thread = server.run_in_thread()
+    base = f"http://127.0.0.1:{srv.port}"
+
+    def call(method, path, body=None, headers=None):
+        data = json.dumps(body).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(base + path, data=data, method=method, headers=headers or {})
+        try:
+            with urllib.request.urlopen(request) as resp:
+                return resp.status, resp.headers, resp.read()
+        except urllib.error.HTTPError as ex:
+            return ex.code, ex.headers, ex.read()
+
+    yield srv, call
+    server.stop_thread(srv, thread)
+
+
+def test_entries_round_trip_with_etags(api):
+    srv, call = api
+    assert call("PUT", "/entries/2025-01-02", {"topic": "A", "minutes": 30, "confidence": 4})[0] == 200
+    status, _, body = call("PUT", "/entries/2025-01-03", {"topic": "", "minutes": 30})
+    assert status == 400 and "Topic" in json.loads(body)["detail"][0]
+
+    status, headers, body = call("GET", "/entries?start=2025-01-01&end=2025-01-31")
+    assert status == 200 and [e["topic"] for e in json.loads(body)] == ["A"]
+    etag = headers["ETag"]
+    assert call("GET", "/entries?start=2025-01-01&end=2025-01-31", headers={"If-None-Match": etag})[0] == 304
+    call("GET", "/entries?start=2025-01-01&end=2025-01-31")
+    assert srv.cache_hits == 1
+
+    assert json.loads(call("DELETE", "/entries/2025-01-02")[2])["deleted"] is True
+    assert call("GET", "/entries/2025-01-02")[0] == 404
+    assert call("GET", "/entries?start=2025-01-01&end=2025-01-31")[1]["ETag"] != etag
+    assert call("GET", "/health", headers={"Host": "example.com"})[0] == 403
+
+
+def test_queued_writes_share_a_transaction(api):
+    srv, call = api
+    records = [{"date": f"2025-03-{d:02d}", "topic": "B", "minutes": d} for d in range(1, 29)]
+
+    async def submit_all():
+        return await asyncio.gather(*(srv.writer.submit(server._put_entry, r) for r in records))
+
+    results = asyncio.run_coroutine_threadsafe(submit_all(), srv._loop).result()
+    assert all(r["changed"] for r in results)
+    assert srv.writer.batches <= 2 and srv.writer.writes == len(records)
+    assert len(fetch_all_entries()) == len(records)
+
+
+def test_import_is_all_or_nothing_and_export_streams(api):
+    _, call = api
+    bad = [{"date": "2025-04-01", "topic": "ok"}, {"date": "not a date", "topic": "x"}]
+    assert call("POST", "/import", bad)[0] == 400
+    assert fetch_all_entries() == []
+    good = [{"date": f"2025-04-{d:02d}", "topic": "I", "minutes": d} for d in range(1, 31)]
+    assert json.loads(call("POST", "/import", good)[2])["inserted"] == 30
+
+    status, headers, body = call("GET", "/export?format=ndjson")
+    assert status == 200 and headers["Transfer-Encoding"] == "chunked"
+    assert [json.loads(line)["minutes"] for line in body.splitlines()] == list(range(1, 31))
+    assert len(json.loads(call("GET", "/export")[2])) == 30
+    assert call("GET", "/export?format=xml")[0] == 400
+
+
+def test_only_loopback_addresses():
+    with pytest.raises(ValueError):
+        server.TrackerServer("0.0.0.0")
+
+
+def test_host_header_names_and_journal_mode_restored_on_stop():
+    assert [server.host_name(h) for h in ("[::1]", "[::1]:8765", "localhost:80", "127.0.0.1", "")] == [
+        "::1", "::1", "localhost", "127.0.0.1", "",
+    ]
+    init_db()
+    srv, thread = server.run_in_thread()
+    request = urllib.request.Request(f"http://127.0.0.1:{srv.port}/health", headers={"Host": "[::1]"})
+    with urllib.request.urlopen(request) as resp:
+        assert resp.status == 200
+    with conn_ctx() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    server.stop_thread(srv, thread)
+    with conn_ctx() as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+
+
+def test_export_etag_and_rows_come_from_one_snapshot():
+    init_db()
+    with conn_ctx() as conn:
+        conn.execute("PRAGMA journal_mode=WAL")
+    upsert_entry(date=dt.date(2025, 5, 1), topic="A", minutes=5, practiced="", challenges="", wins="", confidence=3)
+    before = get_data_version()
+    conn = server._open(True)
+    version, cur = server._begin_export(conn)
+    # A write committed while the export streams is not in it, and the ETag
+    # still names the version that was sent
+    upsert_entry(date=dt.date(2025, 5, 2), topic="B", minutes=5, practiced="", challenges="", wins="", confidence=3)
+    assert get_data_version() > before == version
+    assert [row[1] for row in cur.fetchall()] == ["A"]
+    server._end_export(conn)
@@ -0,0 +1,48 @@
+import datetime as dt
+import random
+
+from services.storage import SORTED_PAGE_KEYS, fetch_sorted_page, init_db, upsert_entry
+
+
+BASE = dt.date(2024, 1, 1)
+
+
+def _seed(rng, days):
+    expected = {}
+    for day in days:
+        d = BASE + dt.timedelta(days=day)
+        minutes, conf = rng.randrange(0, 60, 15), rng.randint(1, 5)
+        upsert_entry(date=d, topic=f"T{day}", minutes=minutes, practiced="", challenges="", wins="", confidence=conf, tags="")
+        expected[d] = {"date": d.toordinal(), "minutes": minutes, "confidence": conf, "progress": minutes * conf}
+    return expected
+
+
+def _walk(mode, limit):
+    out, after = [], None
+    while True:
+        page = fetch_sorted_page(mode, after, limit)
+        out.extend(dt.date.fromisoformat(r["date"]) for r in page)
+        if len(page) < limit:
+            return out
+        after = (page[-1]["key"], out[-1])
+
+
+def test_pages_follow_each_sort_mode():
+    init_db()
+    rng = random.Random(5)
+    expected = _seed(rng, rng.sample(range(120), 70))
+    for mode in SORTED_PAGE_KEYS:
+        want = sorted(expected, key=lambda d: (expected[d][mode], d), reverse=True)
+        assert _walk(mode, 7) == want
+
+
+def test_keyset_pages_survive_writes_between_fetches():
+    init_db()
+    expected = _seed(random.Random(9), range(30))
+    first = fetch_sorted_page("minutes", None, 10)
+    # A row that sorts before the cursor must not shift later pages
+    upsert_entry(date=BASE - dt.timedelta(days=1), topic="x", minutes=999, practiced="", challenges="", wins="", confidence=3, tags="")
+    rest = fetch_sorted_page("minutes", (first[-1]["key"], dt.date.fromisoformat(first[-1]["date"])), 100)
+    got = [r["date"] for r in first] + [r["date"] for r in rest]
+    want = sorted(expected, key=lambda d: (expected[d]["minutes"], d), reverse=True)
+    assert got == [d.isoformat() for d in want]
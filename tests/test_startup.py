@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Generous wall-clock budget for importing the desktop module; the main guard
+# is that heavy modules stay out of the startup path entirely.
+IMPORT_BUDGET_SECONDS = 3.0
+HEAVY_MODULES = ("pandas", "matplotlib", "openpyxl")
+
+
+def _import_report(module: str, watch: tuple = HEAVY_MODULES) -> dict:
+    code = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"print(json.dumps({{'elapsed': elapsed, 'loaded': [m for m in {watch!r} if m in sys.modules]}}))\n"
+    )
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def test_storage_import_skips_pandas():
+    report = _import_report("services.storage")
+    assert report["loaded"] == []
+
+
+def test_desktop_import_time_budget():
+    pytest.importorskip("PySide6")
+    report = _import_report("desktop.main")
+    assert report["loaded"] == [], f"heavy modules imported at startup: {report['loaded']}"
+    assert report["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_cli_import_skips_gui_and_pandas():
+    report = _import_report("services.cli", HEAVY_MODULES + ("PySide6",))
+    assert report["loaded"] == []
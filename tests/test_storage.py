@@ -1,6 +1,19 @@
 import datetime as dt
+import os
+import sqlite3
 
-from services.storage import init_db, upsert_entry, get_all_entries_df, export_csv_bytes, export_excel_bytes
+from services import storage
+from services.storage import (
+    init_db,
+    upsert_entry,
+    get_all_entries_df,
+    export_csv_bytes,
+    export_excel_bytes,
+    fetch_day_summaries,
+    delete_entry,
+    get_data_version,
+    backup_db_daily,
+)
 
 
 def test_storage_roundtrip_and_exports():
@@ -29,3 +42,38 @@ def test_storage_roundtrip_and_exports():
     assert isinstance(csv, (bytes, bytearray)) and len(csv) > 0
     xlsx = export_excel_bytes(df)
     assert isinstance(xlsx, (bytes, bytearray)) and len(xlsx) > 0
+
+
+def test_day_summaries_cover_only_the_requested_range():
+    init_db()
+    base = dt.date(2025, 3, 1)
+    for i in range(0, 60, 3):
+        upsert_entry(date=base + dt.timedelta(days=i), topic=f"T{i}", minutes=10, practiced="long " * 50,
+                     challenges="", wins="", confidence=1 + i % 5, tags="")
+    rows = fetch_day_summaries(dt.date(2025, 3, 10), dt.date(2025, 3, 31))
+    assert sorted(rows) == [(base + dt.timedelta(days=i), f"T{i}", 1 + i % 5) for i in range(9, 31, 3)]
+
+
+def test_data_version_moves_only_when_entries_change():
+    init_db()
+    d = dt.date(2025, 3, 1)
+    fields = dict(topic="T", minutes=30, practiced="", challenges="", wins="", confidence=3, tags="")
+    v0 = get_data_version()
+    upsert_entry(date=d, **fields)
+    v1 = get_data_version()
+    upsert_entry(date=d, **fields)  # identical rewrite, e.g. launch-time sync
+    assert v1 > v0 and get_data_version() == v1
+    upsert_entry(date=d, **dict(fields, minutes=31))
+    delete_entry(d)
+    assert get_data_version() == v1 + 2
+
+
+def test_daily_backup_is_a_consistent_copy_made_once():
+    init_db()
+    upsert_entry(date=dt.date(2025, 4, 1), topic="B", minutes=5, practiced="", challenges="", wins="", confidence=3, tags="")
+    assert backup_db_daily() is True
+    assert backup_db_daily() is False  # once per day
+    backups = os.path.join(os.path.dirname(storage.DB_PATH), "backups")
+    (name,) = os.listdir(backups)
+    with sqlite3.connect(os.path.join(backups, name)) as conn:
+        assert conn.execute("SELECT topic FROM sessions").fetchall() == [("B",)]
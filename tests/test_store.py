@@ -0,0 +1,91 @@
+import datetime as dt
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore  # noqa: E402
+
+from desktop.store import EntryStore  # noqa: E402
+from services.storage import init_db, fetch_all_entries, get_entry_by_date, upsert_entry  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _fields(topic="T", minutes=30, confidence=3):
+    return dict(topic=topic, minutes=minutes, practiced="", challenges="", wins="", confidence=confidence, tags="")
+
+
+def _load(store: EntryStore) -> None:
+    store.reload()
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    QtCore.QCoreApplication.processEvents()
+    assert store.is_loaded()
+
+
+def test_store_emits_row_level_signals_and_stays_in_sync(qapp):
+    init_db()
+    store = EntryStore()
+    _load(store)
+    events = []
+    store.entryAdded.connect(lambda d: events.append(("add", d)))
+    store.entryChanged.connect(lambda d: events.append(("change", d)))
+    store.entryRemoved.connect(lambda d: events.append(("remove", d)))
+    store.settingsChanged.connect(lambda k: events.append(("setting", k)))
+
+    d = dt.date(2024, 5, 1)
+    store.upsert(date=d, **_fields())
+    store.upsert(date=d, **_fields(topic="U", minutes=45))
+    assert store.get(d)["minutes"] == 45 and store.get(d)["progress"] == 135
+    store.delete(d)
+    store.set_setting("theme", "dark")
+    assert events == [("add", d), ("change", d), ("remove", d), ("setting", "theme")]
+    assert store.get(d) is None
+
+    store.upsert(date=d, **_fields())
+    assert set(store.entries()) == {dt.date.fromisoformat(r["date"]) for r in fetch_all_entries()}
+
+
+def test_writes_held_during_a_background_job_win_afterwards(qapp):
+    init_db()
+    d = dt.date(2024, 6, 1)
+    upsert_entry(date=d, **_fields(topic="before"))
+    store = EntryStore()
+    _load(store)
+    store.hold_writes()
+    store.upsert(date=d, **_fields(topic="mine"))
+    store.delete(dt.date(2024, 6, 2))
+    store.upsert(date=dt.date(2024, 6, 3), **_fields())
+    # The job (e.g. the launch sync) writes the same day meanwhile
+    upsert_entry(date=d, **_fields(topic="synced"))
+    assert store.get(d)["topic"] == "mine" and get_entry_by_date(dt.date(2024, 6, 3)) is None
+    _load(store)  # a reload while holding keeps the queued edits visible
+    assert store.entries()[d]["topic"] == "mine"
+    store.release_writes()
+    QtCore.QThreadPool.globalInstance().waitForDone()
+    QtCore.QCoreApplication.processEvents()
+    assert get_entry_by_date(d)["topic"] == "mine" and get_entry_by_date(dt.date(2024, 6, 3)) is not None
+    assert not store.is_holding() and set(store.entries()) == {d, dt.date(2024, 6, 3)}
+
+
+def test_bulk_jobs_wait_for_held_writes_to_be_committed(qapp):
+    init_db()
+    d = dt.date(2024, 6, 1)
+    store = EntryStore()
+    _load(store)
+    started = []
+    store.after_release(lambda: started.append("now"))
+    store.hold_writes()
+    store.upsert(date=d, **_fields(topic="mine"))
+    # e.g. a file import picked while the launch sync runs
+    store.after_release(lambda: started.append(get_entry_by_date(d)["topic"]))
+    assert started == ["now"]
+    store.release_writes()
+    assert started == ["now", "mine"]
+    store.release_writes()
+    assert started == ["now", "mine"]
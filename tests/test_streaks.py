@@ -1,7 +1,14 @@
 import datetime as dt
+import random
+import sqlite3
+
 import pandas as pd
 
+from services import storage
 from services.metrics import compute_streaks, weekly_minutes, week_bounds_for
+from services.storage import (
+    init_db, upsert_entry, delete_entry, get_streak_state, get_week_minutes, verify_derived_state,
+)
 
 
 def test_compute_streaks_current_and_longest():
@@ -27,3 +34,42 @@ def test_weekly_minutes_range():
     })
     assert weekly_minutes(df, today) == 100
 
+
+def test_stored_streak_state_tracks_writes():
+    init_db()
+    today = dt.date.today()
+    rng = random.Random(7)
+    live: dict[dt.date, int] = {}
+    for _ in range(200):
+        d = today - dt.timedelta(days=rng.randint(0, 40))
+        if d in live and rng.random() < 0.4:
+            delete_entry(d)
+            del live[d]
+        else:
+            m = rng.randint(0, 120)
+            upsert_entry(date=d, topic="T", minutes=m, practiced="", challenges="", wins="", confidence=3, tags="")
+            live[d] = m
+    assert verify_derived_state()
+
+    state = get_streak_state(today)
+    cur, longest = compute_streaks(list(live))
+    assert (state["current_streak"], state["longest_streak"]) == (cur, longest)
+    start, end = week_bounds_for(today)
+    expected = sum(m for d, m in live.items() if start <= d <= end)
+    assert state["week_minutes"] == expected == get_week_minutes(today)
+
+
+def test_init_db_rebuilds_state_for_existing_sessions():
+    storage.init_db()
+    today = dt.date.today()
+    for i in range(3):
+        storage.upsert_entry(date=today - dt.timedelta(days=i), topic="T", minutes=10, practiced="", challenges="", wins="", confidence=3, tags="")
+    # Simulate a DB from before derived state existed
+    conn = sqlite3.connect(storage.DB_PATH)
+    conn.execute("DROP TABLE streak_runs")
+    conn.execute("DROP TABLE weekly_totals")
+    conn.commit()
+    conn.close()
+    storage.init_db()
+    assert storage.get_streak_state(today)["current_streak"] == 3
+    assert storage.verify_derived_state()
@@ -0,0 +1,79 @@
+import datetime as dt
+import json
+import os
+
+from services import cli, storage, team
+from services.storage import init_db, upsert_entry
+
+TODAY = dt.date(2025, 3, 16)  # a Sunday
+
+
+def _learner(path, days, minutes=30, confidence=3):
+    storage.DB_PATH = str(path)
+    init_db()
+    for i, day in enumerate(days):
+        upsert_entry(date=day, topic=f"T{i}", minutes=minutes, practiced="", challenges="", wins="", confidence=confidence + i % 2, tags="")
+
+
+def test_report_sums_learners_and_recomputes_only_changed_dbs(tmp_path, monkeypatch):
+    root = tmp_path / "team"
+    (root / "carol").mkdir(parents=True)
+    monkeypatch.setattr(storage, "DB_PATH", storage.DB_PATH)
+    _learner(root / "alice.db", [TODAY - dt.timedelta(days=i) for i in range(5)])
+    _learner(root / "bob.db", [dt.date(2025, 3, 3), dt.date(2025, 3, 4)], minutes=60)
+    _learner(root / "carol" / "tracker.db", [])
+    cache = str(tmp_path / "cache.json")
+
+    report = team.build_report(str(root), weeks=4, today=TODAY, workers=2, cache_path=cache)
+    assert sorted(report["learners"]) == ["alice", "bob", "carol"]
+    assert (report["recomputed"], report["cached"], report["errors"]) == (3, 0, {})
+    alice, bob = report["learners"]["alice"], report["learners"]["bob"]
+    assert (alice["current_streak"], alice["longest_streak"], alice["week_minutes"]) == (5, 5, [0, 0, 0, 150])
+    assert (bob["current_streak"], bob["week_minutes"], bob["week_sessions"]) == (0, [0, 0, 120, 0], [0, 0, 2, 0])
+    assert report["weeks"][-1] == "2025-03-10"
+    t = report["team"]
+    assert (t["learners"], t["entries"], t["total_minutes"]) == (3, 7, 270)
+    assert t["week_minutes"] == [0, 0, 120, 150] and t["week_active_learners"] == [0, 0, 1, 1]
+
+    again = team.build_report(str(root), weeks=4, today=TODAY, workers=2, cache_path=cache)
+    assert (again["recomputed"], again["cached"]) == (0, 3)
+    assert again["learners"] == report["learners"]
+
+    _learner(root / "bob.db", [dt.date(2025, 3, 12)], minutes=15)
+    changed = team.build_report(str(root), weeks=4, today=TODAY, workers=2, cache_path=cache)
+    assert (changed["recomputed"], changed["cached"]) == (1, 2)
+    assert changed["learners"]["bob"]["week_minutes"] == [0, 0, 120, 15]
+
+    # A sibling folder whose name starts the same shares the cache file
+    # without either report pruning the other's entries
+    _learner(tmp_path / "team2" / "dave.db", [TODAY])
+    assert team.build_report(str(tmp_path / "team2"), weeks=4, today=TODAY, cache_path=cache)["recomputed"] == 1
+    os.remove(root / "alice.db")
+    _learner(root / "bob.db", [dt.date(2025, 3, 13)], minutes=15)
+    assert team.build_report(str(root), weeks=4, today=TODAY, workers=2, cache_path=cache)["recomputed"] == 1
+    with open(cache, encoding="utf-8") as f:
+        keys = json.load(f)["entries"]
+    assert not any(k.endswith("alice.db") for k in keys) and any(k.endswith("dave.db") for k in keys)
+
+
+def test_current_streak_follows_the_app_rule(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "DB_PATH", storage.DB_PATH)
+    path = tmp_path / "erin.db"
+    _learner(path, [TODAY - dt.timedelta(days=i) for i in range(1, 4)])  # up to yesterday
+    summary = team.summarize_db(str(path), weeks=2, today=TODAY.isoformat())
+    assert (summary["current_streak"], summary["longest_streak"]) == (0, 3)
+    assert summary["current_streak"] == storage.get_streak_state(TODAY)["current_streak"]
+
+
+def test_cli_team_reports_broken_databases(tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(storage, "DB_PATH", storage.DB_PATH)
+    _learner(tmp_path / "ok.db", [dt.date(2025, 3, 10)])
+    (tmp_path / "broken.db").write_bytes(b"not a database")
+    code = cli.main(["team", str(tmp_path), "--today", "2025-03-16", "--no-cache", "--weeks", "2"])
+    report = json.loads(capsys.readouterr().out)
+    assert code == 1 and list(report["errors"]) == ["broken"]
+    assert report["learners"]["ok"]["week_minutes"] == [0, 30]
+    assert not os.path.exists(team.default_cache_path())
+
+    cli.main(["team", str(tmp_path), "--today", "2025-03-16", "--no-cache", "-f", "text"])
+    assert "TEAM" in capsys.readouterr().out
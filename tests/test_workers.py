@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+pytest.importorskip("PySide6")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PySide6 import QtCore  # noqa: E402
+
+from desktop.workers import BackgroundRefresher  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    return QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+
+
+def _drain(pool: QtCore.QThreadPool) -> None:
+    pool.waitForDone()
+    QtCore.QCoreApplication.processEvents()
+
+
+def test_superseded_refresh_results_are_dropped(qapp):
+    pool = QtCore.QThreadPool()
+    pool.setMaxThreadCount(1)
+    gate = threading.Event()
+    applied, loads = [], []
+
+    def load(cancel):
+        n = len(loads)
+        loads.append(n)
+        if n == 0:
+            gate.wait(5)  # hold the first job until a newer request arrives
+        return n
+
+    refresher = BackgroundRefresher(load, applied.append, pool=pool)
+    busy = []
+    refresher.busyChanged.connect(busy.append)
+    refresher.request()
+    refresher.request()
+    refresher.request()  # queued second request is taken back from the pool
+    gate.set()
+    _drain(pool)
+    assert applied == [loads[-1]]
+    assert not refresher.is_busy()
+    assert busy[-1] is False
+
+
+def test_load_errors_are_reported_on_gui_thread(qapp):
+    pool = QtCore.QThreadPool()
+    errors, gui = [], threading.current_thread()
+
+    def load(cancel):
+        raise ValueError("boom")
+
+    refresher = BackgroundRefresher(load, lambda r: None, pool=pool)
+    refresher.failed.connect(lambda msg: errors.append((msg, threading.current_thread() is gui)))
+    refresher.request()
+    _drain(pool)
+    assert errors == [("boom", True)]